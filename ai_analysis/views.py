@@ -1,6 +1,7 @@
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
 from legislative_monitor.models import Proposicao, Discurso
+from legislative_monitor.services.busca import buscar_proposicoes
+from legislative_monitor.services.paginacao import KeysetPaginator, links_paginacao
 from .models import ResumoIA, AnaliseImpacto, AnaliseDiscurso
 
 
@@ -20,12 +21,12 @@ def resumos(request):
     """Lista resumos gerados por IA"""
     resumos = ResumoIA.objects.all()
     
-    paginator = Paginator(resumos, 20)
-    page = request.GET.get('page')
-    resumos_page = paginator.get_page(page)
+    paginator = KeysetPaginator(resumos, 20, ordenacao=['-created_at', '-id'])
+    resumos_page = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'resumos': resumos_page,
+        **links_paginacao(request, resumos_page),
     }
     return render(request, 'ai_analysis/resumos_list.html', context)
 
@@ -49,12 +50,12 @@ def analises_impacto(request):
     if nivel:
         analises = analises.filter(nivel_impacto=nivel)
     
-    paginator = Paginator(analises, 20)
-    page = request.GET.get('page')
-    analises_page = paginator.get_page(page)
+    paginator = KeysetPaginator(analises, 20, ordenacao=['-created_at', '-id'])
+    analises_page = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'analises': analises_page,
+        **links_paginacao(request, analises_page),
     }
     return render(request, 'ai_analysis/analises_impacto_list.html', context)
 
@@ -76,8 +77,8 @@ def busca_semantica(request):
     
     if query:
         # Aqui implementaríamos a busca semântica real
-        # Por enquanto, fazemos uma busca simples
-        resultados = Proposicao.objects.filter(ementa__icontains=query)[:20]
+        # Por enquanto, busca textual por relevância nas ementas
+        resultados = buscar_proposicoes(query, Proposicao.objects.select_related('tipo', 'autor'))[:20]
     
     context = {
         'query': query,
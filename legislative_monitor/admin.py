@@ -1,20 +1,47 @@
 from django.contrib import admin
-from .models import Deputado, Proposicao, Votacao, VotoDeputado, Discurso, Regiao, Estado, Municipio, TipoProposicao, Sexo, Partido
+from .services.busca import filtro_nome
+from .services.paginacao import PaginatorEstimado
+from .models import Deputado, Proposicao, Votacao, VotoDeputado, Discurso, Regiao, Estado, Municipio, TipoProposicao, Sexo, Partido, CheckpointSincronizacao, EtapaSincronizacao
+
+
+class BuscaNomeAdminMixin:
+    """
+    Busca do admin que soma aos `search_fields` a busca por nome sem acentos e com
+    índice de trigramas (services/busca.py) sobre a coluna `nome_busca` do model
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        resultado, duplicados = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            resultado |= queryset.filter(filtro_nome(self.model, search_term, queryset.db))
+        return resultado, duplicados
+
+
+class ContagemEstimadaAdminMixin:
+    """
+    Changelist sem COUNT(*) da tabela inteira: o total vem de PaginatorEstimado (exato
+    em listas pequenas, estimativa do banco nas grandes, marcada no template de
+    paginação) e a contagem total ao lado do resultado da busca é desligada
+    """
+    paginator = PaginatorEstimado
+    show_full_result_count = False
 
 
 @admin.register(Deputado)
-class DeputadoAdmin(admin.ModelAdmin):
+class DeputadoAdmin(BuscaNomeAdminMixin, admin.ModelAdmin):
     list_display = ['nome', 'sigla_partido', 'uf_representacao', 'situacao']
     list_filter = ['sigla_partido', 'uf_representacao', 'situacao', 'sexo']
-    search_fields = ['nome', 'nome_civil', 'email']
+    # nome e nome civil: BuscaNomeAdminMixin
+    search_fields = ['email']
     ordering = ['nome']
 
 
 @admin.register(Proposicao)
-class ProposicaoAdmin(admin.ModelAdmin):
+class ProposicaoAdmin(ContagemEstimadaAdminMixin, admin.ModelAdmin):
     list_display = ['tipo', 'numero', 'ano', 'autor', 'data_apresentacao', 'situacao']
     list_filter = ['tipo', 'situacao', 'ano']
     search_fields = ['ementa', 'numero']
+    list_select_related = ['tipo', 'autor__sigla_partido', 'autor__uf_representacao']
     date_hierarchy = 'data_apresentacao'
     ordering = ['-data_apresentacao']
 
@@ -29,18 +56,21 @@ class VotacaoAdmin(admin.ModelAdmin):
 
 
 @admin.register(VotoDeputado)
-class VotoDeputadoAdmin(admin.ModelAdmin):
+class VotoDeputadoAdmin(ContagemEstimadaAdminMixin, admin.ModelAdmin):
     list_display = ['deputado', 'votacao', 'voto', 'created_at']
     list_filter = ['voto']
     search_fields = ['deputado__nome']
-    ordering = ['-created_at']
+    list_select_related = ['deputado__sigla_partido', 'deputado__uf_representacao', 'votacao']
+    # Ordem de inserção pelo pk: created_at não tem índice e a tabela tem milhões de linhas
+    ordering = ['-id']
 
 
 @admin.register(Discurso)
-class DiscursoAdmin(admin.ModelAdmin):
+class DiscursoAdmin(ContagemEstimadaAdminMixin, admin.ModelAdmin):
     list_display = ['deputado', 'data', 'tipo_discurso']
     list_filter = ['tipo_discurso']
     search_fields = ['deputado__nome', 'transcricao', 'sumario']
+    list_select_related = ['deputado__sigla_partido', 'deputado__uf_representacao']
     date_hierarchy = 'data'
     ordering = ['-data']
 
@@ -79,10 +109,11 @@ class TipoProposicaoAdmin(admin.ModelAdmin):
 
 
 @admin.register(Partido)
-class PartidoAdmin(admin.ModelAdmin):
+class PartidoAdmin(BuscaNomeAdminMixin, admin.ModelAdmin):
     list_display = ['sigla', 'nome', 'status_situacao', 'status_total_membros', 'created_at']
     list_filter = ['status_situacao']
-    search_fields = ['sigla', 'nome', 'id_partido']
+    # sigla e nome: BuscaNomeAdminMixin
+    search_fields = ['id_partido']
     ordering = ['sigla']
     readonly_fields = ['created_at', 'updated_at']
     
@@ -124,3 +155,21 @@ class SexoAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(CheckpointSincronizacao)
+class CheckpointSincronizacaoAdmin(admin.ModelAdmin):
+    list_display = ['fonte', 'watermark', 'janela_inicio', 'janela_fim', 'pagina', 'status', 'updated_at']
+    list_filter = ['status']
+    search_fields = ['fonte']
+    ordering = ['fonte']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(EtapaSincronizacao)
+class EtapaSincronizacaoAdmin(admin.ModelAdmin):
+    list_display = ['execucao', 'etapa', 'status', 'inicio', 'duracao', 'codigo_saida']
+    list_filter = ['status', 'etapa']
+    search_fields = ['execucao', 'etapa']
+    ordering = ['-execucao', 'inicio']
+    readonly_fields = ['created_at', 'updated_at']
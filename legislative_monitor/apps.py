@@ -1,6 +1,23 @@
+import sys
+
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _recriar_triggers_fts(sender, using, verbosity=1, stdout=sys.stdout, **kwargs):
+    """Depois de cada migrate: recria os triggers FTS5 que uma migração tenha apagado"""
+    from legislative_monitor.services.busca import recriar_triggers_fts
+
+    reconstruidas = recriar_triggers_fts(using)
+    if reconstruidas and verbosity:
+        stdout.write(f'  Triggers de busca recriados e índices reconstruídos: {", ".join(reconstruidas)}\n')
 
 
 class LegislativeMonitorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'legislative_monitor'
+
+    def ready(self):
+        from legislative_monitor import checks  # noqa: F401 (registra as verificações)
+
+        post_migrate.connect(_recriar_triggers_fts, sender=self)
@@ -0,0 +1,20 @@
+"""Verificações de sistema (manage.py check --database default; também rodam no migrate)"""
+from django.core import checks
+
+from legislative_monitor.services.busca import triggers_fts_ausentes
+
+
+@checks.register(checks.Tags.database)
+def verificar_triggers_fts(app_configs, databases=None, **kwargs):
+    """Índices FTS5 do SQLite sem os triggers que os mantêm (ver services/busca.py)"""
+    avisos = []
+    for alias in databases or []:
+        for fts, triggers in triggers_fts_ausentes(alias).items():
+            avisos.append(checks.Warning(
+                f'Índice de busca {fts} sem os triggers {", ".join(triggers)}: '
+                f'as gravações não chegam mais a ele',
+                hint='Rode "python manage.py migrate", que recria os triggers e reconstrói o índice.',
+                obj=alias,
+                id='legislative_monitor.W001',
+            ))
+    return avisos
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError, OutputWrapper
+
+from legislative_monitor.services.trava import TravaOcupada, TravaSincronizacao
+
+
+class ComandoTravado(CommandError):
+    """Outra execução detém a trava do comando; ao contrário dos demais CommandError, é transitória"""
+
+
+class SyncBaseCommand(BaseCommand):
+    """
+    Base dos comandos de sincronização: `handle` roda com uma trava entre processos
+    (ver services/trava.py), de modo que duas execuções do mesmo comando nunca se
+    sobrepõem. Sem opções, uma segunda execução falha; --esperar aguarda a trava e
+    --pular-se-travado sai sem erro.
+    """
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        grupo = parser.add_mutually_exclusive_group()
+        grupo.add_argument(
+            '--esperar',
+            '--wait',
+            dest='esperar_trava',
+            type=float,
+            nargs='?',
+            const=-1,
+            default=None,
+            metavar='SEGUNDOS',
+            help='Se outra execução estiver em andamento, espera por ela (sem valor: indefinidamente)',
+        )
+        grupo.add_argument(
+            '--pular-se-travado',
+            '--skip-if-locked',
+            dest='pular_se_travado',
+            action='store_true',
+            help='Se outra execução estiver em andamento, sai sem erro',
+        )
+        return parser
+
+    def nome_trava(self, options):
+        """
+        Execuções com o mesmo nome de trava são mutuamente exclusivas (padrão: nome do
+        comando). None executa sem trava (ex.: modos somente leitura).
+        """
+        return self.__module__.rsplit('.', 1)[-1]
+
+    def execute(self, *args, **options):
+        if options.get('stdout'):
+            self.stdout = OutputWrapper(options['stdout'])
+
+        nome = self.nome_trava(options)
+        if nome is None:
+            return super().execute(*args, **options)
+
+        esperar = options.get('esperar_trava')
+        trava = TravaSincronizacao(
+            nome,
+            espera=0 if esperar is None else (None if esperar < 0 else esperar),
+        )
+        try:
+            trava.adquirir()
+        except TravaOcupada as e:
+            if options.get('pular_se_travado'):
+                self.stdout.write(self.style.WARNING(f'{e}: execução ignorada.'))
+                return ''
+            raise ComandoTravado(f'{e}. Use --esperar para aguardar ou --pular-se-travado para ignorar.')
+
+        try:
+            return super().execute(*args, **options)
+        finally:
+            trava.liberar()
+            self.stdout.write(
+                f'Trava "{trava.nome}": espera {trava.tempo_espera:.1f}s, retida {trava.tempo_retida:.1f}s'
+            )
@@ -0,0 +1,387 @@
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from legislative_monitor.management.base import SyncBaseCommand
+from legislative_monitor.management.commands.sync_proposicoes import CAMPOS_HASH, carregar_mapas_tipo
+from legislative_monitor.models import CheckpointSincronizacao, Deputado, Proposicao
+from legislative_monitor.services.camara_api import CamaraAPIService
+from legislative_monitor.services.dto import AutorAPI, ProposicaoAPI
+from legislative_monitor.services.pipeline import Pipeline
+from legislative_monitor.services.transporte import ErroRequisicaoAPI
+from legislative_monitor.services.upsert import upsert_alterados
+
+
+PREFIXO_CHECKPOINT = 'proposicoes:backfill:'
+
+PRIMEIRO_ANO = 1988
+
+# codTipo dos autores que são deputados em /proposicoes/{id}/autores
+COD_TIPO_DEPUTADO = 10000
+
+# Caracteres finais da saída de um shard mostrados quando ele falha
+TAMANHO_SAIDA = 2000
+
+
+class Command(SyncBaseCommand):
+    help = (
+        'Carga histórica de proposições: divide o intervalo em shards anuais, cada um com '
+        'checkpoint próprio, executados em processos paralelos (ou como tarefas Celery), e ao '
+        'final reconcilia tipos e autores. Cada shard traz as proposições com tramitação no ano '
+        '(dataInicio/dataFim da API), inclusive as apresentadas antes dele; o progresso conta '
+        'dias do shard, e as contagens de proposições são pelo ano de apresentação'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde-ano',
+            type=int,
+            default=PRIMEIRO_ANO,
+            help=f'Primeiro ano (padrão: {PRIMEIRO_ANO})',
+        )
+        parser.add_argument(
+            '--ate-ano',
+            type=int,
+            default=None,
+            help='Último ano (padrão: ano atual)',
+        )
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=None,
+            help='Shards simultâneos, um processo cada (padrão: número de CPUs)',
+        )
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=None,
+            help='Threads coletoras por shard (padrão: CAMARA_API_CONCORRENCIA)',
+        )
+        parser.add_argument(
+            '--janela-dias',
+            type=int,
+            default=30,
+            help='Janela dataInicio/dataFim de cada shard em dias (padrão: 30)',
+        )
+        parser.add_argument(
+            '--celery',
+            action='store_true',
+            help='Despacha os shards como tarefas Celery (reconciliação ao final) e sai',
+        )
+        parser.add_argument(
+            '--progresso',
+            action='store_true',
+            help='Mostra o progresso agregado dos shards e sai',
+        )
+        parser.add_argument(
+            '--apenas-reconciliar',
+            action='store_true',
+            help='Executa só a reconciliação de tipos e autores',
+        )
+        parser.add_argument(
+            '--sem-reconciliar',
+            action='store_true',
+            help='Não executa a reconciliação ao final',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=10,
+            help='Segundos entre as linhas de progresso (padrão: 10)',
+        )
+
+    def nome_trava(self, options):
+        # Consultar o progresso e despachar para o Celery não disputam a trava com a carga
+        # (a reconciliação despachada a obtém ao rodar)
+        if options['progresso'] or options['celery']:
+            return None
+        return super().nome_trava(options)
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        hoje = timezone.localdate()
+        self.desde_ano = options['desde_ano']
+        self.ate_ano = options['ate_ano'] or hoje.year
+        if self.desde_ano > self.ate_ano:
+            raise CommandError('--desde-ano deve ser menor ou igual a --ate-ano')
+        self.shards = {
+            ano: (date(ano, 1, 1), min(date(ano, 12, 31), hoje))
+            for ano in range(self.desde_ano, self.ate_ano + 1)
+        }
+
+        if options['progresso']:
+            self._mostrar_progresso(detalhado=True)
+            return
+
+        if options['celery']:
+            from legislative_monitor.tasks import backfill_proposicoes
+            backfill_proposicoes.delay(self.desde_ano, self.ate_ano)
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(self.shards)} shards enviados ao Celery. Acompanhe com: '
+                f'python manage.py backfill_proposicoes --progresso --desde-ano {self.desde_ano} --ate-ano {self.ate_ano}'
+            ))
+            return
+
+        falhas = []
+        if not options['apenas_reconciliar']:
+            falhas = self._executar_shards(options)
+
+        reconciliacao = None
+        if not options['sem_reconciliar'] and not falhas:
+            reconciliacao = self._reconciliar(options['concorrencia'])
+
+        # Relatório final
+        self.stdout.write('\n' + '='*60)
+        if falhas:
+            self.stdout.write(self.style.ERROR('CARGA HISTÓRICA CONCLUÍDA COM FALHAS'))
+        else:
+            self.stdout.write(self.style.SUCCESS('CARGA HISTÓRICA CONCLUÍDA'))
+        self.stdout.write('='*60)
+        self._mostrar_progresso(detalhado=bool(falhas))
+        if reconciliacao:
+            self.stdout.write(self.style.SUCCESS(f'  • Tipos resolvidos: {reconciliacao["tipos"]}'))
+            self.stdout.write(self.style.SUCCESS(f'  • Autores resolvidos: {reconciliacao["autores"]}'))
+            if reconciliacao['falhas']:
+                self.stdout.write(self.style.ERROR(f'  • Falhas na API durante a reconciliação: {reconciliacao["falhas"]}'))
+        self.stdout.write(f'Tempo total: {time.monotonic() - inicio:.1f}s')
+
+        if falhas:
+            raise CommandError(
+                f'Shards com falha: {", ".join(map(str, falhas))}. Execute novamente para retomá-los '
+                f'do checkpoint (a reconciliação roda quando todos concluírem).'
+            )
+
+    # Shards -----------------------------------------------------------------------
+
+    def _executar_shards(self, options):
+        """Roda os shards pendentes em processos paralelos; retorna os anos que falharam"""
+        concluidos = {ano for ano, progresso in self._progresso().items() if progresso['concluido']}
+        pendentes = [ano for ano in self.shards if ano not in concluidos]
+        processos = options['processos'] or os.cpu_count() or 1
+        self.stdout.write(
+            f'Carga de {self.desde_ano} a {self.ate_ano}: {len(pendentes)} shards pendentes '
+            f'({len(concluidos)} já concluídos), {processos} processos\n'
+        )
+
+        falhas = []
+        with ThreadPoolExecutor(max_workers=processos, thread_name_prefix='backfill') as executor:
+            em_execucao = {executor.submit(self._rodar_shard, ano, options): ano for ano in pendentes}
+            while em_execucao:
+                prontos, _ = wait(em_execucao, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    ano = em_execucao.pop(futuro)
+                    codigo, saida, duracao = futuro.result()
+                    if codigo == 0:
+                        self.stdout.write(self.style.SUCCESS(f'✓ {ano} ({duracao:.1f}s)'))
+                    else:
+                        falhas.append(ano)
+                        self.stdout.write(self.style.ERROR(f'✗ {ano} falhou (código {codigo}, {duracao:.1f}s)'))
+                        for linha in saida[-TAMANHO_SAIDA:].strip().splitlines()[-5:]:
+                            self.stdout.write(f'    {linha}')
+                if em_execucao:
+                    self._mostrar_progresso()
+        return sorted(falhas)
+
+    def _rodar_shard(self, ano, options):
+        """Executado nas threads: um shard (ano) em um processo separado"""
+        inicio_shard, fim_shard = self.shards[ano]
+        argumentos = [
+            'sync_proposicoes',
+            '--desde', inicio_shard.isoformat(),
+            '--ate', fim_shard.isoformat(),
+            '--fonte', f'{PREFIXO_CHECKPOINT}{ano}',
+            '--janela-dias', str(options['janela_dias']),
+            '--esperar',
+        ]
+        if options['concorrencia']:
+            argumentos += ['--concorrencia', str(options['concorrencia'])]
+
+        inicio = time.monotonic()
+        processo = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), *argumentos],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return processo.returncode, processo.stdout, time.monotonic() - inicio
+
+    # Progresso agregado ---------------------------------------------------------------
+
+    def _checkpoints(self):
+        """Checkpoint de cada shard já iniciado, por ano"""
+        consulta = CheckpointSincronizacao.objects.filter(
+            fonte__in=[f'{PREFIXO_CHECKPOINT}{ano}' for ano in self.shards]
+        )
+        return {int(c.fonte[len(PREFIXO_CHECKPOINT):]): c for c in consulta}
+
+    def _progresso(self):
+        """Fração concluída de cada shard, a partir do checkpoint (dias já confirmados)"""
+        checkpoints = self._checkpoints()
+        progresso = {}
+        for ano, (inicio, fim) in self.shards.items():
+            checkpoint = checkpoints.get(ano)
+            total_dias = (fim - inicio).days + 1
+            dias = 0
+            if checkpoint is not None:
+                # Janela em andamento: os dias anteriores a ela já estão gravados
+                ate = checkpoint.janela_inicio - timedelta(days=1) if checkpoint.janela_inicio else checkpoint.watermark
+                dias = (ate - inicio).days + 1 if ate else 0
+            progresso[ano] = {
+                'fracao': min(max(dias, 0), total_dias) / total_dias,
+                'status': checkpoint.status if checkpoint else 'PENDENTE',
+                'concluido': bool(checkpoint and checkpoint.status == 'CONCLUIDO' and checkpoint.watermark
+                                  and checkpoint.watermark >= fim),
+                'pendentes': len(checkpoint.detalhes.get('pendentes', [])) if checkpoint else 0,
+            }
+        return progresso
+
+    def _mostrar_progresso(self, detalhado=False):
+        progresso = self._progresso()
+        dias = {ano: (fim - inicio).days + 1 for ano, (inicio, fim) in self.shards.items()}
+        feito = sum(progresso[ano]['fracao'] * dias[ano] for ano in dias)
+        periodo = (self.shards[self.desde_ano][0], self.shards[self.ate_ano][1])
+        proposicoes = Proposicao.objects.filter(data_apresentacao__range=periodo).count()
+        concluidos = sum(1 for p in progresso.values() if p['concluido'])
+        com_erro = sum(1 for p in progresso.values() if p['status'] == 'ERRO')
+        self.stdout.write(
+            f'Progresso: {100 * feito / sum(dias.values()):.1f}% | shards {concluidos}/{len(progresso)} concluídos'
+            + (f', {com_erro} com erro' if com_erro else '')
+            + f' | {proposicoes} proposições apresentadas no período'
+        )
+        if not detalhado:
+            return
+
+        por_ano = dict(
+            Proposicao.objects.filter(data_apresentacao__range=periodo)
+            .values_list('data_apresentacao__year').annotate(total=Count('id'))
+        )
+        for ano, p in progresso.items():
+            estilo = self.style.SUCCESS if p['concluido'] else self.style.ERROR if p['status'] == 'ERRO' else str
+            pendentes = f', {p["pendentes"]} pendentes' if p['pendentes'] else ''
+            self.stdout.write(estilo(
+                f'  • {ano}: {100 * p["fracao"]:5.1f}% {p["status"]:<12} {por_ano.get(ano, 0):>7} proposições{pendentes}'
+            ))
+
+    # Reconciliação ------------------------------------------------------------------
+
+    def _reconciliar(self, concorrencia):
+        """
+        Depois dos shards: resolve o tipo das proposições gravadas sem tipo (sincronizando
+        os tipos antes) e o autor (primeiro deputado proponente) das que estão sem autor.
+        Em cada shard, só revisita o que mudou desde a reconciliação anterior. Os shards trazem
+        proposições por tramitação, que podem ter sido apresentadas antes do primeiro ano:
+        ele cobre também essas datas.
+        """
+        self.stdout.write('\nReconciliando tipos e autores...')
+        checkpoints = self._checkpoints()
+        periodo = Q()
+        for ano, (inicio, fim) in self.shards.items():
+            checkpoint = checkpoints.get(ano)
+            ultima = checkpoint.detalhes.get('reconciliado_em') if checkpoint else None
+            if ano == self.desde_ano:
+                filtro = Q(data_apresentacao__lte=fim)
+            else:
+                filtro = Q(data_apresentacao__range=(inicio, fim))
+            periodo |= (filtro & Q(updated_at__gte=ultima)) if ultima else filtro
+        proposicoes = Proposicao.objects.filter(Q(tipo__isnull=True) | Q(autor__isnull=True)).filter(periodo)
+
+        if proposicoes.filter(tipo__isnull=True).exists():
+            call_command('sync_tipos_proposicao', esperar_trava=-1, stdout=io.StringIO())
+
+        self.api = CamaraAPIService()
+        self.mapas_tipo = carregar_mapas_tipo()
+        self.mapa_deputados = dict(Deputado.objects.values_list('id_deputado', 'id'))
+        self.resolvidos = {'tipos': 0, 'autores': 0}
+
+        pipeline = Pipeline(
+            buscar=self._buscar_reconciliacao,
+            normalizar=self._normalizar_reconciliacao,
+            gravar=self._gravar_reconciliacao,
+            coletores=concorrencia,
+            erros_item=(ErroRequisicaoAPI,),
+        )
+        # Lista materializada: um cursor aberto na thread do alimentador manteria a leitura
+        # ativa durante os commits do gravador (no SQLite, "database is locked")
+        estatisticas = pipeline.executar(
+            list(proposicoes.values_list('id', 'id_proposicao', 'tipo_id', 'autor_id'))
+        )
+
+        # Marca tomada depois das gravações, para não revisitar as linhas que acabaram de ser
+        # atualizadas; com falhas, a próxima reconciliação volta a olhar o mesmo período
+        if not estatisticas.falhas:
+            marca = timezone.now().isoformat()
+            for checkpoint in checkpoints.values():
+                checkpoint.detalhes['reconciliado_em'] = marca
+                checkpoint.save(update_fields=['detalhes', 'updated_at'])
+        return {**self.resolvidos, 'falhas': estatisticas.falhas}
+
+    def _buscar_reconciliacao(self, item):
+        """Coletores: detalhe (se falta o tipo) e autores (se falta o autor)"""
+        _, id_proposicao, tipo_id, autor_id = item
+        detalhe = autores = None
+        if tipo_id is None:
+            resposta = self.api.obter_proposicao(id_proposicao)
+            if resposta is None:
+                raise ErroRequisicaoAPI(f'Detalhe da proposição {id_proposicao} indisponível')
+            if resposta.get('dados'):
+                detalhe = ProposicaoAPI.de_api(resposta['dados'])
+        if autor_id is None:
+            resposta = self.api.listar_autores_proposicao(id_proposicao)
+            if resposta is None:
+                raise ErroRequisicaoAPI(f'Autores da proposição {id_proposicao} indisponíveis')
+            autores = [AutorAPI.de_api(autor) for autor in resposta.get('dados') or []]
+        return detalhe, autores
+
+    def _normalizar_reconciliacao(self, item, bruto):
+        """Normalizador: (pk, tipo_id, autor_id) resolvidos; None onde não houve correspondência"""
+        pk = item[0]
+        detalhe, autores = bruto
+        tipo_id = autor_id = None
+        if detalhe:
+            tipo_id = (
+                self.mapas_tipo['cod'].get(detalhe.cod_tipo)
+                or self.mapas_tipo['sigla'].get(detalhe.sigla_tipo)
+            )
+        if autores:
+            # Proponentes primeiro, na ordem de assinatura; só autores que são deputados no banco
+            for autor in sorted(autores, key=lambda a: (not a.proponente, a.ordem_assinatura)):
+                if autor.cod_tipo != COD_TIPO_DEPUTADO or autor.id_deputado is None:
+                    continue
+                autor_id = self.mapa_deputados.get(autor.id_deputado)
+                if autor_id is not None:
+                    break
+        if tipo_id is None and autor_id is None:
+            return []
+        return [(pk, tipo_id, autor_id)]
+
+    def _gravar_reconciliacao(self, resolvidos, _):
+        """
+        Gravador: grava tipo e autor resolvidos com o mesmo hash do sync_proposicoes, para
+        que a próxima sincronização não regrave as linhas reconciliadas
+        """
+        proposicoes = Proposicao.objects.in_bulk([pk for pk, _, _ in resolvidos])
+        for pk, tipo_id, autor_id in resolvidos:
+            proposicao = proposicoes[pk]
+            if tipo_id is not None:
+                proposicao.tipo_id = tipo_id
+                self.resolvidos['tipos'] += 1
+            if autor_id is not None:
+                proposicao.autor_id = autor_id
+                self.resolvidos['autores'] += 1
+        with transaction.atomic():
+            upsert_alterados(
+                Proposicao, list(proposicoes.values()), 'id_proposicao', ['tipo', 'autor'],
+                campos_hash=CAMPOS_HASH,
+            )
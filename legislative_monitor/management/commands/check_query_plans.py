@@ -0,0 +1,227 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from legislative_monitor.models import Deputado, Discurso, Proposicao, Votacao, VotoDeputado
+from legislative_monitor.services.busca import buscar_por_nome, buscar_proposicoes
+from legislative_monitor.services.paginacao import KeysetPaginator
+from legislative_monitor.views import ORDENACAO_PROPOSICOES, ORDENACAO_VOTACOES, filtro_tipo
+
+
+# Linha de plano que lê a tabela inteira: "Seq Scan on x" (PostgreSQL) ou "SCAN x" (SQLite).
+# No SQLite, "SCAN x USING [COVERING] INDEX i" também percorre a tabela toda, só que na ordem
+# do índice (grupo `ordenada`); apenas SEARCH localiza as linhas pelo índice. Tabelas
+# virtuais FTS5 aparecem como "SCAN x VIRTUAL TABLE INDEX" e são filtradas pelo MATCH.
+VARREDURA = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(
+        r'\bSCAN (?:TABLE )?(\w+)\b(?! VIRTUAL TABLE\b)(?P<ordenada> USING (?:COVERING )?INDEX\b)?'
+    ),
+}
+
+# Ordenação feita em memória porque nenhum índice entrega as linhas na ordem pedida:
+# nó "Sort"/"Incremental Sort" (PostgreSQL) ou "USE TEMP B-TREE FOR ... ORDER BY" (SQLite)
+ORDENACAO = {
+    'postgresql': re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b(?! Key\b)', re.MULTILINE),
+    'sqlite': re.compile(r'\bUSE TEMP B-TREE FOR (?:RIGHT PART OF |LAST \d+ TERMS OF )?ORDER BY\b'),
+}
+
+
+@dataclass
+class Consulta:
+    """
+    Consulta canônica de uma view. `permitir_varredura_ordenada` só vale para listas sem
+    filtro com LIMIT: percorrer o índice da ordenação e parar após n linhas é o plano certo.
+    `permitir_ordenacao` só vale para ordenações que nenhum índice entrega (relevância)
+    """
+    nome: str
+    queryset: QuerySet
+    permitir_varredura_ordenada: bool = False
+    permitir_ordenacao: bool = False
+
+
+def consultas_canonicas():
+    """
+    Consultas das views, com os mesmos filtros e ordenação. Ao mudar uma view, atualize
+    a consulta correspondente aqui.
+    """
+    proposicoes = Proposicao.objects.select_related('tipo', 'autor')
+    return [
+        # legislative_monitor.views.listar_proposicoes
+        Consulta('proposicoes', _primeira_pagina(proposicoes, ORDENACAO_PROPOSICOES), permitir_varredura_ordenada=True),
+        Consulta(
+            'proposicoes?situacao',
+            _primeira_pagina(proposicoes.filter(situacao='EM_TRAMITACAO'), ORDENACAO_PROPOSICOES),
+        ),
+        Consulta('proposicoes?ano', _primeira_pagina(proposicoes.filter(ano=2024), ORDENACAO_PROPOSICOES)),
+        Consulta(
+            'proposicoes?tipo',
+            _primeira_pagina(proposicoes.filter(**_filtro_tipo(cod='139')), ORDENACAO_PROPOSICOES),
+        ),
+        Consulta(
+            'proposicoes?tipo_sigla',
+            _primeira_pagina(proposicoes.filter(**_filtro_tipo(sigla='PL')), ORDENACAO_PROPOSICOES),
+        ),
+        Consulta(
+            'proposicoes?cursor',
+            _pagina_seguinte(proposicoes, ORDENACAO_PROPOSICOES, [date(2024, 1, 1), 1]),
+        ),
+        Consulta(
+            'proposicoes?tipo&cursor',
+            _pagina_seguinte(
+                proposicoes.filter(**_filtro_tipo(sigla='PL')), ORDENACAO_PROPOSICOES, [date(2024, 1, 1), 1],
+            ),
+        ),
+        Consulta('proposicoes?q', buscar_proposicoes('saude', proposicoes)[:20], permitir_ordenacao=True),
+        Consulta(
+            'proposicoes:anos',
+            Proposicao.objects.values_list('ano', flat=True).distinct().order_by('-ano')[:10],
+            permitir_varredura_ordenada=True,
+        ),
+        # detalhe_deputado e perfil_parlamentar
+        Consulta('deputado:proposicoes', Proposicao.objects.filter(autor_id=1).select_related('tipo')[:10]),
+        Consulta('deputado:discursos', Discurso.objects.filter(deputado_id=1)[:10]),
+        Consulta('perfil:votos', VotoDeputado.objects.filter(deputado_id=1, voto='SIM')),
+        # detalhe_partido
+        # Proposições de vários autores: a ordem junta as de cada um, sem índice que sirva
+        Consulta(
+            'partido:proposicoes',
+            Proposicao.objects.filter(autor__sigla_partido_id=1).select_related('tipo', 'autor')[:10],
+            permitir_ordenacao=True,
+        ),
+        # listar_deputados
+        Consulta(
+            'deputados',
+            Deputado.objects.select_related('sigla_partido', 'uf_representacao', 'sexo')[:20],
+            permitir_varredura_ordenada=True,
+        ),
+        # Sigla de partido não é única: ordena no máximo os deputados da legislatura
+        Consulta(
+            'deputados?partido',
+            Deputado.objects.filter(sigla_partido__sigla='PT')[:20],
+            permitir_ordenacao=True,
+        ),
+        Consulta('deputados?uf', Deputado.objects.filter(uf_representacao__sigla='SP')[:20]),
+        Consulta(
+            'deputados?q', buscar_por_nome(Deputado.objects.all(), 'joao silva')[:20], permitir_ordenacao=True,
+        ),
+        # listar_votacoes, detalhe_proposicao e detalhe_votacao
+        Consulta(
+            'votacoes',
+            _primeira_pagina(Votacao.objects.all(), ORDENACAO_VOTACOES),
+            permitir_varredura_ordenada=True,
+        ),
+        Consulta('votacoes?cursor', _pagina_seguinte(
+            Votacao.objects.all(), ORDENACAO_VOTACOES, [datetime(2024, 1, 1, tzinfo=timezone.utc), 1],
+        )),
+        Consulta('proposicao:votacoes', Votacao.objects.filter(proposicao_id=1)),
+        Consulta('votacao:votos', VotoDeputado.objects.filter(votacao_id=1).select_related('deputado')),
+        # admin de discursos
+        Consulta('discursos', Discurso.objects.select_related('deputado')[:20], permitir_varredura_ordenada=True),
+    ]
+
+
+def _primeira_pagina(queryset, ordenacao):
+    """Consulta de KeysetPaginator.get_page sem cursor"""
+    paginator = KeysetPaginator(queryset, 20, ordenacao)
+    return paginator.queryset.order_by(*paginator.ordenacao)[:21]
+
+
+def _filtro_tipo(**kwargs):
+    """
+    Filtro de tipo da view. Em bases sem o tipo (CI), usa a forma de um tipo só, a que
+    a view gera na prática: `tipo_id__in=[]` não chega ao banco
+    """
+    filtro = filtro_tipo(**kwargs)
+    if filtro.get('tipo_id__in') == []:
+        return {'tipo_id': 1}
+    return filtro
+
+
+def _pagina_seguinte(queryset, ordenacao, valores):
+    """Consulta de KeysetPaginator.get_page para um cursor que aponta para `valores`"""
+    return KeysetPaginator(queryset, 20, ordenacao).consulta_apos(valores)[:21]
+
+
+class Command(BaseCommand):
+    help = (
+        'Roda EXPLAIN nas consultas canônicas das views e falha se alguma fizer varredura '
+        'sequencial de tabela ou ordenar sem índice (use no CI para manter a cobertura dos índices)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'nomes',
+            nargs='*',
+            help='Verifica apenas estas consultas (padrão: todas)',
+        )
+        parser.add_argument(
+            '--mostrar-planos',
+            action='store_true',
+            help='Imprime o plano de cada consulta',
+        )
+        parser.add_argument(
+            '--permitir',
+            nargs='+',
+            default=[],
+            metavar='TABELA',
+            help='Tabelas em que a varredura sequencial é aceita (ex.: tabelas pequenas de referência)',
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in VARREDURA:
+            raise CommandError(f'Banco "{vendor}" não suportado (apenas PostgreSQL e SQLite)')
+
+        consultas = consultas_canonicas()
+        if options['nomes']:
+            desconhecidas = set(options['nomes']) - {consulta.nome for consulta in consultas}
+            if desconhecidas:
+                raise CommandError(f'Consultas desconhecidas: {", ".join(sorted(desconhecidas))}')
+            consultas = [consulta for consulta in consultas if consulta.nome in options['nomes']]
+
+        permitidas = set(options['permitir'])
+        falhas = []
+        for consulta in consultas:
+            plano = self._explicar(consulta.queryset)
+            tabelas = [
+                varredura.group(1) for varredura in VARREDURA[vendor].finditer(plano)
+                if varredura.group(1) not in permitidas
+                and not (consulta.permitir_varredura_ordenada and varredura.groupdict().get('ordenada'))
+            ]
+            problemas = []
+            if tabelas:
+                problemas.append(f'varredura em {", ".join(tabelas)}')
+            if not consulta.permitir_ordenacao and ORDENACAO[vendor].search(plano):
+                problemas.append('ordenação sem índice')
+            if problemas:
+                falhas.append(consulta.nome)
+                self.stdout.write(self.style.ERROR(f'✗ {consulta.nome}: {"; ".join(problemas)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {consulta.nome}'))
+            if options['mostrar_planos'] or problemas:
+                for linha in plano.splitlines():
+                    self.stdout.write(f'    {linha}')
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(f'Consultas verificadas: {len(consultas)}')
+        if falhas:
+            raise CommandError(f'{len(falhas)} consulta(s) sem índice: {", ".join(falhas)}')
+        self.stdout.write(self.style.SUCCESS('Todas as consultas usam índices'))
+
+    def _explicar(self, queryset):
+        """
+        Plano da consulta. No PostgreSQL a varredura sequencial é desencorajada, pois em
+        bases pequenas (desenvolvimento, CI) o planejador a prefere mesmo havendo índice;
+        assim ela só aparece quando nenhum índice serve.
+        """
+        if connection.vendor != 'postgresql':
+            return queryset.explain()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from legislative_monitor.services.camara_sintetica import DadosSinteticosCamara, ServidorCamaraSintetica
+
+
+class Command(BaseCommand):
+    help = 'Sobe um servidor local que imita a API da Câmara com dados sintéticos (benchmark das sincronizações)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1)')
+        parser.add_argument('--porta', type=int, default=8765, help='Porta de escuta (padrão: 8765)')
+        parser.add_argument('--deputados', type=int, default=513, help='Quantidade de deputados')
+        parser.add_argument('--proposicoes', type=int, default=200_000, help='Quantidade de proposições')
+        parser.add_argument('--votacoes', type=int, default=10_000, help='Quantidade de votações')
+        parser.add_argument(
+            '--discursos-por-deputado',
+            type=int,
+            default=100,
+            help='Discursos de cada deputado na legislatura',
+        )
+        parser.add_argument(
+            '--tamanho-transcricao',
+            type=int,
+            default=4000,
+            help='Tamanho aproximado (caracteres) de cada transcrição',
+        )
+        parser.add_argument('--semente', type=int, default=42, help='Semente dos dados gerados')
+        parser.add_argument('--latencia-ms', type=float, default=0, help='Latência injetada em cada resposta')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Variação aleatória (±) da latência')
+        parser.add_argument(
+            '--taxa-erro',
+            type=float,
+            default=0.0,
+            help='Fração das requisições respondidas com HTTP 503 (0 a 1)',
+        )
+
+    def handle(self, *args, **options):
+        dados = DadosSinteticosCamara(
+            deputados=options['deputados'],
+            proposicoes=options['proposicoes'],
+            votacoes=options['votacoes'],
+            discursos_por_deputado=options['discursos_por_deputado'],
+            tamanho_transcricao=options['tamanho_transcricao'],
+            semente=options['semente'],
+        )
+        servidor = ServidorCamaraSintetica(
+            (options['host'], options['porta']),
+            dados,
+            latencia_ms=options['latencia_ms'],
+            jitter_ms=options['jitter_ms'],
+            taxa_erro=options['taxa_erro'],
+        )
+        
+        base_url = f"http://{options['host']}:{servidor.server_address[1]}/api/v2"
+        self.stdout.write(self.style.SUCCESS(f'API sintética da Câmara em {base_url}'))
+        self.stdout.write(
+            f'  • {dados.n_deputados} deputados, {dados.n_proposicoes} proposições, '
+            f'{dados.n_votacoes} votações (semente {dados.semente})'
+        )
+        self.stdout.write(
+            f'  • Latência {options["latencia_ms"]}ms ±{options["jitter_ms"]}ms, '
+            f'taxa de erro {options["taxa_erro"]:.1%}'
+        )
+        self.stdout.write(f'\nPara sincronizar contra este servidor: CAMARA_API_BASE_URL={base_url}')
+        self.stdout.write('Ctrl+C para encerrar.')
+        
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+            self.stdout.write(f'\nServidor encerrado ({servidor.requisicoes} requisições atendidas)')
@@ -0,0 +1,235 @@
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from legislative_monitor.management.base import SyncBaseCommand
+from legislative_monitor.models import EtapaSincronizacao
+
+
+# Grafo de etapas: (nome, argumentos do manage.py, dependências), em ordem topológica.
+# "{hoje}" é substituído pela data de início da execução.
+ETAPAS = [
+    ('regioes', ['sync_ibge_localidades', '--apenas-regioes'], []),
+    ('estados', ['sync_ibge_localidades', '--apenas-estados'], ['regioes']),
+    ('municipios', ['sync_ibge_localidades', '--apenas-municipios'], ['estados']),
+    ('partidos', ['sync_partidos', '--detalhes'], []),
+    ('tipos', ['sync_tipos_proposicao'], []),
+    ('sexo', ['populate_sexo'], []),
+    # Deputados resolvem UF e município de nascimento: dependem também das localidades
+    ('deputados', ['sync_deputados'], ['partidos', 'tipos', 'sexo', 'municipios']),
+    ('proposicoes', ['sync_proposicoes'], ['deputados']),
+    # Só as proposições gravadas/alteradas nesta execução (updated_at muda apenas com o conteúdo)
+    ('votacoes', ['sync_votacoes', '--atualizadas-desde', '{hoje}'], ['proposicoes']),
+]
+
+# Caracteres finais da saída de cada etapa guardados no banco
+TAMANHO_SAIDA = 4000
+
+
+class Command(SyncBaseCommand):
+    help = (
+        'Executa todas as sincronizações respeitando o grafo de dependências; etapas '
+        'independentes rodam em paralelo, cada uma em um processo'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--etapas',
+            nargs='+',
+            choices=[nome for nome, _, _ in ETAPAS],
+            help='Executa apenas estas etapas (dependências fora da seleção são consideradas prontas)',
+        )
+        parser.add_argument(
+            '--paralelismo',
+            type=int,
+            default=None,
+            help='Máximo de etapas simultâneas (padrão: todas as que estiverem prontas)',
+        )
+        parser.add_argument(
+            '--retomar',
+            action='store_true',
+            help='Reaproveita a última execução, rodando apenas as etapas que não concluíram',
+        )
+        parser.add_argument(
+            '--listar',
+            action='store_true',
+            help='Mostra o grafo de etapas e sai',
+        )
+
+    def nome_trava(self, options):
+        return None if options['listar'] else super().nome_trava(options)
+
+    def handle(self, *args, **options):
+        if options['listar']:
+            for nome, argumentos, dependencias in ETAPAS:
+                self.stdout.write(f'{nome:<12} {" ".join(argumentos):<50} <- {", ".join(dependencias) or "-"}')
+            return
+
+        inicio = time.monotonic()
+        selecionadas = options['etapas'] or [nome for nome, _, _ in ETAPAS]
+        self.grafo = {
+            nome: (argumentos, [d for d in dependencias if d in selecionadas])
+            for nome, argumentos, dependencias in ETAPAS
+            if nome in selecionadas
+        }
+        self.execucao, self.registros = self._preparar_execucao(options['retomar'])
+        self.hoje = timezone.localdate().isoformat()
+
+        pendentes = [nome for nome in self.grafo if self.registros[nome].status != 'CONCLUIDO']
+        concluidas = {nome for nome in self.grafo if nome not in pendentes}
+        if concluidas:
+            self.stdout.write(f'Etapas já concluídas nesta execução: {", ".join(sorted(concluidas))}')
+        self.stdout.write(f'Execução {self.execucao}: {len(pendentes)} etapas\n')
+
+        paralelismo = options['paralelismo'] or len(self.grafo)
+        with ThreadPoolExecutor(max_workers=paralelismo, thread_name_prefix='sync_all') as executor:
+            em_execucao = {}
+            while pendentes or em_execucao:
+                # Dispara as etapas cujas dependências já concluíram
+                for nome in list(pendentes):
+                    if len(em_execucao) >= paralelismo:
+                        break
+                    if all(d in concluidas for d in self.grafo[nome][1]):
+                        pendentes.remove(nome)
+                        em_execucao[self._iniciar(executor, nome)] = nome
+
+                if not em_execucao:
+                    break
+                prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    nome = em_execucao.pop(futuro)
+                    if self._finalizar(nome, *futuro.result()):
+                        concluidas.add(nome)
+                    else:
+                        for dependente in self._dependentes(nome):
+                            if dependente in pendentes:
+                                pendentes.remove(dependente)
+                                self._marcar(dependente, status='IGNORADO')
+
+        self._relatorio(time.monotonic() - inicio)
+
+        falhas = [nome for nome in self.grafo if self.registros[nome].status in ('ERRO', 'IGNORADO')]
+        if falhas:
+            raise CommandError(
+                f'Etapas não concluídas: {", ".join(falhas)}. Use --retomar para executá-las novamente.'
+            )
+
+    # Execução das etapas --------------------------------------------------------
+
+    def _preparar_execucao(self, retomar):
+        """Cria (ou reaproveita, com --retomar) os registros de status de cada etapa"""
+        execucao = None
+        if retomar:
+            execucao = (
+                EtapaSincronizacao.objects.order_by('-execucao')
+                .values_list('execucao', flat=True).first()
+            )
+            if execucao is None:
+                self.stdout.write(self.style.WARNING('Nenhuma execução anterior: iniciando uma nova.'))
+        execucao = execucao or timezone.localtime().strftime('%Y%m%d-%H%M%S')
+
+        registros = {e.etapa: e for e in EtapaSincronizacao.objects.filter(execucao=execucao)}
+        for nome, (argumentos, dependencias) in self.grafo.items():
+            if nome not in registros:
+                registros[nome] = EtapaSincronizacao.objects.create(
+                    execucao=execucao,
+                    etapa=nome,
+                    comando=' '.join(argumentos),
+                    dependencias=dependencias,
+                )
+        return execucao, registros
+
+    def _iniciar(self, executor, nome):
+        argumentos = [a.format(hoje=self.hoje) for a in self.grafo[nome][0]]
+        if argumentos[0].startswith('sync_'):
+            # Execução avulsa do mesmo comando em andamento (ex.: cron): aguarda em vez de falhar
+            argumentos.append('--esperar')
+        self._marcar(
+            nome, status='EM_ANDAMENTO', inicio=timezone.now(), fim=None,
+            duracao=None, codigo_saida=None, saida='', comando=' '.join(argumentos),
+        )
+        self.stdout.write(f'▶ {nome}: {" ".join(argumentos)}')
+        return executor.submit(self._rodar, argumentos)
+
+    def _rodar(self, argumentos):
+        """Executado nas threads: roda o comando em um processo separado"""
+        inicio = time.monotonic()
+        processo = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), *argumentos],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        return processo.returncode, processo.stdout, time.monotonic() - inicio
+
+    def _finalizar(self, nome, codigo, saida, duracao):
+        sucesso = codigo == 0
+        self._marcar(
+            nome, status='CONCLUIDO' if sucesso else 'ERRO', fim=timezone.now(),
+            duracao=duracao, codigo_saida=codigo, saida=saida[-TAMANHO_SAIDA:],
+        )
+        if sucesso:
+            self.stdout.write(self.style.SUCCESS(f'✓ {nome} ({duracao:.1f}s)'))
+        else:
+            self.stdout.write(self.style.ERROR(f'✗ {nome} falhou (código {codigo}, {duracao:.1f}s)'))
+            for linha in saida.strip().splitlines()[-10:]:
+                self.stdout.write(f'    {linha}')
+        return sucesso
+
+    def _marcar(self, nome, **campos):
+        registro = self.registros[nome]
+        for campo, valor in campos.items():
+            setattr(registro, campo, valor)
+        registro.save(update_fields=[*campos, 'updated_at'])
+
+    def _dependentes(self, nome):
+        """Etapas que dependem, direta ou indiretamente, de `nome`"""
+        encontrados = set()
+        for outra, (_, dependencias) in self.grafo.items():
+            if nome in dependencias:
+                encontrados.add(outra)
+                encontrados |= self._dependentes(outra)
+        return encontrados
+
+    # Relatório ------------------------------------------------------------------
+
+    def _caminho_critico(self):
+        """Cadeia de dependências com a maior soma de durações (etapas em ordem topológica)"""
+        custo, anterior = {}, {}
+        for nome, (_, dependencias) in self.grafo.items():
+            origem = max(dependencias, key=lambda d: custo[d], default=None)
+            anterior[nome] = origem
+            custo[nome] = (self.registros[nome].duracao or 0) + (custo[origem] if origem else 0)
+
+        fim = max(custo, key=custo.get)
+        caminho = [fim]
+        while anterior[caminho[-1]]:
+            caminho.append(anterior[caminho[-1]])
+        return list(reversed(caminho)), custo[fim]
+
+    def _relatorio(self, duracao_total):
+        self.stdout.write('\n' + '='*60)
+        if all(self.registros[nome].status == 'CONCLUIDO' for nome in self.grafo):
+            self.stdout.write(self.style.SUCCESS('SINCRONIZAÇÃO CONCLUÍDA'))
+        else:
+            self.stdout.write(self.style.ERROR('SINCRONIZAÇÃO CONCLUÍDA COM FALHAS'))
+        self.stdout.write('='*60)
+        for nome in self.grafo:
+            registro = self.registros[nome]
+            duracao = f'{registro.duracao:.1f}s' if registro.duracao is not None else '-'
+            estilo = {
+                'CONCLUIDO': self.style.SUCCESS, 'ERRO': self.style.ERROR, 'IGNORADO': self.style.WARNING,
+            }.get(registro.status, str)
+            self.stdout.write(estilo(f'  • {nome:<12} {registro.get_status_display():<32} {duracao:>8}'))
+
+        caminho, duracao_caminho = self._caminho_critico()
+        soma = sum(self.registros[nome].duracao or 0 for nome in self.grafo)
+        self.stdout.write(f'\nCaminho crítico: {" → ".join(caminho)} ({duracao_caminho:.1f}s)')
+        self.stdout.write(f'Soma das etapas: {soma:.1f}s')
+        self.stdout.write(f'Tempo total: {duracao_total:.1f}s')
@@ -0,0 +1,198 @@
+import time
+
+from django.db import connection, transaction
+
+from legislative_monitor.management.base import SyncBaseCommand
+from legislative_monitor.models import Deputado, Estado, Municipio, Partido, Sexo
+from legislative_monitor.services.camara_api import CamaraAPIService
+from legislative_monitor.services.camara_api_async import buscar_detalhes
+from legislative_monitor.services.dto import DeputadoAPI
+from legislative_monitor.services.texto import normalizar
+from legislative_monitor.services.transporte import ErroRequisicaoAPI
+from legislative_monitor.services.upsert import ResultadoUpsert, upsert_alterados
+
+
+# Campos vindos da listagem (sempre disponíveis); nome_busca combina o nome com o nome civil
+# do detalhe ou, se o detalhe falhou, com o já gravado
+CAMPOS_RESUMO = ['nome', 'sigla_partido', 'uf_representacao', 'email', 'url_foto', 'nome_busca', 'updated_at']
+
+# Campos que só existem no detalhe; deputados cujo detalhe falhou não têm esses campos sobrescritos
+CAMPOS_DETALHE = CAMPOS_RESUMO + [
+    'nome_civil', 'cpf', 'sexo', 'data_nascimento', 'municipio_nascimento', 'uf_nascimento',
+    'situacao', 'condicao_eleitoral', 'url_website',
+]
+
+
+class ContadorSQL:
+    """execute_wrapper que conta os comandos SQL emitidos"""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+class Command(SyncBaseCommand):
+    help = 'Sincroniza deputados da API da Câmara dos Deputados (detalhes em paralelo e gravação em lote)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--legislatura',
+            type=int,
+            help='ID da legislatura (padrão: deputados em exercício)',
+        )
+        parser.add_argument(
+            '--uf',
+            help='Sincroniza apenas os deputados de uma UF',
+        )
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=None,
+            help='Requisições de detalhes simultâneas (padrão: CAMARA_API_CONCORRENCIA)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=200,
+            help='Registros por INSERT em lote (padrão: 200)',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        contador_sql = ContadorSQL()
+        
+        self.stdout.write('Iniciando sincronização de deputados...\n')
+        api = CamaraAPIService()
+        
+        filtros = {}
+        if options['legislatura']:
+            filtros['idLegislatura'] = options['legislatura']
+        if options['uf']:
+            filtros['siglaUf'] = options['uf']
+        
+        # 1. Lista de deputados (todas as páginas)
+        self.stdout.write('Buscando lista de deputados da API...')
+        try:
+            deputados_api = list(api.iter_deputados(**filtros))
+        except ErroRequisicaoAPI as e:
+            self.stdout.write(self.style.ERROR(f'Erro ao buscar deputados da API: {e}'))
+            return
+        total = len(deputados_api)
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} deputados encontrados'))
+        
+        # 2. Detalhes em paralelo
+        t_detalhes = time.monotonic()
+        resultados = buscar_detalhes(
+            [d['id'] for d in deputados_api],
+            metodo='obter_deputado',
+            concorrencia=options['concorrencia'],
+            api=api,
+        )
+        falhas_detalhe = sum(1 for r in resultados if not r.ok)
+        self.stdout.write(
+            f'✓ Detalhes obtidos em {time.monotonic() - t_detalhes:.1f}s'
+            + (f' ({falhas_detalhe} falhas, usando dados resumidos)' if falhas_detalhe else '')
+        )
+        
+        with connection.execute_wrapper(contador_sql):
+            # 3. Mapas de referência carregados uma única vez
+            mapas = self._carregar_mapas()
+            
+            # 4. Montagem dos objetos sem consultas por linha
+            completos, resumidos = [], []
+            for resumo, resultado in zip(deputados_api, resultados):
+                detalhe = resultado.dados.get('dados') if resultado.ok and resultado.dados else None
+                registro = DeputadoAPI.de_api(resumo, detalhe)
+                destino = completos if registro.completo else resumidos
+                destino.append(self._montar_deputado(registro, mapas))
+            self._completar_nome_busca(resumidos)
+            deputados = completos + resumidos
+            
+            # 5. Upsert em lote apenas dos deputados com conteúdo alterado
+            t_gravacao = time.monotonic()
+            resultado = ResultadoUpsert()
+            with transaction.atomic():
+                # Hash sempre sobre CAMPOS_DETALHE: nos resumidos, valem os detalhes já gravados
+                for objetos, campos in ((completos, CAMPOS_DETALHE), (resumidos, CAMPOS_RESUMO)):
+                    resultado += upsert_alterados(
+                        Deputado, objetos, 'id_deputado', campos, lote=options['lote'],
+                        campos_hash=CAMPOS_DETALHE,
+                    )
+            duracao_gravacao = time.monotonic() - t_gravacao
+        
+        sem_partido = sum(1 for d in deputados if d.sigla_partido_id is None)
+        sem_uf = sum(1 for d in deputados if d.uf_representacao_id is None)
+        
+        # Relatório final
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('SINCRONIZAÇÃO CONCLUÍDA'))
+        self.stdout.write('='*60)
+        self.stdout.write(f'Total processado: {total}')
+        self.stdout.write(self.style.SUCCESS(f'  • Criados: {resultado.criados}'))
+        self.stdout.write(self.style.WARNING(f'  • Atualizados: {resultado.atualizados}'))
+        self.stdout.write(f'  • Inalterados: {resultado.inalterados}')
+        if falhas_detalhe:
+            self.stdout.write(self.style.ERROR(f'  • Falhas ao obter detalhes: {falhas_detalhe}'))
+        if sem_partido or sem_uf:
+            self.stdout.write(self.style.WARNING(
+                f'  • Sem partido/UF correspondente no banco: {sem_partido}/{sem_uf} '
+                '(rode sync_partidos e sync_ibge_localidades antes)'
+            ))
+        self.stdout.write(f'\nComandos SQL executados: {contador_sql.total}')
+        self.stdout.write(f'Gravação em lote: {duracao_gravacao:.2f}s')
+        self.stdout.write(f'Tempo total: {time.monotonic() - inicio:.1f}s')
+    
+    def _carregar_mapas(self):
+        """Dicionários sigla/nome -> pk para resolver as chaves estrangeiras em memória"""
+        return {
+            'partidos': dict(Partido.objects.values_list('sigla', 'id')),
+            'estados': dict(Estado.objects.values_list('sigla', 'id')),
+            'sexos': dict(Sexo.objects.values_list('sigla', 'id')),
+            'municipios': {
+                (normalizar(nome), estado_id): pk
+                for pk, nome, estado_id in Municipio.objects.values_list('id', 'nome', 'estado_id')
+            },
+        }
+    
+    def _montar_deputado(self, registro, mapas):
+        """Cria a instância (não salva) a partir do DeputadoAPI; campos do detalhe só se `completo`"""
+        deputado = Deputado(
+            id_deputado=registro.id,
+            nome=registro.nome,
+            sigla_partido_id=mapas['partidos'].get(registro.sigla_partido),
+            uf_representacao_id=mapas['estados'].get(registro.sigla_uf),
+            email=registro.email,
+            url_foto=registro.url_foto,
+        )
+        
+        if registro.completo:
+            uf_nascimento_id = mapas['estados'].get(registro.uf_nascimento)
+            deputado.nome_civil = registro.nome_civil
+            deputado.cpf = registro.cpf
+            deputado.sexo_id = mapas['sexos'].get(registro.sexo)
+            deputado.data_nascimento = registro.data_nascimento
+            deputado.uf_nascimento_id = uf_nascimento_id
+            deputado.municipio_nascimento_id = mapas['municipios'].get(
+                (normalizar(registro.municipio_nascimento), uf_nascimento_id)
+            )
+            deputado.situacao = registro.situacao
+            deputado.condicao_eleitoral = registro.condicao_eleitoral
+            deputado.url_website = registro.url_website
+        
+        deputado.atualizar_nome_busca()
+        return deputado
+    
+    def _completar_nome_busca(self, resumidos):
+        """Deputados sem detalhe: nome_busca com o nome civil já gravado (uma consulta)"""
+        if not resumidos:
+            return
+        nomes_civis = dict(
+            Deputado.objects.filter(id_deputado__in=[d.id_deputado for d in resumidos])
+            .values_list('id_deputado', 'nome_civil')
+        )
+        for deputado in resumidos:
+            deputado.nome_civil = nomes_civis.get(deputado.id_deputado, '')
+            deputado.atualizar_nome_busca()
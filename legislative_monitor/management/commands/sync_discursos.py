@@ -0,0 +1,324 @@
+import hashlib
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from legislative_monitor.management.base import SyncBaseCommand
+from legislative_monitor.models import CheckpointSincronizacao, Deputado, Discurso
+from legislative_monitor.services.camara_api import CamaraAPIService
+from legislative_monitor.services.dto import parse_data_hora
+from legislative_monitor.services.pipeline import Pipeline, ProgressoOrdenado
+from legislative_monitor.services.transporte import ErroRequisicaoAPI
+from legislative_monitor.services.upsert import calcular_hash, upsert_alterados
+
+
+CAMPOS_METADADOS = ['deputado', 'data', 'tipo_discurso', 'sumario', 'url_audio', 'url_video', 'updated_at']
+
+CAMPOS_COMPLETOS = CAMPOS_METADADOS + ['transcricao']
+
+PREFIXO_CHECKPOINT = 'discursos:'
+
+
+class Command(SyncBaseCommand):
+    help = (
+        'Sincroniza discursos dos deputados em paralelo, por janelas de data, com checkpoint por '
+        'deputado. As páginas da API são processadas à medida que chegam. A gravação da '
+        'transcrição pode ser adiada para uma segunda passada (--sem-transcricao / --transcricoes)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=date.fromisoformat,
+            help='Data inicial (AAAA-MM-DD) para deputados sem checkpoint (padrão: 30 dias atrás)',
+        )
+        parser.add_argument(
+            '--ate',
+            type=date.fromisoformat,
+            help='Data final (AAAA-MM-DD) (padrão: hoje)',
+        )
+        parser.add_argument(
+            '--janela-dias',
+            type=int,
+            default=90,
+            help='Tamanho de cada janela dataInicio/dataFim em dias (padrão: 90)',
+        )
+        parser.add_argument(
+            '--deputados',
+            type=int,
+            nargs='+',
+            help='IDs (API) dos deputados (padrão: todos do banco)',
+        )
+        parser.add_argument(
+            '--sem-transcricao',
+            action='store_true',
+            help=(
+                'Grava apenas os metadados; a transcrição fica para a passada --transcricoes. '
+                'A API sempre inclui a transcrição na listagem, então ela é baixada (e descartada) '
+                'mesmo assim e baixada de novo na segunda passada: isso não economiza rede, só '
+                'adia a gravação dos textos'
+            ),
+        )
+        parser.add_argument(
+            '--transcricoes',
+            action='store_true',
+            help='Segunda passada: preenche as transcrições dos discursos gravados sem texto',
+        )
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=None,
+            help='Threads coletoras (padrão: CAMARA_API_CONCORRENCIA)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=200,
+            help='Discursos por gravação em lote (padrão: 200)',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        self.api = CamaraAPIService()
+        self.lote = options['lote']
+        self.sem_transcricao = options['sem_transcricao']
+        self.janela = timedelta(days=options['janela_dias'])
+        if options['janela_dias'] < 1:
+            raise CommandError('--janela-dias deve ser maior que zero')
+        self.transcricoes = options['transcricoes']
+        self.stats = {
+            'discursos': 0, 'inalterados': 0, 'transcricoes': 0, 'deputados': 0, 'falhas': 0, 'sem_data': 0,
+        }
+
+        deputados = Deputado.objects.all()
+        if options['deputados']:
+            deputados = deputados.filter(id_deputado__in=options['deputados'])
+        self.mapa_deputados = dict(deputados.values_list('id_deputado', 'id'))
+        if not self.mapa_deputados:
+            self.stdout.write(self.style.WARNING('Nenhum deputado no banco: rode sync_deputados antes.'))
+            return
+
+        if self.transcricoes:
+            self.stdout.write('Preenchendo transcrições pendentes...')
+            tarefas = self._tarefas_transcricao()
+        else:
+            ate = options['ate'] or timezone.localdate()
+            desde = options['desde'] or ate - timedelta(days=30)
+            self.stdout.write(
+                f'Sincronizando discursos de {len(self.mapa_deputados)} deputados '
+                f'({"sem transcrição" if self.sem_transcricao else "com transcrição"})...'
+            )
+            tarefas = self._tarefas_metadados(desde, ate)
+
+        self._executar(tarefas, options['concorrencia'])
+
+        # Relatório final
+        duracao = time.monotonic() - inicio
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('SINCRONIZAÇÃO CONCLUÍDA'))
+        self.stdout.write('='*60)
+        self.stdout.write(f'  • Deputados concluídos: {self.stats["deputados"]}')
+        self.stdout.write(self.style.SUCCESS(f'  • Discursos gravados: {self.stats["discursos"]}'))
+        if self.stats['inalterados']:
+            self.stdout.write(f'  • Discursos sem alteração (não regravados): {self.stats["inalterados"]}')
+        if self.stats['transcricoes']:
+            self.stdout.write(self.style.SUCCESS(f'  • Transcrições preenchidas: {self.stats["transcricoes"]}'))
+        if self.stats['sem_data']:
+            self.stdout.write(self.style.WARNING(
+                f'  • Discursos sem data de início na API (ignorados): {self.stats["sem_data"]}'
+            ))
+        if self.stats['falhas']:
+            self.stdout.write(self.style.ERROR(
+                f'  • Deputados com falha na API (retomam do checkpoint): {self.stats["falhas"]}'
+            ))
+        self.stdout.write(f'Tempo total: {duracao:.1f}s')
+
+    # Planejamento ---------------------------------------------------------------
+
+    def _tarefas_metadados(self, desde, ate):
+        """
+        (id_deputado, início, fim) por deputado: retoma do watermark de cada um, mesmo que
+        anterior a `desde` (janela que falhou, cron parado), para não deixar lacunas
+        """
+        watermarks = dict(
+            CheckpointSincronizacao.objects.filter(fonte__startswith=PREFIXO_CHECKPOINT)
+            .values_list('fonte', 'watermark')
+        )
+        tarefas = []
+        for id_deputado in self.mapa_deputados:
+            watermark = watermarks.get(f'{PREFIXO_CHECKPOINT}{id_deputado}')
+            inicio = watermark or desde
+            if inicio <= ate:
+                tarefas.append((id_deputado, inicio, ate, None))
+        return tarefas
+
+    def _tarefas_transcricao(self):
+        """(id_deputado, data mínima, data máxima, ids pendentes) dos discursos sem transcrição"""
+        pendentes = {}
+        consulta = (
+            Discurso.objects.filter(transcricao='', deputado__id_deputado__in=self.mapa_deputados)
+            .values_list('deputado__id_deputado', 'id_discurso', 'data')
+            .iterator()
+        )
+        for id_deputado, id_discurso, data in consulta:
+            ids, minimo, maximo = pendentes.get(id_deputado, (set(), data, data))
+            ids.add(id_discurso)
+            pendentes[id_deputado] = (ids, min(minimo, data), max(maximo, data))
+
+        def dia(valor):
+            return timezone.localtime(valor).date()
+
+        return [
+            (id_deputado, dia(minimo), dia(maximo), ids)
+            for id_deputado, (ids, minimo, maximo) in pendentes.items()
+        ]
+
+    # Execução -------------------------------------------------------------------
+
+    def _executar(self, tarefas, concorrencia):
+        """
+        Pipeline: coletores percorrem as janelas dos deputados na API, o normalizador monta
+        os discursos e a thread principal é a única que grava, em lotes. O watermark de cada
+        deputado só avança até a última janela gravada sem lacunas.
+        """
+        if not tarefas:
+            self.stdout.write('Nada a sincronizar.')
+            return
+
+        self.progresso = {}
+        self.falhos = set()
+        pipeline = Pipeline(
+            buscar=self._buscar,
+            normalizar=self._normalizar,
+            gravar=self._gravar,
+            coletores=concorrencia,
+            tamanho_lote=self.lote,
+            erros_item=(ErroRequisicaoAPI,),
+            ao_falhar=self._registrar_falha,
+            em_partes=True,
+        )
+        pipeline.executar(self._janelas(tarefas))
+
+    def _janelas(self, tarefas):
+        """Alimentador: (id_deputado, início, fim da janela, fim da tarefa, ids pendentes)"""
+        for id_deputado, inicio, fim, ids_pendentes in tarefas:
+            progresso = self.progresso[id_deputado] = ProgressoOrdenado()
+            janela_inicio = inicio
+            while janela_inicio <= fim:
+                janela_fim = min(janela_inicio + self.janela - timedelta(days=1), fim)
+                progresso.registrar(janela_fim, 1)
+                yield id_deputado, janela_inicio, janela_fim, fim, ids_pendentes
+                janela_inicio = janela_fim + timedelta(days=1)
+
+    def _buscar(self, item):
+        """
+        Coletores: páginas de discursos de uma janela do deputado, entregues uma a uma
+        ao normalizador (as transcrições de uma janela inteira não ficam em memória)
+        """
+        id_deputado, janela_inicio, janela_fim, _, _ = item
+        if id_deputado in self.falhos:
+            # O watermark do deputado já parou numa janela anterior
+            return []
+        return self.api.iter_paginas_discursos_deputado(
+            id_deputado,
+            dataInicio=janela_inicio.isoformat(),
+            dataFim=janela_fim.isoformat(),
+            ordenarPor='dataHoraInicio',
+            ordem='ASC',
+        )
+
+    def _normalizar(self, item, discursos):
+        """Normalizador: página JSON -> instâncias de Discurso (na passada de transcrições, só as pendentes)"""
+        id_deputado, _, _, _, ids_pendentes = item
+        for dados in discursos:
+            if not parse_data_hora(dados.get('dataHoraInicio')):
+                # Sem data não há como identificar nem ordenar o discurso
+                self.stats['sem_data'] += 1
+            elif ids_pendentes is None:
+                yield self._montar_discurso(id_deputado, dados, not self.sem_transcricao)
+            elif self._id_discurso(id_deputado, dados) in ids_pendentes and dados.get('transcricao'):
+                yield self._montar_discurso(id_deputado, dados, True)
+
+    def _montar_discurso(self, id_deputado, dados, com_transcricao):
+        """Cria a instância (não salva); a transcrição fica vazia se `com_transcricao` for falso"""
+        return Discurso(
+            id_discurso=self._id_discurso(id_deputado, dados),
+            deputado_id=self.mapa_deputados[id_deputado],
+            data=parse_data_hora(dados.get('dataHoraInicio')),
+            tipo_discurso=(dados.get('tipoDiscurso') or '')[:100],
+            transcricao=(dados.get('transcricao') or '') if com_transcricao else '',
+            sumario=dados.get('sumario') or '',
+            url_audio=dados.get('urlAudio') or '',
+            url_video=dados.get('urlVideo') or '',
+        )
+
+    def _id_discurso(self, id_deputado, dados):
+        """A API não fornece ID de discurso: deputado + início + hash curto do evento/tipo"""
+        assinatura = f"{dados.get('uriEvento')}|{dados.get('tipoDiscurso')}".encode('utf-8')
+        return f"{id_deputado}-{dados.get('dataHoraInicio')}-{hashlib.sha1(assinatura).hexdigest()[:8]}"
+
+    # Gravação (thread principal) ------------------------------------------------
+
+    def _gravar(self, discursos, janelas):
+        """Grava o lote e avança, na mesma transação, o watermark dos deputados"""
+        unicos = list({d.id_discurso: d for d in discursos}.values())
+        with transaction.atomic():
+            if self.transcricoes:
+                self._gravar_transcricoes(unicos)
+            else:
+                self._gravar_lote(unicos)
+
+            for id_deputado, _, janela_fim, fim, _ in janelas:
+                if id_deputado in self.falhos:
+                    continue
+                completas = self.progresso[id_deputado].concluir(janela_fim)
+                if completas and not self.transcricoes:
+                    self._salvar_checkpoint(id_deputado, completas[-1])
+                if fim in completas:
+                    self.stats['deputados'] += 1
+
+    def _gravar_lote(self, discursos):
+        # Hash sempre sobre CAMPOS_COMPLETOS: sem transcrição, vale a já gravada
+        campos = CAMPOS_METADADOS if self.sem_transcricao else CAMPOS_COMPLETOS
+        resultado = upsert_alterados(
+            Discurso, discursos, 'id_discurso', campos, lote=self.lote, campos_hash=CAMPOS_COMPLETOS,
+        )
+        self.stats['discursos'] += resultado.criados + resultado.atualizados
+        self.stats['inalterados'] += resultado.inalterados
+
+    def _gravar_transcricoes(self, discursos):
+        """
+        Preenche a transcrição dos discursos já gravados, regravando também os metadados
+        lidos agora: o hash (sobre CAMPOS_COMPLETOS) precisa descrever a linha gravada
+        """
+        pks = dict(
+            Discurso.objects.filter(id_discurso__in=[d.id_discurso for d in discursos])
+            .values_list('id_discurso', 'id')
+        )
+        agora = timezone.now()
+        atualizados = []
+        for discurso in discursos:
+            if discurso.id_discurso in pks:
+                discurso.pk = pks[discurso.id_discurso]
+                discurso.hash_conteudo = calcular_hash(discurso, CAMPOS_COMPLETOS)
+                discurso.updated_at = agora
+                atualizados.append(discurso)
+        Discurso.objects.bulk_update(atualizados, CAMPOS_COMPLETOS + ['hash_conteudo'])
+        self.stats['transcricoes'] += len(atualizados)
+
+    def _registrar_falha(self, item, erro):
+        """Uma janela falhou: o deputado para de avançar e retoma do watermark na próxima execução"""
+        id_deputado = item[0]
+        if id_deputado not in self.falhos:
+            self.falhos.add(id_deputado)
+            self.stats['falhas'] += 1
+            self.stdout.write(self.style.ERROR(f'  ✗ Deputado {id_deputado}: {erro}'))
+
+    def _salvar_checkpoint(self, id_deputado, watermark):
+        CheckpointSincronizacao.objects.update_or_create(
+            fonte=f'{PREFIXO_CHECKPOINT}{id_deputado}',
+            defaults={'watermark': watermark, 'status': 'CONCLUIDO'},
+        )
@@ -1,125 +1,152 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.db import transaction
+
+from legislative_monitor.management.base import SyncBaseCommand
 from legislative_monitor.models import Partido
 from legislative_monitor.services.camara_api import CamaraAPIService
-from datetime import datetime
+from legislative_monitor.services.camara_api_async import buscar_detalhes
+from legislative_monitor.services.dto import PartidoAPI
+from legislative_monitor.services.texto import chave_busca
+from legislative_monitor.services.transporte import ErroRequisicaoAPI
+from legislative_monitor.services.upsert import BulkUpserter, ResultadoUpsert
+
 
+# Campos vindos da listagem (sempre disponíveis)
+CAMPOS_RESUMO = ['sigla', 'nome', 'uri', 'nome_busca', 'updated_at']
 
-class Command(BaseCommand):
+# Campos que só existem no detalhe; partidos cujo detalhe falhou não têm esses campos sobrescritos
+CAMPOS_DETALHE = CAMPOS_RESUMO + [
+    'status_data', 'status_situacao', 'status_total_posse', 'status_total_membros',
+    'status_id_legislatura', 'numero_eleitoral', 'url_logo', 'url_website', 'url_facebook',
+]
+
+
+class Command(SyncBaseCommand):
     help = 'Sincroniza partidos políticos da API da Câmara dos Deputados'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--detalhes',
             action='store_true',
-            help='Busca detalhes completos de cada partido (mais lento)',
+            help='Busca detalhes completos de cada partido (em paralelo)',
+        )
+        parser.add_argument(
+            '--concorrencia',
+            '--concurrency',
+            dest='concorrencia',
+            type=int,
+            default=None,
+            help='Requisições de detalhes simultâneas (padrão: CAMARA_API_CONCORRENCIA)',
         )
 
     def handle(self, *args, **options):
-        buscar_detalhes = options['detalhes']
-        
+        inicio = time.monotonic()
+        tempos = {}
+
         self.stdout.write('Iniciando sincronização de partidos...\n')
-        
+
         # Criar serviço da API
         api = CamaraAPIService()
-        
-        # Buscar lista de partidos
+
+        # 1. Lista de partidos (todas as páginas)
         self.stdout.write('Buscando lista de partidos da API...')
-        response = api.listar_partidos(itens=100)
-        
-        if not response or 'dados' not in response:
-            self.stdout.write(self.style.ERROR('Erro ao buscar partidos da API'))
+        t_etapa = time.monotonic()
+        try:
+            partidos_api = list(api.iter_partidos())
+        except ErroRequisicaoAPI as e:
+            self.stdout.write(self.style.ERROR(f'Erro ao buscar partidos da API: {e}'))
             return
-        
-        partidos_api = response['dados']
+        tempos['Listagem'] = time.monotonic() - t_etapa
+
         total = len(partidos_api)
-        
         self.stdout.write(self.style.SUCCESS(f'✓ {total} partidos encontrados\n'))
-        
-        # Estatísticas
-        criados = 0
-        atualizados = 0
-        erros = 0
-        
-        for idx, partido_data in enumerate(partidos_api, 1):
-            try:
-                id_partido = partido_data['id']
-                sigla = partido_data['sigla']
-                nome = partido_data['nome']
-                uri = partido_data.get('uri', '')
-                
-                self.stdout.write(f'[{idx}/{total}] Processando {sigla}...', ending='')
-                
-                # Buscar detalhes se solicitado
-                dados_completos = {}
-                if buscar_detalhes:
-                    detalhes = api.obter_partido(id_partido)
-                    if detalhes and 'dados' in detalhes:
-                        dados_detalhes = detalhes['dados']
-                        
-                        # Extrair dados de status
-                        status = dados_detalhes.get('status', {})
-                        if status:
-                            dados_completos['status_data'] = self._parse_datetime(status.get('data'))
-                            dados_completos['status_situacao'] = status.get('situacao', '')
-                            dados_completos['status_total_posse'] = status.get('totalPosse')
-                            dados_completos['status_total_membros'] = status.get('totalMembros')
-                            dados_completos['status_id_legislatura'] = status.get('idLegislatura')
-                        
-                        # Extrair dados adicionais
-                        dados_completos['numero_eleitoral'] = dados_detalhes.get('numeroEleitoral')
-                        dados_completos['url_logo'] = dados_detalhes.get('urlLogo', '')
-                        dados_completos['url_website'] = dados_detalhes.get('urlWebSite', '')
-                        dados_completos['url_facebook'] = dados_detalhes.get('urlFacebook', '')
-                
-                # Criar ou atualizar partido
-                partido, created = Partido.objects.update_or_create(
-                    id_partido=id_partido,
-                    defaults={
-                        'sigla': sigla,
-                        'nome': nome,
-                        'uri': uri,
-                        **dados_completos
-                    }
-                )
-                
-                if created:
-                    criados += 1
-                    self.stdout.write(self.style.SUCCESS(' ✓ Criado'))
-                else:
-                    atualizados += 1
-                    self.stdout.write(self.style.WARNING(' ↻ Atualizado'))
-                
-            except Exception as e:
-                erros += 1
-                self.stdout.write(self.style.ERROR(f' ✗ Erro: {str(e)}'))
-        
+
+        # 2. Detalhes em paralelo (pool limitado)
+        detalhes = [None] * total
+        falhas_detalhe = 0
+        if options['detalhes']:
+            t_etapa = time.monotonic()
+            resultados = buscar_detalhes(
+                [p['id'] for p in partidos_api],
+                metodo='obter_partido',
+                concorrencia=options['concorrencia'],
+                api=api,
+            )
+            detalhes = [r.dados.get('dados') if r.ok and r.dados else None for r in resultados]
+            falhas_detalhe = sum(1 for d in detalhes if d is None)
+            tempos['Detalhes'] = time.monotonic() - t_etapa
+            self.stdout.write(
+                f'✓ Detalhes obtidos em {tempos["Detalhes"]:.1f}s'
+                + (f' ({falhas_detalhe} falhas, usando dados resumidos)' if falhas_detalhe else '')
+            )
+
+        # 3. Upsert em lote por id_partido (só os alterados)
+        t_etapa = time.monotonic()
+        completos = BulkUpserter(Partido, 'id_partido', campos=CAMPOS_DETALHE)
+        # Hash sempre sobre CAMPOS_DETALHE: nos resumidos, valem os detalhes já gravados
+        resumidos = BulkUpserter(Partido, 'id_partido', campos=CAMPOS_RESUMO, campos_hash=CAMPOS_DETALHE)
+        with transaction.atomic():
+            for resumo, detalhe in zip(partidos_api, detalhes):
+                partido = PartidoAPI.de_api(resumo, detalhe)
+                upserter = completos if partido.completo else resumidos
+                upserter.adicionar(self._montar_partido(partido))
+            resultado = ResultadoUpsert()
+            for upserter in (completos, resumidos):
+                resultado += upserter.finalizar()
+        tempos['Gravação'] = time.monotonic() - t_etapa
+
         # Relatório final
         self.stdout.write('\n' + '='*60)
         self.stdout.write(self.style.SUCCESS('SINCRONIZAÇÃO CONCLUÍDA'))
         self.stdout.write('='*60)
         self.stdout.write(f'Total processado: {total}')
-        self.stdout.write(self.style.SUCCESS(f'  • Criados: {criados}'))
-        self.stdout.write(self.style.WARNING(f'  • Atualizados: {atualizados}'))
-        if erros > 0:
-            self.stdout.write(self.style.ERROR(f'  • Erros: {erros}'))
-        
+        self.stdout.write(self.style.SUCCESS(f'  • Criados: {resultado.criados}'))
+        self.stdout.write(self.style.WARNING(f'  • Atualizados: {resultado.atualizados}'))
+        self.stdout.write(f'  • Inalterados: {resultado.inalterados}')
+        if falhas_detalhe:
+            self.stdout.write(self.style.ERROR(f'  • Falhas ao obter detalhes: {falhas_detalhe}'))
+        if resultado.falhas:
+            self.stdout.write(self.style.ERROR(f'  • Falhas ao gravar: {resultado.falhas}'))
+            for id_partido, erro in completos.erros + resumidos.erros:
+                self.stdout.write(self.style.ERROR(f'    ✗ {id_partido}: {erro}'))
+
+        self.stdout.write('\nTempo por etapa:')
+        for etapa, duracao in tempos.items():
+            self.stdout.write(f'  • {etapa}: {duracao:.2f}s')
+        self.stdout.write(f'Tempo total: {time.monotonic() - inicio:.1f}s')
+
         # Estatísticas do banco
         self.stdout.write('\nEstatísticas do banco de dados:')
         total_partidos = Partido.objects.count()
         self.stdout.write(f'  • Total de partidos: {total_partidos}')
-        
+
         # Top 5 partidos por número de deputados
         self.stdout.write('\nPartidos cadastrados:')
         for partido in Partido.objects.all()[:10]:
             self.stdout.write(f'  • {partido.sigla} - {partido.nome}')
-    
-    def _parse_datetime(self, data_str):
-        """Converte string de data da API para datetime"""
-        if not data_str:
-            return None
-        
-        try:
-            # Formato: "2025-04-08T14:44"
-            return datetime.strptime(data_str, "%Y-%m-%dT%H:%M")
-        except:
-            return None
+
+    def _montar_partido(self, partido):
+        """Registro (dicionário) a partir do PartidoAPI; só os completos levam os campos do detalhe"""
+        registro = {
+            'id_partido': partido.id,
+            'sigla': partido.sigla,
+            'nome': partido.nome,
+            'uri': partido.uri,
+            'nome_busca': chave_busca(partido.sigla, partido.nome),
+        }
+
+        if partido.completo:
+            registro.update({
+                'status_data': partido.status_data,
+                'status_situacao': partido.status_situacao,
+                'status_total_posse': partido.status_total_posse,
+                'status_total_membros': partido.status_total_membros,
+                'status_id_legislatura': partido.status_id_legislatura,
+                'numero_eleitoral': partido.numero_eleitoral,
+                'url_logo': partido.url_logo,
+                'url_website': partido.url_website,
+                'url_facebook': partido.url_facebook,
+            })
+
+        return registro
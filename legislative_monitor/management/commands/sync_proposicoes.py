@@ -0,0 +1,329 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from legislative_monitor.management.base import SyncBaseCommand
+from legislative_monitor.models import CheckpointSincronizacao, Proposicao, TipoProposicao
+from legislative_monitor.services.camara_api import CamaraAPIService
+from legislative_monitor.services.dto import ProposicaoAPI
+from legislative_monitor.services.pipeline import Pipeline, ProgressoOrdenado
+from legislative_monitor.services.texto import normalizar
+from legislative_monitor.services.transporte import ErroRequisicaoAPI
+from legislative_monitor.services.upsert import upsert_alterados
+
+
+CAMPOS_ATUALIZAVEIS = [
+    'tipo', 'numero', 'ano', 'ementa', 'ementa_detalhada', 'data_apresentacao',
+    'situacao', 'status_proposicao', 'url_inteiro_teor', 'url_tramitacao', 'updated_at',
+]
+
+# Hash do conteúdo: inclui o autor, resolvido só pela reconciliação do backfill_proposicoes
+# (que grava com o mesmo conjunto); aqui ele é lido do banco
+CAMPOS_HASH = CAMPOS_ATUALIZAVEIS + ['autor']
+
+URL_TRAMITACAO = 'https://www.camara.leg.br/proposicoesWeb/fichadetramitacao?idProposicao={id}'
+
+# Trechos da descrição de situação da API -> Proposicao.SITUACAO_CHOICES
+SITUACOES = [
+    ('arquivad', 'ARQUIVADA'),
+    ('retirad', 'RETIRADA'),
+    ('rejeitad', 'REJEITADA'),
+    ('norma juridica', 'APROVADA'),
+    ('aprovad', 'APROVADA'),
+]
+
+
+def carregar_mapas_tipo():
+    """
+    Mapas código -> pk e sigla -> pk de TipoProposicao. Siglas repetidas ficam com o menor
+    código numérico (cod é texto: '100' < '99' na ordem do banco)
+    """
+    def ordem(tipo):
+        cod = tipo[1]
+        return (not cod.isdigit(), int(cod) if cod.isdigit() else 0, cod)
+
+    por_cod, por_sigla = {}, {}
+    for pk, cod, sigla in sorted(TipoProposicao.objects.values_list('id', 'cod', 'sigla'), key=ordem, reverse=True):
+        por_cod[cod] = pk
+        por_sigla[sigla] = pk
+    return {'cod': por_cod, 'sigla': por_sigla}
+
+
+class _DetalheInvalido(Exception):
+    """Detalhe recebido sem os dados obrigatórios; a proposição fica pendente"""
+
+
+class Command(SyncBaseCommand):
+    help = (
+        'Sincroniza proposições da API da Câmara de forma incremental, por janelas de data, '
+        'retomando do último checkpoint gravado'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=date.fromisoformat,
+            help='Data inicial (AAAA-MM-DD) quando ainda não há watermark (padrão: ontem)',
+        )
+        parser.add_argument(
+            '--ate',
+            type=date.fromisoformat,
+            help='Data final (AAAA-MM-DD) da sincronização (padrão: hoje)',
+        )
+        parser.add_argument(
+            '--janela-dias',
+            type=int,
+            default=30,
+            help='Tamanho de cada janela dataInicio/dataFim em dias (padrão: 30)',
+        )
+        parser.add_argument(
+            '--fonte',
+            default='proposicoes',
+            help='Nome do checkpoint (padrão: proposicoes)',
+        )
+        parser.add_argument(
+            '--reiniciar',
+            action='store_true',
+            help='Ignora o checkpoint existente e recomeça a partir de --desde',
+        )
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=None,
+            help='Threads coletoras de detalhes (padrão: CAMARA_API_CONCORRENCIA)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=500,
+            help='Registros por INSERT em lote (padrão: 500)',
+        )
+
+    def nome_trava(self, options):
+        # Cada checkpoint (ex.: janelas mensais das tarefas Celery) pode rodar em paralelo
+        return f'sync_proposicoes:{options["fonte"]}'
+
+    def handle(self, *args, **options):
+        inicio_execucao = time.monotonic()
+        hoje = timezone.localdate()
+        ate = options['ate'] or hoje
+        janela_dias = options['janela_dias']
+        if janela_dias < 1:
+            raise CommandError('--janela-dias deve ser maior que zero')
+
+        self.api = CamaraAPIService()
+        self.concorrencia = options['concorrencia']
+        self.lote = options['lote']
+        self.mapas_tipo = carregar_mapas_tipo()
+        self.stats = {
+            'criadas': 0, 'atualizadas': 0, 'inalteradas': 0, 'falhas': 0, 'sem_tipo': 0, 'paginas': 0,
+            'tempo_gravacao': 0.0,
+        }
+
+        checkpoint, _ = CheckpointSincronizacao.objects.get_or_create(fonte=options['fonte'])
+        if options['reiniciar']:
+            checkpoint.watermark = None
+            checkpoint.janela_inicio = checkpoint.janela_fim = None
+            checkpoint.pagina = 0
+            checkpoint.detalhes = {}
+
+        self.stdout.write(f'Iniciando sincronização incremental de proposições ({checkpoint.fonte})...')
+
+        # IDs cujo detalhe falhou em execuções anteriores
+        pendentes = checkpoint.detalhes.get('pendentes', [])
+        if pendentes:
+            self.stdout.write(f'Reprocessando {len(pendentes)} proposições pendentes...')
+            checkpoint.detalhes['pendentes'] = self._processar_ids(pendentes)
+            checkpoint.save(update_fields=['detalhes', 'updated_at'])
+
+        # Retomada de janela interrompida ou nova janela a partir do watermark
+        if checkpoint.janela_inicio:
+            janela_inicio, pagina_inicial = checkpoint.janela_inicio, checkpoint.pagina + 1
+            self.stdout.write(self.style.WARNING(
+                f'Retomando janela {janela_inicio} a {checkpoint.janela_fim} na página {pagina_inicial}'
+            ))
+        else:
+            janela_inicio = checkpoint.watermark or options['desde'] or hoje - timedelta(days=1)
+            pagina_inicial = 1
+
+        checkpoint.status = 'EM_ANDAMENTO'
+        checkpoint.save()
+
+        try:
+            while janela_inicio <= ate:
+                janela_fim = min(janela_inicio + timedelta(days=janela_dias - 1), ate)
+                self._sincronizar_janela(checkpoint, janela_inicio, janela_fim, pagina_inicial)
+
+                # Janela concluída: avança o watermark. A próxima execução recomeça nesta data
+                # (inclusive) para não perder tramitações registradas mais tarde no mesmo dia.
+                checkpoint.watermark = janela_fim
+                checkpoint.janela_inicio = checkpoint.janela_fim = None
+                checkpoint.pagina = 0
+                checkpoint.save()
+
+                if janela_fim >= ate:
+                    break
+                janela_inicio, pagina_inicial = janela_fim + timedelta(days=1), 1
+        except ErroRequisicaoAPI as e:
+            checkpoint.status = 'ERRO'
+            checkpoint.save(update_fields=['status', 'updated_at'])
+            raise CommandError(
+                f'Falha na API: {e}. Execute novamente para retomar da página '
+                f'{checkpoint.pagina + 1} da janela {checkpoint.janela_inicio}.'
+            ) from e
+
+        checkpoint.status = 'CONCLUIDO'
+        checkpoint.save(update_fields=['status', 'updated_at'])
+
+        # Relatório final
+        duracao = time.monotonic() - inicio_execucao
+        total = self.stats['criadas'] + self.stats['atualizadas'] + self.stats['inalteradas']
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('SINCRONIZAÇÃO CONCLUÍDA'))
+        self.stdout.write('='*60)
+        self.stdout.write(f'Watermark: {checkpoint.watermark}')
+        self.stdout.write(f'Páginas processadas: {self.stats["paginas"]}')
+        self.stdout.write(self.style.SUCCESS(f'  • Criadas: {self.stats["criadas"]}'))
+        self.stdout.write(self.style.WARNING(f'  • Atualizadas: {self.stats["atualizadas"]}'))
+        self.stdout.write(f'  • Inalteradas: {self.stats["inalteradas"]}')
+        if self.stats['sem_tipo']:
+            self.stdout.write(self.style.WARNING(
+                f'  • Sem tipo correspondente: {self.stats["sem_tipo"]} (rode sync_tipos_proposicao)'
+            ))
+        if self.stats['falhas']:
+            self.stdout.write(self.style.ERROR(
+                f'  • Falhas de detalhe (pendentes para a próxima execução): {self.stats["falhas"]}'
+            ))
+        self.stdout.write(f'Tempo total: {duracao:.1f}s ({total / duracao if duracao else 0:.0f} proposições/s)')
+        self.stdout.write(f'Tempo de gravação no banco: {self.stats["tempo_gravacao"]:.1f}s')
+
+    def _sincronizar_janela(self, checkpoint, janela_inicio, janela_fim, pagina_inicial):
+        """
+        Percorre as páginas de uma janela pelo pipeline. O checkpoint avança até a última
+        página cujas proposições já foram todas gravadas, na mesma transação da gravação.
+        """
+        self.stdout.write(f'Janela {janela_inicio} a {janela_fim}...')
+        checkpoint.janela_inicio, checkpoint.janela_fim = janela_inicio, janela_fim
+        progresso = ProgressoOrdenado()
+        tamanhos = {}
+
+        def itens():
+            paginas = self.api.iter_paginas_proposicoes(
+                prefetch=True,
+                dataInicio=janela_inicio.isoformat(),
+                dataFim=janela_fim.isoformat(),
+                pagina=pagina_inicial,
+                ordem='ASC',
+                ordenarPor='id',
+            )
+            for numero, resumos in enumerate(paginas, pagina_inicial):
+                tamanhos[numero] = len(resumos)
+                progresso.registrar(numero, len(resumos))
+                for resumo in resumos:
+                    yield numero, resumo['id']
+
+        def gravar(proposicoes, concluidos):
+            paginas = [p for numero, _ in concluidos for p in progresso.concluir(numero)]
+            self._gravar(proposicoes, checkpoint, paginas[-1] if paginas else None)
+            for numero in paginas:
+                self.stats['paginas'] += 1
+                self.stdout.write(f'  Página {numero}: {tamanhos.pop(numero)} proposições')
+
+        estatisticas = self._pipeline(gravar).executar(itens())
+        self.stats['tempo_gravacao'] += estatisticas.tempo_gravacao
+
+    def _processar_ids(self, ids):
+        """Busca e grava proposições avulsas (sem checkpoint de página); retorna os IDs que falharam"""
+        falhas = []
+        estatisticas = self._pipeline(lambda proposicoes, _: falhas.extend(self._gravar(proposicoes))).executar(
+            (None, id_proposicao) for id_proposicao in ids
+        )
+        self.stats['tempo_gravacao'] += estatisticas.tempo_gravacao
+        return falhas
+
+    # Estágios do pipeline ---------------------------------------------------------
+
+    def _pipeline(self, gravar):
+        self._falhas = []
+        return Pipeline(
+            buscar=self._buscar,
+            normalizar=self._normalizar,
+            gravar=gravar,
+            coletores=self.concorrencia,
+            tamanho_lote=self.lote,
+            erros_item=(ErroRequisicaoAPI, _DetalheInvalido),
+            ao_falhar=lambda item, erro: self._falhas.append(item[1]),
+        )
+
+    def _buscar(self, item):
+        """Coletores: detalhe de uma proposição, já convertido para ProposicaoAPI"""
+        resposta = self.api.obter_proposicao(item[1])
+        if not resposta or not resposta.get('dados'):
+            raise ErroRequisicaoAPI(f'Detalhe da proposição {item[1]} indisponível')
+        return ProposicaoAPI.de_api(resposta['dados'])
+
+    def _normalizar(self, item, registro):
+        """Normalizador: ProposicaoAPI -> instância de Proposicao"""
+        if registro.data_apresentacao is None:
+            raise _DetalheInvalido(f'Proposição {item[1]} sem data de apresentação')
+        return [self._montar_proposicao(registro)]
+
+    def _gravar(self, proposicoes, checkpoint=None, pagina=None):
+        """
+        Gravador: upsert em lote. Com `checkpoint`, a página concluída e os IDs que falharam
+        são confirmados na mesma transação. Retorna os IDs que falharam desde a última gravação.
+        """
+        # A paginação pode repetir uma proposição entre páginas; o ON CONFLICT não aceita duplicatas
+        unicas = list({p.id_proposicao: p for p in proposicoes}.values())
+        falhas, self._falhas = self._falhas, []
+
+        with transaction.atomic():
+            resultado = upsert_alterados(
+                Proposicao, unicas, 'id_proposicao', CAMPOS_ATUALIZAVEIS, lote=self.lote,
+                campos_hash=CAMPOS_HASH,
+            )
+            if checkpoint is not None:
+                if pagina is not None:
+                    checkpoint.pagina = pagina
+                if falhas:
+                    checkpoint.detalhes['pendentes'] = checkpoint.detalhes.get('pendentes', []) + falhas
+                checkpoint.save()
+
+        self.stats['criadas'] += resultado.criados
+        self.stats['atualizadas'] += resultado.atualizados
+        self.stats['inalteradas'] += resultado.inalterados
+        self.stats['falhas'] += len(falhas)
+        return falhas
+
+    def _montar_proposicao(self, registro):
+        """Cria a instância (não salva) a partir do ProposicaoAPI"""
+        tipo_id = (
+            self.mapas_tipo['cod'].get(registro.cod_tipo)
+            or self.mapas_tipo['sigla'].get(registro.sigla_tipo)
+        )
+        if tipo_id is None:
+            self.stats['sem_tipo'] += 1
+
+        return Proposicao(
+            id_proposicao=registro.id,
+            tipo_id=tipo_id,
+            numero=registro.numero,
+            ano=registro.ano,
+            ementa=registro.ementa,
+            ementa_detalhada=registro.ementa_detalhada,
+            data_apresentacao=registro.data_apresentacao,
+            situacao=self._mapear_situacao(registro.descricao_situacao),
+            status_proposicao=registro.descricao_situacao,
+            url_inteiro_teor=registro.url_inteiro_teor,
+            url_tramitacao=URL_TRAMITACAO.format(id=registro.id),
+        )
+
+    def _mapear_situacao(self, descricao):
+        descricao = normalizar(descricao)
+        for trecho, situacao in SITUACOES:
+            if trecho in descricao:
+                return situacao
+        return 'EM_TRAMITACAO'
@@ -1,9 +1,15 @@
-from django.core.management.base import BaseCommand
+from django.db import transaction
+from legislative_monitor.management.base import SyncBaseCommand
 from legislative_monitor.services.camara_api import CamaraAPIService
+from legislative_monitor.services.dto import TipoProposicaoAPI
+from legislative_monitor.services.upsert import BulkUpserter
 from legislative_monitor.models import TipoProposicao
 
 
-class Command(BaseCommand):
+CAMPOS_ATUALIZAVEIS = ['sigla', 'nome', 'descricao', 'updated_at']
+
+
+class Command(SyncBaseCommand):
     help = 'Sincroniza os tipos de proposição da API da Câmara dos Deputados'
 
     def handle(self, *args, **options):
@@ -18,46 +24,27 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Erro ao obter tipos de proposição da API'))
             return
         
-        tipos_data = response['dados']
-        self.stdout.write(f'Encontrados {len(tipos_data)} tipos de proposição na API')
-        
-        # Sincronizar dados
-        criados = 0
-        atualizados = 0
-        erros = 0
+        tipos_api = [TipoProposicaoAPI.de_api(dados) for dados in response['dados']]
+        self.stdout.write(f'Encontrados {len(tipos_api)} tipos de proposição na API')
         
-        for tipo_data in tipos_data:
-            try:
-                tipo, created = TipoProposicao.objects.update_or_create(
-                    cod=tipo_data['cod'],
-                    defaults={
-                        'sigla': tipo_data['sigla'],
-                        'nome': tipo_data['nome'],
-                        'descricao': tipo_data.get('descricao', ''),
-                    }
-                )
-                
-                if created:
-                    criados += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(f'✓ Criado: {tipo.sigla} - {tipo.nome}')
-                    )
-                else:
-                    atualizados += 1
-                    self.stdout.write(f'  Atualizado: {tipo.sigla} - {tipo.nome}')
-                    
-            except Exception as e:
-                erros += 1
-                self.stdout.write(
-                    self.style.ERROR(f'✗ Erro ao processar tipo {tipo_data.get("sigla", "?")} (cod: {tipo_data.get("cod", "?")}): {str(e)}')
-                )
+        # Sincronizar dados: upsert em lote por código, pulando os tipos sem alteração
+        tipos = (
+            {'cod': tipo.cod, 'sigla': tipo.sigla, 'nome': tipo.nome, 'descricao': tipo.descricao}
+            for tipo in tipos_api
+        )
+        upserter = BulkUpserter(TipoProposicao, 'cod', campos=CAMPOS_ATUALIZAVEIS)
+        with transaction.atomic():
+            resultado = upserter.executar(tipos)
         
         # Resumo
         self.stdout.write('\n' + '='*60)
         self.stdout.write(self.style.SUCCESS(f'Sincronização concluída!'))
-        self.stdout.write(f'  • Tipos criados: {criados}')
-        self.stdout.write(f'  • Tipos atualizados: {atualizados}')
-        if erros > 0:
-            self.stdout.write(self.style.WARNING(f'  • Erros: {erros}'))
-        self.stdout.write(f'  • Total processado: {criados + atualizados}')
+        self.stdout.write(f'  • Tipos criados: {resultado.criados}')
+        self.stdout.write(f'  • Tipos atualizados: {resultado.atualizados}')
+        self.stdout.write(f'  • Tipos inalterados: {resultado.inalterados}')
+        if resultado.falhas:
+            self.stdout.write(self.style.WARNING(f'  • Erros: {resultado.falhas}'))
+            for cod, erro in upserter.erros:
+                self.stdout.write(self.style.ERROR(f'    ✗ cod {cod}: {erro}'))
+        self.stdout.write(f'  • Total processado: {resultado.total}')
         self.stdout.write('='*60)
@@ -0,0 +1,230 @@
+import hashlib
+import time
+from datetime import date
+
+from django.db import transaction
+
+from legislative_monitor.management.base import SyncBaseCommand
+from legislative_monitor.models import Deputado, Proposicao, Votacao, VotoDeputado
+from legislative_monitor.services.camara_api import CamaraAPIService
+from legislative_monitor.services.dto import VotacaoAPI, VotoAPI
+from legislative_monitor.services.pipeline import Pipeline
+from legislative_monitor.services.texto import normalizar
+from legislative_monitor.services.transporte import ErroRequisicaoAPI
+from legislative_monitor.services.upsert import upsert_alterados
+
+
+CAMPOS_ATUALIZAVEIS = [
+    'proposicao', 'data', 'descricao', 'tipo_votacao', 'aprovacao',
+    'votos_sim', 'votos_nao', 'votos_abstencao', 'updated_at',
+]
+
+# tipoVoto da API (normalizado) -> VotoDeputado.VOTO_CHOICES; "Artigo 17" (presidência) não é gravado
+TIPOS_VOTO = {
+    'sim': 'SIM',
+    'nao': 'NAO',
+    'abstencao': 'ABSTENCAO',
+    'obstrucao': 'OBSTRUCAO',
+    'ausente': 'AUSENTE',
+}
+
+
+class Command(SyncBaseCommand):
+    help = (
+        'Sincroniza votações e votos nominais das proposições: coletores em paralelo e um único '
+        'gravador que agrupa várias votações por transação'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ids',
+            type=int,
+            nargs='+',
+            help='IDs (API) das proposições cujas votações serão sincronizadas',
+        )
+        parser.add_argument(
+            '--ano',
+            type=int,
+            help='Sincroniza as votações das proposições deste ano',
+        )
+        parser.add_argument(
+            '--atualizadas-desde',
+            type=date.fromisoformat,
+            help='Apenas proposições atualizadas no banco a partir desta data (AAAA-MM-DD)',
+        )
+        parser.add_argument(
+            '--bloco',
+            type=int,
+            default=50,
+            help='Votações por transação de gravação (padrão: 50)',
+        )
+        parser.add_argument(
+            '--concorrencia',
+            type=int,
+            default=None,
+            help='Threads coletoras (padrão: CAMARA_API_CONCORRENCIA)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Votos por INSERT em lote (padrão: 1000)',
+        )
+
+    def nome_trava(self, options):
+        # Uma trava por seleção: lotes de IDs distintos (subtarefas Celery) rodam em paralelo
+        selecao = repr((sorted(options['ids'] or []), options['ano'], options['atualizadas_desde']))
+        return f'sync_votacoes:{hashlib.sha1(selecao.encode("utf-8")).hexdigest()[:12]}'
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        self.api = CamaraAPIService()
+        self.concorrencia = options['concorrencia']
+        self.lote = options['lote']
+        self.stats = {
+            'votacoes': 0, 'votacoes_inalteradas': 0, 'votos': 0, 'falhas': 0,
+            'deputados_desconhecidos': 0, 'votos_ignorados': 0, 'sem_data': 0,
+        }
+
+        proposicoes = Proposicao.objects.all()
+        if options['ids']:
+            proposicoes = proposicoes.filter(id_proposicao__in=options['ids'])
+        if options['ano']:
+            proposicoes = proposicoes.filter(ano=options['ano'])
+        if options['atualizadas_desde']:
+            proposicoes = proposicoes.filter(updated_at__date__gte=options['atualizadas_desde'])
+        mapa_proposicoes = dict(proposicoes.values_list('id_proposicao', 'id'))
+
+        self.stdout.write(f'Sincronizando votações de {len(mapa_proposicoes)} proposições...')
+
+        # Deputados carregados uma única vez: id da API -> pk
+        self.mapa_deputados = dict(Deputado.objects.values_list('id_deputado', 'id'))
+        if not self.mapa_deputados:
+            self.stdout.write(self.style.WARNING('Nenhum deputado no banco: rode sync_deputados antes.'))
+
+        self.mapa_proposicoes = mapa_proposicoes
+        self.concluidas = 0
+        pipeline = Pipeline(
+            buscar=self._buscar,
+            normalizar=self._normalizar,
+            gravar=self._gravar,
+            coletores=self.concorrencia,
+            tamanho_lote=options['bloco'],
+            erros_item=(ErroRequisicaoAPI,),
+        )
+        estatisticas = pipeline.executar(iter(mapa_proposicoes))
+        self.stats['falhas'] += estatisticas.falhas
+
+        # Relatório final
+        duracao = time.monotonic() - inicio
+        gravacao = estatisticas.tempo_gravacao
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS('SINCRONIZAÇÃO CONCLUÍDA'))
+        self.stdout.write('='*60)
+        self.stdout.write(self.style.SUCCESS(f'  • Votações gravadas: {self.stats["votacoes"]}'))
+        if self.stats['votacoes_inalteradas']:
+            self.stdout.write(f'  • Votações sem alteração (não regravadas): {self.stats["votacoes_inalteradas"]}')
+        self.stdout.write(self.style.SUCCESS(f'  • Votos processados: {self.stats["votos"]}'))
+        if self.stats['deputados_desconhecidos']:
+            self.stdout.write(self.style.WARNING(
+                f'  • Votos de deputados fora do banco (ignorados): {self.stats["deputados_desconhecidos"]}'
+            ))
+        if self.stats['votos_ignorados']:
+            self.stdout.write(f'  • Votos sem correspondência (ex: Artigo 17): {self.stats["votos_ignorados"]}')
+        if self.stats['sem_data']:
+            self.stdout.write(self.style.WARNING(
+                f'  • Votações sem data na API (ignoradas): {self.stats["sem_data"]}'
+            ))
+        if self.stats['falhas']:
+            self.stdout.write(self.style.ERROR(f'  • Falhas na API: {self.stats["falhas"]}'))
+        self.stdout.write(f'Tempo total: {duracao:.1f}s')
+        if duracao:
+            self.stdout.write(f'Vazão: {self.stats["votos"] / duracao:.0f} votos/s (ponta a ponta)')
+        if gravacao:
+            self.stdout.write(f'Vazão de gravação: {self.stats["votos"] / gravacao:.0f} votos/s')
+
+    # Estágios do pipeline ---------------------------------------------------------
+
+    def _buscar(self, id_proposicao):
+        """Coletores: votações da proposição e os votos de cada uma, como VotacaoAPI/VotoAPI"""
+        resposta = self.api.listar_votacoes_proposicao(id_proposicao)
+        if resposta is None:
+            raise ErroRequisicaoAPI(f'Votações da proposição {id_proposicao} indisponíveis')
+        votacoes = []
+        for dados in resposta.get('dados', []):
+            votacao = VotacaoAPI.de_api(dados)
+            # Votação cujos votos falharam não é gravada e será tentada de novo na próxima execução
+            votos = self.api.listar_votos_votacao(votacao.id)
+            votacoes.append((
+                votacao,
+                None if votos is None else [VotoAPI.de_api(voto) for voto in votos.get('dados', [])],
+            ))
+        return votacoes
+
+    def _normalizar(self, id_proposicao, votacoes):
+        """Normalizador: mapeia os votos e calcula os totais numa única passada por votação"""
+        registros = []
+        for registro, votos_api in votacoes:
+            if votos_api is None:
+                self.stats['falhas'] += 1
+                continue
+            if registro.data is None:
+                # Uma data inventada mudaria o hash (e regravaria a votação) a cada execução
+                self.stats['sem_data'] += 1
+                continue
+            votos = []
+            totais = {'SIM': 0, 'NAO': 0, 'ABSTENCAO': 0}
+            for voto_api in votos_api:
+                voto = TIPOS_VOTO.get(normalizar(voto_api.tipo_voto))
+                if voto is None:
+                    self.stats['votos_ignorados'] += 1
+                    continue
+                if voto in totais:
+                    totais[voto] += 1
+                deputado_pk = self.mapa_deputados.get(voto_api.id_deputado)
+                if deputado_pk is None:
+                    self.stats['deputados_desconhecidos'] += 1
+                    continue
+                votos.append((deputado_pk, voto))
+
+            votacao = Votacao(
+                id_votacao=registro.id,
+                proposicao_id=self.mapa_proposicoes[id_proposicao],
+                data=registro.data,
+                descricao=registro.descricao,
+                tipo_votacao='Nominal' if votos_api else 'Simbólica',
+                aprovacao=registro.aprovacao,
+                votos_sim=totais['SIM'],
+                votos_nao=totais['NAO'],
+                votos_abstencao=totais['ABSTENCAO'],
+            )
+            registros.append((votacao, votos))
+        return registros
+
+    def _gravar(self, registros, concluidas):
+        """Gravador: votações e votos de várias proposições numa única transação"""
+        por_votacao = {votacao.id_votacao: (votacao, votos) for votacao, votos in registros}
+        with transaction.atomic():
+            resultado = upsert_alterados(
+                Votacao, [votacao for votacao, _ in por_votacao.values()], 'id_votacao', CAMPOS_ATUALIZAVEIS,
+            )
+            # Votos já gravados são ignorados pelo ON CONFLICT; novos (ex.: deputado
+            # sincronizado depois) entram mesmo quando a votação não mudou
+            pks = dict(
+                Votacao.objects.filter(id_votacao__in=por_votacao).values_list('id_votacao', 'id')
+            )
+            votos = [
+                VotoDeputado(votacao_id=pks[id_votacao], deputado_id=deputado_pk, voto=voto)
+                for id_votacao, (_, votos_votacao) in por_votacao.items()
+                for deputado_pk, voto in votos_votacao
+            ]
+            VotoDeputado.objects.bulk_create(votos, batch_size=self.lote, ignore_conflicts=True)
+
+        self.stats['votacoes'] += len(por_votacao)
+        self.stats['votacoes_inalteradas'] += resultado.inalterados
+        self.stats['votos'] += len(votos)
+        self.concluidas += len(concluidas)
+        self.stdout.write(
+            f'  {self.concluidas}/{len(self.mapa_proposicoes)} proposições, '
+            f'{self.stats["votacoes"]} votações, {self.stats["votos"]} votos'
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative_monitor', '0008_fix_partido_url_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckpointSincronizacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fonte', models.CharField(help_text='Identificador da sincronização (ex: proposicoes)', max_length=100, unique=True)),
+                ('watermark', models.DateField(blank=True, help_text='Data até a qual todas as janelas foram sincronizadas', null=True)),
+                ('janela_inicio', models.DateField(blank=True, null=True)),
+                ('janela_fim', models.DateField(blank=True, null=True)),
+                ('pagina', models.PositiveIntegerField(default=0, help_text='Última página confirmada (gravada) na janela em andamento')),
+                ('status', models.CharField(choices=[('EM_ANDAMENTO', 'Em andamento'), ('CONCLUIDO', 'Concluído'), ('ERRO', 'Erro')], default='EM_ANDAMENTO', max_length=20)),
+                ('detalhes', models.JSONField(blank=True, default=dict, help_text='Dados auxiliares (ex: IDs pendentes de nova tentativa)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de Sincronização',
+                'verbose_name_plural': 'Checkpoints de Sincronização',
+                'ordering': ['fonte'],
+            },
+        ),
+    ]
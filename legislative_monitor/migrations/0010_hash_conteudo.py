@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative_monitor', '0009_checkpointsincronizacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deputado',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='discurso',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='estado',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='municipio',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='proposicao',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='regiao',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='tipoproposicao',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='votacao',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash do conteúdo vindo da API; updated_at só muda quando ele muda', max_length=40),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative_monitor', '0010_hash_conteudo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EtapaSincronizacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('execucao', models.CharField(db_index=True, help_text='Identificador da execução do sync_all (data e hora de início)', max_length=32)),
+                ('etapa', models.CharField(help_text='Nome da etapa no grafo de dependências', max_length=50)),
+                ('comando', models.CharField(help_text='Comando de management executado', max_length=255)),
+                ('dependencias', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('PENDENTE', 'Pendente'), ('EM_ANDAMENTO', 'Em andamento'), ('CONCLUIDO', 'Concluído'), ('ERRO', 'Erro'), ('IGNORADO', 'Ignorado (dependência falhou)')], default='PENDENTE', max_length=20)),
+                ('inicio', models.DateTimeField(blank=True, null=True)),
+                ('fim', models.DateTimeField(blank=True, null=True)),
+                ('duracao', models.FloatField(blank=True, help_text='Duração em segundos', null=True)),
+                ('codigo_saida', models.IntegerField(blank=True, null=True)),
+                ('saida', models.TextField(blank=True, help_text='Final da saída do comando')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Etapa de Sincronização',
+                'verbose_name_plural': 'Etapas de Sincronização',
+                'ordering': ['-execucao', 'inicio'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='etapasincronizacao',
+            constraint=models.UniqueConstraint(fields=('execucao', 'etapa'), name='unique_etapa_por_execucao'),
+        ),
+    ]
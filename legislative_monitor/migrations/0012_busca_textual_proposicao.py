@@ -0,0 +1,87 @@
+from django.db import migrations
+
+
+TABELA = 'legislative_monitor_proposicao'
+TABELA_FTS = 'legislative_monitor_proposicao_fts'
+
+POSTGRES = [
+    f"""
+    ALTER TABLE {TABELA} ADD COLUMN busca tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese'::regconfig, coalesce(ementa, '')), 'A')
+        || setweight(to_tsvector('portuguese'::regconfig, coalesce(ementa_detalhada, '')), 'B')
+    ) STORED
+    """,
+    f'CREATE INDEX {TABELA}_busca_gin ON {TABELA} USING gin (busca)',
+]
+
+POSTGRES_REVERSO = [
+    f'DROP INDEX IF EXISTS {TABELA}_busca_gin',
+    f'ALTER TABLE {TABELA} DROP COLUMN IF EXISTS busca',
+]
+
+# Tabela FTS5 com conteúdo externo: guarda só o índice, o texto continua na tabela
+# da proposição. Os triggers repetem no índice cada INSERT/UPDATE/DELETE (inclusive
+# os upserts em lote, que no SQLite disparam os triggers de UPDATE)
+SQLITE = [
+    f"""
+    CREATE VIRTUAL TABLE {TABELA_FTS} USING fts5(
+        ementa, ementa_detalhada,
+        content='{TABELA}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {TABELA_FTS}_ai AFTER INSERT ON {TABELA} BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, ementa, ementa_detalhada)
+        VALUES (new.id, new.ementa, new.ementa_detalhada);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TABELA_FTS}_ad AFTER DELETE ON {TABELA} BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, ementa, ementa_detalhada)
+        VALUES ('delete', old.id, old.ementa, old.ementa_detalhada);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TABELA_FTS}_au AFTER UPDATE OF ementa, ementa_detalhada ON {TABELA} BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, ementa, ementa_detalhada)
+        VALUES ('delete', old.id, old.ementa, old.ementa_detalhada);
+        INSERT INTO {TABELA_FTS}(rowid, ementa, ementa_detalhada)
+        VALUES (new.id, new.ementa, new.ementa_detalhada);
+    END
+    """,
+    # Indexa as proposições já gravadas
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSO = [
+    f'DROP TRIGGER IF EXISTS {TABELA_FTS}_ai',
+    f'DROP TRIGGER IF EXISTS {TABELA_FTS}_ad',
+    f'DROP TRIGGER IF EXISTS {TABELA_FTS}_au',
+    f'DROP TABLE IF EXISTS {TABELA_FTS}',
+]
+
+
+def _executar(comandos):
+    def executar(apps, schema_editor):
+        for sql in comandos.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return executar
+
+
+class Migration(migrations.Migration):
+    """
+    Índice de busca textual das ementas (ver services/busca.py). Depende do banco, por
+    isso não é um campo do model: em outros bancos a migração não faz nada.
+    """
+
+    dependencies = [
+        ('legislative_monitor', '0011_etapasincronizacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _executar({'postgresql': POSTGRES, 'sqlite': SQLITE}),
+            _executar({'postgresql': POSTGRES_REVERSO, 'sqlite': SQLITE_REVERSO}),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:02
+
+import sqlite3
+import unicodedata
+
+from django.db import migrations, models
+
+
+TABELAS = ('legislative_monitor_deputado', 'legislative_monitor_partido')
+
+
+def _chave_busca(*partes):
+    decomposto = unicodedata.normalize('NFKD', ' '.join(parte for parte in partes if parte))
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.lower().split())
+
+
+def preencher_nome_busca(apps, schema_editor):
+    for nome_model, campos in (('Deputado', ('nome', 'nome_civil')), ('Partido', ('sigla', 'nome'))):
+        modelo = apps.get_model('legislative_monitor', nome_model)
+        objetos = list(modelo.objects.only('id', *campos))
+        for objeto in objetos:
+            objeto.nome_busca = _chave_busca(*(getattr(objeto, campo) for campo in campos))
+        modelo.objects.bulk_update(objetos, ['nome_busca'], batch_size=500)
+
+
+def _sql_indices(vendor):
+    """pg_trgm (GIN) no PostgreSQL; FTS5 com tokenizador trigram no SQLite >= 3.34"""
+    comandos = []
+    if vendor == 'postgresql':
+        comandos.append('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for tabela in TABELAS:
+            comandos.append(
+                f'CREATE INDEX {tabela}_nome_busca_trgm ON {tabela} USING gin (nome_busca gin_trgm_ops)'
+            )
+    elif vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34):
+        for tabela in TABELAS:
+            fts = f'{tabela}_nome_fts'
+            comandos += [
+                f"""
+                CREATE VIRTUAL TABLE {fts} USING fts5(
+                    nome_busca, content='{tabela}', content_rowid='id', tokenize='trigram'
+                )
+                """,
+                f"""
+                CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabela} BEGIN
+                    INSERT INTO {fts}(rowid, nome_busca) VALUES (new.id, new.nome_busca);
+                END
+                """,
+                f"""
+                CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabela} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, nome_busca) VALUES ('delete', old.id, old.nome_busca);
+                END
+                """,
+                f"""
+                CREATE TRIGGER {fts}_au AFTER UPDATE OF nome_busca ON {tabela} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, nome_busca) VALUES ('delete', old.id, old.nome_busca);
+                    INSERT INTO {fts}(rowid, nome_busca) VALUES (new.id, new.nome_busca);
+                END
+                """,
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            ]
+    return comandos
+
+
+def _sql_indices_reverso(vendor):
+    comandos = []
+    for tabela in TABELAS:
+        if vendor == 'postgresql':
+            comandos.append(f'DROP INDEX IF EXISTS {tabela}_nome_busca_trgm')
+        elif vendor == 'sqlite':
+            fts = f'{tabela}_nome_fts'
+            comandos += [f'DROP TRIGGER IF EXISTS {fts}_{sufixo}' for sufixo in ('ai', 'ad', 'au')]
+            comandos.append(f'DROP TABLE IF EXISTS {fts}')
+    return comandos
+
+
+def criar_indices(apps, schema_editor):
+    for sql in _sql_indices(schema_editor.connection.vendor):
+        schema_editor.execute(sql)
+
+
+def remover_indices(apps, schema_editor):
+    for sql in _sql_indices_reverso(schema_editor.connection.vendor):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    """
+    Colunas de busca por nome sem acentos e seus índices de trigramas (ver
+    services/busca.py). Os índices dependem do banco, por isso ficam fora do Meta.
+    """
+
+    dependencies = [
+        ('legislative_monitor', '0012_busca_textual_proposicao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deputado',
+            name='nome_busca',
+            field=models.CharField(blank=True, editable=False, help_text='Nome e nome civil sem acentos e em minúsculas', max_length=512),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='nome_busca',
+            field=models.CharField(blank=True, editable=False, help_text='Sigla e nome sem acentos e em minúsculas', max_length=300),
+        ),
+        migrations.RunPython(preencher_nome_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative_monitor', '0013_nome_busca'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deputado',
+            index=models.Index(fields=['nome'], name='legislative_nome_3f6a5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deputado',
+            index=models.Index(fields=['sigla_partido', 'nome'], name='legislative_sigla_p_c50238_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deputado',
+            index=models.Index(fields=['uf_representacao', 'nome'], name='legislative_uf_repr_31940e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discurso',
+            index=models.Index(fields=['-data'], name='legislative_data_1a706b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discurso',
+            index=models.Index(fields=['deputado', '-data'], name='legislative_deputad_35d7fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['-data_apresentacao'], name='legislative_data_ap_df3008_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['situacao', '-data_apresentacao'], name='legislative_situaca_ad0174_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['ano', '-data_apresentacao'], name='legislative_ano_498f46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['tipo', '-data_apresentacao'], name='legislative_tipo_id_481b1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['autor', '-data_apresentacao'], name='legislative_autor_i_72e95c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votacao',
+            index=models.Index(fields=['-data'], name='legislative_data_0945f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votacao',
+            index=models.Index(fields=['proposicao', '-data'], name='legislative_proposi_1ee239_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votodeputado',
+            index=models.Index(fields=['deputado', 'voto'], name='legislative_deputad_e3ac82_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative_monitor', '0014_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='proposicao',
+            name='legislative_data_ap_df3008_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='proposicao',
+            name='legislative_situaca_ad0174_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='proposicao',
+            name='legislative_ano_498f46_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='proposicao',
+            name='legislative_tipo_id_481b1c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='proposicao',
+            name='legislative_autor_i_72e95c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='votacao',
+            name='legislative_data_0945f5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='votacao',
+            name='legislative_proposi_1ee239_idx',
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['-data_apresentacao', '-id'], name='legislative_data_ap_e877e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['situacao', '-data_apresentacao', '-id'], name='legislative_situaca_2718e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['ano', '-data_apresentacao', '-id'], name='legislative_ano_2b9b47_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['tipo', '-data_apresentacao', '-id'], name='legislative_tipo_id_20d204_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposicao',
+            index=models.Index(fields=['autor', '-data_apresentacao', '-id'], name='legislative_autor_i_5069ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votacao',
+            index=models.Index(fields=['-data', '-id'], name='legislative_data_26b290_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votacao',
+            index=models.Index(fields=['proposicao', '-data', '-id'], name='legislative_proposi_bcdf51_idx'),
+        ),
+    ]
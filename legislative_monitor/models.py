@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils import timezone
 
+from legislative_monitor.services.texto import chave_busca
+
 
 class Deputado(models.Model):
     """Modelo para representar um deputado federal"""
@@ -69,7 +71,11 @@ class Deputado(models.Model):
     url_website = models.URLField(blank=True)
     url_foto = models.URLField(blank=True)
     
+    # Busca por nome (índice de trigramas, ver services/busca.py)
+    nome_busca = models.CharField(max_length=512, blank=True, editable=False, help_text="Nome e nome civil sem acentos e em minúsculas")
+    
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -77,11 +83,25 @@ class Deputado(models.Model):
         verbose_name = "Deputado"
         verbose_name_plural = "Deputados"
         ordering = ['nome']
+        # Lista de deputados: ordenada por nome, com ou sem filtro de partido/UF
+        indexes = [
+            models.Index(fields=['nome']),
+            models.Index(fields=['sigla_partido', 'nome']),
+            models.Index(fields=['uf_representacao', 'nome']),
+        ]
     
     def __str__(self):
         partido = self.sigla_partido.sigla if self.sigla_partido else ''
         uf = self.uf_representacao.sigla if self.uf_representacao else ''
         return f"{self.nome} - {partido}/{uf}"
+    
+    def atualizar_nome_busca(self):
+        """Gravações em lote (que não passam pelo save) precisam chamar este método"""
+        self.nome_busca = chave_busca(self.nome, self.nome_civil)
+    
+    def save(self, *args, **kwargs):
+        self.atualizar_nome_busca()
+        super().save(*args, **kwargs)
 
 
 class Proposicao(models.Model):
@@ -123,6 +143,7 @@ class Proposicao(models.Model):
     url_tramitacao = models.URLField(blank=True)
     
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -130,6 +151,16 @@ class Proposicao(models.Model):
         verbose_name = "Proposição"
         verbose_name_plural = "Proposições"
         ordering = ['-data_apresentacao']
+        # Cada filtro da lista de proposições (e as proposições do autor) seguido da
+        # ordenação da paginação por cursor (com o id de desempate), para ler só a página
+        # pedida já na ordem
+        indexes = [
+            models.Index(fields=['-data_apresentacao', '-id']),
+            models.Index(fields=['situacao', '-data_apresentacao', '-id']),
+            models.Index(fields=['ano', '-data_apresentacao', '-id']),
+            models.Index(fields=['tipo', '-data_apresentacao', '-id']),
+            models.Index(fields=['autor', '-data_apresentacao', '-id']),
+        ]
     
     def __str__(self):
         tipo_str = self.tipo.sigla if self.tipo else ''
@@ -151,6 +182,7 @@ class Votacao(models.Model):
     votos_abstencao = models.IntegerField(default=0)
     
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -158,6 +190,10 @@ class Votacao(models.Model):
         verbose_name = "Votação"
         verbose_name_plural = "Votações"
         ordering = ['-data']
+        indexes = [
+            models.Index(fields=['-data', '-id']),
+            models.Index(fields=['proposicao', '-data', '-id']),
+        ]
     
     def __str__(self):
         return f"Votação {self.id_votacao} - {self.data.strftime('%d/%m/%Y')}"
@@ -184,6 +220,10 @@ class VotoDeputado(models.Model):
         verbose_name = "Voto do Deputado"
         verbose_name_plural = "Votos dos Deputados"
         unique_together = ['votacao', 'deputado']
+        # Contagem por deputado e tipo de voto (perfil parlamentar) só com o índice
+        indexes = [
+            models.Index(fields=['deputado', 'voto']),
+        ]
     
     def __str__(self):
         return f"{self.deputado.nome} - {self.voto}"
@@ -204,6 +244,7 @@ class Discurso(models.Model):
     url_video = models.URLField(blank=True)
     
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -211,6 +252,10 @@ class Discurso(models.Model):
         verbose_name = "Discurso"
         verbose_name_plural = "Discursos"
         ordering = ['-data']
+        indexes = [
+            models.Index(fields=['-data']),
+            models.Index(fields=['deputado', '-data']),
+        ]
     
     def __str__(self):
         return f"Discurso de {self.deputado.nome} em {self.data.strftime('%d/%m/%Y')}"
@@ -223,6 +268,7 @@ class Regiao(models.Model):
     nome = models.CharField(max_length=100, help_text="Nome da Região")
     
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -243,6 +289,7 @@ class Estado(models.Model):
     regiao = models.ForeignKey(Regiao, on_delete=models.PROTECT, related_name='estados', help_text="Região do Estado")
     
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -263,6 +310,7 @@ class Municipio(models.Model):
     is_capital = models.BooleanField(default=False, help_text="Indica se o município é a capital do Estado")
     
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -292,6 +340,7 @@ class TipoProposicao(models.Model):
     descricao = models.TextField(blank=True, help_text="Descrição detalhada do tipo de proposição")
     
     # Metadados
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -548,7 +597,21 @@ class Partido(models.Model):
         help_text="URL da página do Facebook do partido"
     )
     
+    # Busca por nome (índice de trigramas, ver services/busca.py)
+    nome_busca = models.CharField(
+        max_length=300,
+        blank=True,
+        editable=False,
+        help_text="Sigla e nome sem acentos e em minúsculas"
+    )
+    
     # Metadados
+    hash_conteudo = models.CharField(
+        max_length=40,
+        blank=True,
+        editable=False,
+        help_text="Hash do conteúdo vindo da API; updated_at só muda quando ele muda"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -563,3 +626,99 @@ class Partido(models.Model):
     
     def __str__(self):
         return f"{self.sigla} - {self.nome}"
+    
+    def atualizar_nome_busca(self):
+        """Gravações em lote (que não passam pelo save) precisam chamar este método"""
+        self.nome_busca = chave_busca(self.sigla, self.nome)
+    
+    def save(self, *args, **kwargs):
+        self.atualizar_nome_busca()
+        super().save(*args, **kwargs)
+
+
+class CheckpointSincronizacao(models.Model):
+    """Progresso persistido de uma sincronização incremental (watermark + página confirmada)"""
+    STATUS_CHOICES = [
+        ('EM_ANDAMENTO', 'Em andamento'),
+        ('CONCLUIDO', 'Concluído'),
+        ('ERRO', 'Erro'),
+    ]
+    
+    fonte = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Identificador da sincronização (ex: proposicoes)"
+    )
+    watermark = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Data até a qual todas as janelas foram sincronizadas"
+    )
+    
+    # Janela em andamento (nula quando não há execução interrompida)
+    janela_inicio = models.DateField(null=True, blank=True)
+    janela_fim = models.DateField(null=True, blank=True)
+    pagina = models.PositiveIntegerField(
+        default=0,
+        help_text="Última página confirmada (gravada) na janela em andamento"
+    )
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='EM_ANDAMENTO')
+    detalhes = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Dados auxiliares (ex: IDs pendentes de nova tentativa)"
+    )
+    
+    # Metadados
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Checkpoint de Sincronização"
+        verbose_name_plural = "Checkpoints de Sincronização"
+        ordering = ['fonte']
+    
+    def __str__(self):
+        return f"{self.fonte} até {self.watermark or '-'} ({self.get_status_display()})"
+
+
+class EtapaSincronizacao(models.Model):
+    """Status de uma etapa (subprocesso) de uma execução do comando sync_all"""
+    STATUS_CHOICES = [
+        ('PENDENTE', 'Pendente'),
+        ('EM_ANDAMENTO', 'Em andamento'),
+        ('CONCLUIDO', 'Concluído'),
+        ('ERRO', 'Erro'),
+        ('IGNORADO', 'Ignorado (dependência falhou)'),
+    ]
+    
+    execucao = models.CharField(
+        max_length=32,
+        db_index=True,
+        help_text="Identificador da execução do sync_all (data e hora de início)"
+    )
+    etapa = models.CharField(max_length=50, help_text="Nome da etapa no grafo de dependências")
+    comando = models.CharField(max_length=255, help_text="Comando de management executado")
+    dependencias = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDENTE')
+    inicio = models.DateTimeField(null=True, blank=True)
+    fim = models.DateTimeField(null=True, blank=True)
+    duracao = models.FloatField(null=True, blank=True, help_text="Duração em segundos")
+    codigo_saida = models.IntegerField(null=True, blank=True)
+    saida = models.TextField(blank=True, help_text="Final da saída do comando")
+    
+    # Metadados
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Etapa de Sincronização"
+        verbose_name_plural = "Etapas de Sincronização"
+        ordering = ['-execucao', 'inicio']
+        constraints = [
+            models.UniqueConstraint(fields=['execucao', 'etapa'], name='unique_etapa_por_execucao'),
+        ]
+    
+    def __str__(self):
+        return f"{self.execucao} {self.etapa} ({self.get_status_display()})"
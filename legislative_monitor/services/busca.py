@@ -0,0 +1,274 @@
+"""
+Busca textual: ementas das proposições e nomes de deputados e partidos
+
+Os índices são criados pelas migrações 0012 (ementas) e 0013 (nomes), conforme o banco:
+
+- PostgreSQL: coluna gerada `busca` (tsvector, configuração 'portuguese', ementa com
+  peso A e ementa detalhada com peso B) com índice GIN; `nome_busca` com índice GIN
+  de trigramas (pg_trgm);
+- SQLite: tabelas FTS5 com conteúdo externo mantidas por triggers; a das ementas usa
+  o tokenizador unicode61 sem acentos e as dos nomes, o tokenizador trigram.
+
+`buscar_proposicoes` devolve um queryset filtrado pelo índice, anotado com `rank`
+(maior = mais relevante) e `trecho` (ementa com os termos encontrados entre
+MARCA_INICIO e MARCA_FIM; ver o filtro `destacar`) e ordenado por relevância.
+
+`buscar_por_nome` (listas públicas) e `filtro_nome` (admin) fazem a busca por nome
+sem distinção de acentos e caixa sobre a coluna `nome_busca`; no PostgreSQL a
+ordenação é pela similaridade de trigramas, tolerando erros de digitação.
+
+Em outros bancos, ambas caem para buscas por substring sem ranking.
+
+No SQLite, uma migração que reconstrói a tabela (AlterField, por exemplo) apaga os
+triggers sem aviso e o índice deixa de acompanhar as gravações. `triggers_fts_ausentes`
+os detecta (verificação de sistema em checks.py) e `recriar_triggers_fts`, chamado
+depois de cada `migrate`, os recria e reconstrói os índices afetados.
+"""
+import re
+import sqlite3
+
+from django.db import connections, transaction
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from legislative_monitor.models import Deputado, Partido, Proposicao
+from legislative_monitor.services.texto import chave_busca
+
+
+TABELA_FTS = 'legislative_monitor_proposicao_fts'
+
+# Delimitadores dos termos encontrados no trecho; o HTML só é montado no template,
+# depois de escapar o texto (a ementa vem da API e não é confiável)
+MARCA_INICIO = '⟦'
+MARCA_FIM = '⟧'
+
+_TERMOS = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def buscar_proposicoes(termo, queryset=None):
+    """
+    Proposições cuja ementa (ou ementa detalhada) contém os termos, mais relevantes
+    primeiro. `queryset` permite combinar a busca com outros filtros.
+    """
+    if queryset is None:
+        queryset = Proposicao.objects.all()
+    termo = (termo or '').strip()
+    if not termo:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _buscar_postgres(queryset, termo)
+    if vendor == 'sqlite':
+        return _buscar_sqlite(queryset, termo)
+    return queryset.filter(
+        Q(ementa__icontains=termo) | Q(ementa_detalhada__icontains=termo)
+    ).annotate(rank=Value(0.0), trecho=F('ementa')).order_by('-data_apresentacao')
+
+
+def _buscar_postgres(queryset, termo):
+    """Consulta no formato de buscadores ("frase exata", OR, -exclusão) sobre a coluna gerada"""
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVectorField
+
+    consulta = SearchQuery(termo, config='portuguese', search_type='websearch')
+    vetor = RawSQL(f'"{Proposicao._meta.db_table}"."busca"', [], output_field=SearchVectorField())
+    return (
+        queryset
+        .alias(vetor_busca=vetor)
+        .filter(vetor_busca=consulta)
+        .annotate(
+            rank=SearchRank(vetor, consulta),
+            trecho=SearchHeadline(
+                'ementa', consulta, config='portuguese',
+                start_sel=MARCA_INICIO, stop_sel=MARCA_FIM, max_words=50, min_words=20,
+            ),
+        )
+        .order_by('-rank', '-data_apresentacao')
+    )
+
+
+def _buscar_sqlite(queryset, termo):
+    """Junção com a tabela FTS5: o MATCH roda uma vez e o bm25 vem da coluna `rank`"""
+    tabela = Proposicao._meta.db_table
+    return queryset.extra(
+        select={
+            # bm25 é negativo (menor = melhor); invertido para seguir a convenção do PostgreSQL
+            'rank': f'-{TABELA_FTS}.rank',
+            'trecho': f'highlight({TABELA_FTS}, 0, %s, %s)',
+        },
+        select_params=(MARCA_INICIO, MARCA_FIM),
+        tables=[TABELA_FTS],
+        where=[f'{TABELA_FTS}.rowid = "{tabela}"."id"', f'{TABELA_FTS} MATCH %s'],
+        params=[consulta_fts5(termo)],
+    ).order_by('-rank', '-data_apresentacao')
+
+
+def consulta_fts5(termo):
+    """
+    Converte a busca do usuário numa consulta FTS5 segura: "frases" entre aspas,
+    -termo exclui e os demais termos são exigidos (o último também como prefixo,
+    para a busca enquanto se digita)
+    """
+    exigidos, excluidos = [], []
+    prefixo = False
+    for frase, palavra in _TERMOS.findall(termo):
+        negado = palavra.startswith('-') and len(palavra) > 1
+        texto = frase or (palavra[1:] if negado else palavra)
+        texto = '"' + texto.replace('"', '""') + '"'
+        (excluidos if negado else exigidos).append(texto)
+        prefixo = bool(palavra) and not negado
+    if not exigidos:
+        # FTS5 não aceita consulta só com NOT: nenhuma linha
+        return '""'
+    if prefixo:
+        exigidos[-1] += '*'
+    return ' NOT '.join([' AND '.join(exigidos)] + excluidos)
+
+
+def buscar_por_nome(queryset, termo):
+    """
+    Linhas de `queryset` (Deputado ou Partido) cujo nome se parece com `termo`,
+    anotadas com `similaridade` e ordenadas da mais parecida para a menos
+    """
+    modelo = queryset.model
+    chave = chave_busca(termo)
+    if not chave:
+        return queryset.none()
+    return (
+        queryset
+        .filter(filtro_nome(modelo, chave, queryset.db))
+        .annotate(similaridade=_similaridade_nome(modelo, chave, queryset.db))
+        .order_by('-similaridade', *modelo._meta.ordering)
+    )
+
+
+def filtro_nome(modelo, termo, using='default'):
+    """Q da busca por nome em `modelo`; combinável com outros filtros (ex.: busca do admin)"""
+    chave = chave_busca(termo)
+    if not chave:
+        return Q(pk__in=[])
+
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+
+        # %> usa o índice GIN; o LIKE cobre termos curtos demais para a similaridade
+        return Q(TrigramWordSimilar(F('nome_busca'), Value(chave))) | Q(nome_busca__contains=chave)
+
+    filtro = Q()
+    palavras = chave.split()
+    if _trigramas_sqlite(vendor):
+        longas = [palavra for palavra in palavras if len(palavra) >= 3]
+        if longas:
+            tabela = _tabela_nome_fts(modelo)
+            filtro &= Q(pk__in=RawSQL(
+                f'SELECT rowid FROM {tabela} WHERE {tabela} MATCH %s', [_consulta_trigramas(longas)]
+            ))
+        # O tokenizador trigram não indexa termos com menos de 3 caracteres
+        palavras = [palavra for palavra in palavras if len(palavra) < 3]
+    for palavra in palavras:
+        filtro &= Q(nome_busca__contains=palavra)
+    return filtro
+
+
+def _similaridade_nome(modelo, chave, using):
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return TrigramWordSimilarity(chave, 'nome_busca')
+
+    longas = [palavra for palavra in chave.split() if len(palavra) >= 3]
+    if _trigramas_sqlite(vendor) and longas:
+        # bm25 das linhas já filtradas (poucas: nomes que contêm os termos)
+        tabela = _tabela_nome_fts(modelo)
+        return RawSQL(
+            f'(SELECT -rank FROM {tabela} WHERE {tabela} MATCH %s '
+            f'AND rowid = "{modelo._meta.db_table}"."id")',
+            [_consulta_trigramas(longas)],
+            output_field=FloatField(),
+        )
+    return Value(0.0, output_field=FloatField())
+
+
+def _trigramas_sqlite(vendor):
+    """A migração 0013 só cria as tabelas FTS5 trigram no SQLite >= 3.34"""
+    return vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34)
+
+
+def _tabela_nome_fts(modelo):
+    return f'{modelo._meta.db_table}_nome_fts'
+
+
+def _consulta_trigramas(palavras):
+    """Cada palavra como substring exigida, em qualquer ordem"""
+    return ' AND '.join('"' + palavra.replace('"', '""') + '"' for palavra in palavras)
+
+
+# Triggers das tabelas FTS5 (SQLite) --------------------------------------------
+
+def _indices_fts_sqlite():
+    """(tabela, tabela FTS5, colunas) de cada índice criado pelas migrações 0012 e 0013"""
+    indices = [(Proposicao._meta.db_table, TABELA_FTS, ('ementa', 'ementa_detalhada'))]
+    if _trigramas_sqlite('sqlite'):
+        indices += [
+            (modelo._meta.db_table, _tabela_nome_fts(modelo), ('nome_busca',))
+            for modelo in (Deputado, Partido)
+        ]
+    return indices
+
+
+def _sql_triggers(tabela, fts, colunas):
+    """Nome -> CREATE TRIGGER de cada trigger que mantém `fts` (mesmo SQL das migrações)"""
+    lista = ', '.join(colunas)
+    novos = ', '.join(f'new.{coluna}' for coluna in colunas)
+    antigos = ', '.join(f'old.{coluna}' for coluna in colunas)
+    inserir = f'INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {novos});'
+    remover = f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});"
+    return {
+        f'{fts}_ai': f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabela} BEGIN {inserir} END',
+        f'{fts}_ad': f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabela} BEGIN {remover} END',
+        f'{fts}_au': (
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON {tabela} '
+            f'BEGIN {remover} {inserir} END'
+        ),
+    }
+
+
+def triggers_fts_ausentes(using='default'):
+    """
+    Tabela FTS5 -> triggers que faltam para mantê-la; vazio fora do SQLite e antes das
+    migrações que criam os índices
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existentes = {(tipo, nome) for tipo, nome in cursor.fetchall()}
+    ausentes = {}
+    for tabela, fts, colunas in _indices_fts_sqlite():
+        if ('table', fts) not in existentes:
+            continue
+        faltando = [nome for nome in _sql_triggers(tabela, fts, colunas) if ('trigger', nome) not in existentes]
+        if faltando:
+            ausentes[fts] = faltando
+    return ausentes
+
+
+def recriar_triggers_fts(using='default'):
+    """
+    Recria os triggers ausentes e reconstrói os índices FTS5 correspondentes (as
+    gravações feitas sem os triggers não chegaram a eles); devolve as tabelas reconstruídas
+    """
+    ausentes = triggers_fts_ausentes(using)
+    if not ausentes:
+        return []
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for tabela, fts, colunas in _indices_fts_sqlite():
+            if fts not in ausentes:
+                continue
+            for sql in _sql_triggers(tabela, fts, colunas).values():
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return sorted(ausentes)
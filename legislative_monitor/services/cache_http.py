@@ -0,0 +1,200 @@
+"""
+Cache HTTP em disco para as respostas das APIs da Câmara e do IBGE
+
+Cada resposta JSON é guardada junto com ETag/Last-Modified. Dentro do TTL do
+endpoint a resposta é servida direto do disco; vencido o TTL, o transporte faz
+uma requisição condicional (If-None-Match / If-Modified-Since) e um 304 apenas
+renova a entrada local. O tamanho total é limitado com descarte LRU.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+
+logger = logging.getLogger(__name__)
+
+
+class EntradaCache:
+    """Resposta armazenada no cache"""
+    __slots__ = ('chave', 'corpo', 'etag', 'last_modified', 'armazenado_em', 'ttl')
+
+    def __init__(self, chave, corpo, etag, last_modified, armazenado_em, ttl):
+        self.chave = chave
+        self.corpo = corpo
+        self.etag = etag
+        self.last_modified = last_modified
+        self.armazenado_em = armazenado_em
+        self.ttl = ttl
+
+    @property
+    def fresca(self):
+        return time.time() - self.armazenado_em < self.ttl
+
+    def cabecalhos_condicionais(self):
+        cabecalhos = {}
+        if self.etag:
+            cabecalhos['If-None-Match'] = self.etag
+        if self.last_modified:
+            cabecalhos['If-Modified-Since'] = self.last_modified
+        return cabecalhos
+
+
+class CacheHTTPDisco:
+    """
+    Cache persistente de respostas JSON, com TTL por endpoint e limite de tamanho (LRU).
+    `ttls` é uma lista de pares (regex, segundos) testados contra a URL; URLs que não
+    casam com nenhum padrão não são armazenadas.
+    """
+
+    def __init__(self, diretorio, ttls, tamanho_max):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.ttls = [(re.compile(padrao), segundos) for padrao, segundos in ttls]
+        self.tamanho_max = tamanho_max
+        self._lock = threading.Lock()
+        self._tamanho_atual = sum(arquivo.stat().st_size for arquivo in self._arquivos())
+
+    def ttl_para(self, url):
+        for padrao, segundos in self.ttls:
+            if padrao.search(url):
+                return segundos
+        return None
+
+    def obter(self, url, params=None):
+        """Retorna a EntradaCache da URL (fresca ou não) ou None"""
+        ttl = self.ttl_para(url)
+        if ttl is None:
+            return None
+
+        chave = self._chave(url, params)
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+            # Atualiza o mtime para a política LRU
+            os.utime(caminho)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning('Entrada de cache corrompida descartada (%s): %s', caminho.name, e)
+            self._remover(caminho)
+            return None
+
+        return EntradaCache(
+            chave=chave,
+            corpo=dados['corpo'],
+            etag=dados.get('etag'),
+            last_modified=dados.get('last_modified'),
+            armazenado_em=dados['armazenado_em'],
+            ttl=ttl,
+        )
+
+    def armazenar(self, url, params, corpo, etag=None, last_modified=None):
+        """Grava (ou substitui) a resposta de uma URL cacheável"""
+        if self.ttl_para(url) is None:
+            return
+        self._gravar(self._chave(url, params), {
+            'url': url,
+            'corpo': corpo,
+            'etag': etag,
+            'last_modified': last_modified,
+            'armazenado_em': time.time(),
+        })
+
+    def renovar(self, entrada, etag=None, last_modified=None):
+        """
+        Marca uma entrada como revalidada (resposta 304). ETag/Last-Modified enviados no
+        304 substituem os guardados
+        """
+        entrada.armazenado_em = time.time()
+        entrada.etag = etag or entrada.etag
+        entrada.last_modified = last_modified or entrada.last_modified
+        caminho = self._caminho(entrada.chave)
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+        except (OSError, ValueError):
+            return
+        dados.update({
+            'armazenado_em': entrada.armazenado_em,
+            'etag': entrada.etag,
+            'last_modified': entrada.last_modified,
+        })
+        self._gravar(entrada.chave, dados)
+
+    def limpar(self):
+        for arquivo in self._arquivos():
+            self._remover(arquivo)
+
+    def _gravar(self, chave, dados):
+        caminho = self._caminho(chave)
+        caminho.parent.mkdir(exist_ok=True)
+        conteudo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+
+        # Escrita atômica: outros processos/threads nunca leem um arquivo pela metade
+        descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(conteudo)
+            try:
+                tamanho_anterior = caminho.stat().st_size
+            except FileNotFoundError:
+                tamanho_anterior = 0
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.warning('Falha ao gravar no cache HTTP: %s', e)
+            self._remover(Path(temporario))
+            return
+
+        with self._lock:
+            self._tamanho_atual += len(conteudo) - tamanho_anterior
+            excedeu = self._tamanho_atual > self.tamanho_max
+        if excedeu:
+            self._descartar_lru()
+
+    def _descartar_lru(self):
+        """Remove as entradas menos usadas até ficar em 90% do limite"""
+        with self._lock:
+            arquivos = []
+            for arquivo in self._arquivos():
+                try:
+                    info = arquivo.stat()
+                except FileNotFoundError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, arquivo))
+            arquivos.sort()
+
+            total = sum(tamanho for _, tamanho, _ in arquivos)
+            alvo = self.tamanho_max * 0.9
+            for _, tamanho, arquivo in arquivos:
+                if total <= alvo:
+                    break
+                self._remover(arquivo)
+                total -= tamanho
+            self._tamanho_atual = total
+
+    def _arquivos(self):
+        return self.diretorio.glob('*/*.json')
+
+    def _caminho(self, chave):
+        return self.diretorio / chave[:2] / f'{chave}.json'
+
+    @staticmethod
+    def _chave(url, params):
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _remover(caminho):
+        try:
+            caminho.unlink()
+        except FileNotFoundError:
+            pass
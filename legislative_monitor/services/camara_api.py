@@ -1,28 +1,75 @@
 """
 Serviço para integração com a API de Dados Abertos da Câmara dos Deputados
 """
-import requests
-from datetime import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 
+from .transporte import ErroRequisicaoAPI, obter_transporte
+
+
+logger = logging.getLogger(__name__)
+
 
 class CamaraAPIService:
     """Serviço para consumir a API da Câmara dos Deputados"""
     
-    def __init__(self):
+    def __init__(self, transporte=None):
         self.base_url = settings.CAMARA_API_BASE_URL
+        self.transporte = transporte or obter_transporte()
     
     def _fazer_requisicao(self, endpoint, params=None):
         """Faz uma requisição à API da Câmara"""
         url = f"{self.base_url}/{endpoint}"
         try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            print(f"Erro ao fazer requisição: {e}")
+            return self.transporte.get_json(url, params=params)
+        except ErroRequisicaoAPI as e:
+            logger.error("Erro ao fazer requisição: %s", e)
             return None
     
+    def estatisticas_requisicoes(self):
+        """Contadores de latência e erros por endpoint do transporte em uso"""
+        return self.transporte.estatisticas()
+    
+    def _iterar_paginas(self, endpoint, params=None, prefetch=False):
+        """
+        Percorre todas as páginas de um endpoint de listagem seguindo o link rel=next,
+        entregando os registros um a um. No máximo duas páginas ficam em memória.
+        Com prefetch=True a próxima página é baixada numa thread enquanto a atual é consumida.
+        Falhas levantam ErroRequisicaoAPI em vez de encerrar a iteração silenciosamente.
+        """
+        for pagina in self._iterar_respostas(endpoint, params, prefetch):
+            yield from pagina.get('dados', [])
+    
+    def _iterar_respostas(self, endpoint, params=None, prefetch=False):
+        """Como _iterar_paginas, mas entrega a resposta completa de cada página"""
+        url = f"{self.base_url}/{endpoint}"
+        params = dict(params or {})
+        params.setdefault('itens', 100)
+        
+        if not prefetch:
+            while url:
+                pagina = self.transporte.get_json(url, params=params)
+                url, params = self._link_proxima_pagina(pagina), None
+                yield pagina
+            return
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='camara-prefetch') as executor:
+            futuro = executor.submit(self.transporte.get_json, url, params)
+            while futuro is not None:
+                pagina = futuro.result()
+                proxima = self._link_proxima_pagina(pagina)
+                futuro = executor.submit(self.transporte.get_json, proxima) if proxima else None
+                yield pagina
+    
+    @staticmethod
+    def _link_proxima_pagina(pagina):
+        """Extrai o href do link rel=next (já inclui os filtros originais)"""
+        for link in pagina.get('links', []):
+            if link.get('rel') == 'next':
+                return link.get('href')
+        return None
+    
     def listar_deputados(self, **kwargs):
         """
         Lista deputados com filtros opcionais
@@ -30,6 +77,10 @@ class CamaraAPIService:
         """
         return self._fazer_requisicao('deputados', params=kwargs)
     
+    def iter_deputados(self, prefetch=False, **kwargs):
+        """Itera sobre todos os deputados (todas as páginas) com os mesmos filtros de listar_deputados"""
+        return self._iterar_paginas('deputados', params=kwargs, prefetch=prefetch)
+    
     def obter_deputado(self, id_deputado):
         """Obtém informações detalhadas de um deputado"""
         return self._fazer_requisicao(f'deputados/{id_deputado}')
@@ -41,10 +92,26 @@ class CamaraAPIService:
         """
         return self._fazer_requisicao('proposicoes', params=kwargs)
     
+    def iter_proposicoes(self, prefetch=False, **kwargs):
+        """Itera sobre todas as proposições (todas as páginas) com os mesmos filtros de listar_proposicoes"""
+        return self._iterar_paginas('proposicoes', params=kwargs, prefetch=prefetch)
+    
+    def iter_paginas_proposicoes(self, prefetch=False, **kwargs):
+        """
+        Itera página a página (listas de proposições), a partir de `pagina` (padrão 1).
+        Útil para registrar checkpoints por página.
+        """
+        for resposta in self._iterar_respostas('proposicoes', params=kwargs, prefetch=prefetch):
+            yield resposta.get('dados', [])
+    
     def obter_proposicao(self, id_proposicao):
         """Obtém informações detalhadas de uma proposição"""
         return self._fazer_requisicao(f'proposicoes/{id_proposicao}')
     
+    def listar_autores_proposicao(self, id_proposicao):
+        """Lista autores de uma proposição (deputados, órgãos, Executivo etc.)"""
+        return self._fazer_requisicao(f'proposicoes/{id_proposicao}/autores')
+    
     def listar_votacoes_proposicao(self, id_proposicao):
         """Lista votações de uma proposição"""
         return self._fazer_requisicao(f'proposicoes/{id_proposicao}/votacoes')
@@ -64,6 +131,15 @@ class CamaraAPIService:
         """
         return self._fazer_requisicao(f'deputados/{id_deputado}/discursos', params=kwargs)
     
+    def iter_discursos_deputado(self, id_deputado, prefetch=False, **kwargs):
+        """Itera sobre todos os discursos de um deputado (todas as páginas)"""
+        return self._iterar_paginas(f'deputados/{id_deputado}/discursos', params=kwargs, prefetch=prefetch)
+    
+    def iter_paginas_discursos_deputado(self, id_deputado, prefetch=False, **kwargs):
+        """Itera página a página (lista de `dados`) sobre os discursos de um deputado"""
+        for resposta in self._iterar_respostas(f'deputados/{id_deputado}/discursos', params=kwargs, prefetch=prefetch):
+            yield resposta.get('dados', [])
+    
     def obter_discurso(self, id_discurso):
         """Obtém informações detalhadas de um discurso"""
         return self._fazer_requisicao(f'discursos/{id_discurso}')
@@ -75,10 +151,18 @@ class CamaraAPIService:
         """
         return self._fazer_requisicao('eventos', params=kwargs)
     
+    def iter_eventos(self, prefetch=False, **kwargs):
+        """Itera sobre todos os eventos (todas as páginas) com os mesmos filtros de listar_eventos"""
+        return self._iterar_paginas('eventos', params=kwargs, prefetch=prefetch)
+    
     def listar_orgaos(self, **kwargs):
         """Lista órgãos da Câmara (comissões, etc.)"""
         return self._fazer_requisicao('orgaos', params=kwargs)
     
+    def iter_orgaos(self, prefetch=False, **kwargs):
+        """Itera sobre todos os órgãos (todas as páginas) com os mesmos filtros de listar_orgaos"""
+        return self._iterar_paginas('orgaos', params=kwargs, prefetch=prefetch)
+    
     def listar_tipos_proposicao(self):
         """Lista todos os tipos de proposição disponíveis"""
         return self._fazer_requisicao('referencias/proposicoes/siglaTipo')
@@ -91,6 +175,10 @@ class CamaraAPIService:
         """
         return self._fazer_requisicao('partidos', params=kwargs)
     
+    def iter_partidos(self, prefetch=False, **kwargs):
+        """Itera sobre todos os partidos (todas as páginas) com os mesmos filtros de listar_partidos"""
+        return self._iterar_paginas('partidos', params=kwargs, prefetch=prefetch)
+    
     def obter_partido(self, id_partido):
         """Obtém informações detalhadas de um partido"""
         return self._fazer_requisicao(f'partidos/{id_partido}')
@@ -0,0 +1,125 @@
+"""
+Cliente asyncio para a API de Dados Abertos da Câmara dos Deputados
+
+Voltado para buscas de detalhes em grande volume (perfis de deputados, votos de
+votações, etc.). As requisições passam pelo mesmo transporte compartilhado do
+CamaraAPIService (pool de conexões, retentativas e métricas), executadas num pool
+de threads limitado ao número máximo de requisições simultâneas.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+from .camara_api import CamaraAPIService
+
+
+class ResultadoDetalhe:
+    """Resultado de uma busca individual feita por gather_details"""
+    __slots__ = ('id', 'dados', 'erro')
+
+    def __init__(self, id, dados=None, erro=None):
+        self.id = id
+        self.dados = dados
+        self.erro = erro
+
+    @property
+    def ok(self):
+        return self.erro is None
+
+    def __repr__(self):
+        estado = 'ok' if self.ok else f'erro={self.erro!r}'
+        return f'<ResultadoDetalhe {self.id} {estado}>'
+
+
+class AsyncCamaraAPIService:
+    """
+    Espelho assíncrono do CamaraAPIService.
+    Diferente do serviço síncrono, os métodos levantam ErroRequisicaoAPI em caso de falha
+    (gather_details converte essas falhas em ResultadoDetalhe com erro preenchido).
+    """
+
+    def __init__(self, concorrencia=None, api=None):
+        self.concorrencia = concorrencia or getattr(settings, 'CAMARA_API_CONCORRENCIA', 8)
+        self.api = api or CamaraAPIService()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concorrencia,
+            thread_name_prefix='camara-async',
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._executor.shutdown(wait=False)
+
+    async def _fazer_requisicao(self, endpoint, params=None):
+        """Faz uma requisição à API da Câmara sem bloquear o event loop"""
+        url = f"{self.api.base_url}/{endpoint}"
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(self.api.transporte.get_json, url, params=params),
+        )
+
+    async def listar_deputados(self, **kwargs):
+        return await self._fazer_requisicao('deputados', params=kwargs)
+
+    async def obter_deputado(self, id_deputado):
+        return await self._fazer_requisicao(f'deputados/{id_deputado}')
+
+    async def listar_proposicoes(self, **kwargs):
+        return await self._fazer_requisicao('proposicoes', params=kwargs)
+
+    async def obter_proposicao(self, id_proposicao):
+        return await self._fazer_requisicao(f'proposicoes/{id_proposicao}')
+
+    async def listar_autores_proposicao(self, id_proposicao):
+        return await self._fazer_requisicao(f'proposicoes/{id_proposicao}/autores')
+
+    async def listar_votacoes_proposicao(self, id_proposicao):
+        return await self._fazer_requisicao(f'proposicoes/{id_proposicao}/votacoes')
+
+    async def obter_votacao(self, id_votacao):
+        return await self._fazer_requisicao(f'votacoes/{id_votacao}')
+
+    async def listar_votos_votacao(self, id_votacao):
+        return await self._fazer_requisicao(f'votacoes/{id_votacao}/votos')
+
+    async def listar_discursos_deputado(self, id_deputado, **kwargs):
+        return await self._fazer_requisicao(f'deputados/{id_deputado}/discursos', params=kwargs)
+
+    async def listar_partidos(self, **kwargs):
+        return await self._fazer_requisicao('partidos', params=kwargs)
+
+    async def obter_partido(self, id_partido):
+        return await self._fazer_requisicao(f'partidos/{id_partido}')
+
+    async def gather_details(self, ids, metodo='obter_deputado', **kwargs):
+        """
+        Executa `metodo` para cada id com no máximo `concorrencia` requisições simultâneas.
+        Retorna uma lista de ResultadoDetalhe na mesma ordem de `ids`; falhas individuais
+        ficam em `resultado.erro` e não interrompem as demais buscas.
+        """
+        funcao = getattr(self, metodo)
+
+        async def buscar(id_item):
+            try:
+                return ResultadoDetalhe(id_item, dados=await funcao(id_item, **kwargs))
+            except Exception as e:
+                return ResultadoDetalhe(id_item, erro=e)
+
+        return await asyncio.gather(*(buscar(id_item) for id_item in ids))
+
+
+def buscar_detalhes(ids, metodo='obter_deputado', concorrencia=None, api=None, **kwargs):
+    """Atalho síncrono para gather_details, para uso em comandos de management"""
+    async def executar():
+        async with AsyncCamaraAPIService(concorrencia=concorrencia, api=api) as cliente:
+            return await cliente.gather_details(ids, metodo=metodo, **kwargs)
+
+    return asyncio.run(executar())
@@ -0,0 +1,623 @@
+"""
+Servidor HTTP local que imita a API de Dados Abertos da Câmara dos Deputados
+
+Gera dados sintéticos determinísticos (mesma semente -> mesmas respostas) para os
+endpoints usados pelo CamaraAPIService, com paginação por links, filtros de data,
+ETag e injeção opcional de latência e erros. Nada é pré-gerado: cada registro é
+derivado do seu índice, então escalas de centenas de milhares de proposições não
+ocupam memória. Usado pelo comando serve_fake_camara_api para medir as sincronizações
+sem depender da rede.
+"""
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+
+PARTIDOS = [
+    ('PT', 'Partido dos Trabalhadores', 13),
+    ('PL', 'Partido Liberal', 22),
+    ('UNIÃO', 'União Brasil', 44),
+    ('PP', 'Progressistas', 11),
+    ('MDB', 'Movimento Democrático Brasileiro', 15),
+    ('PSD', 'Partido Social Democrático', 55),
+    ('REPUBLICANOS', 'Republicanos', 10),
+    ('PDT', 'Partido Democrático Trabalhista', 12),
+    ('PSB', 'Partido Socialista Brasileiro', 40),
+    ('PSDB', 'Partido da Social Democracia Brasileira', 45),
+    ('PSOL', 'Partido Socialismo e Liberdade', 50),
+    ('PODE', 'Podemos', 20),
+    ('AVANTE', 'Avante', 70),
+    ('PCdoB', 'Partido Comunista do Brasil', 65),
+    ('NOVO', 'Partido Novo', 30),
+    ('CIDADANIA', 'Cidadania', 23),
+    ('PV', 'Partido Verde', 43),
+    ('SOLIDARIEDADE', 'Solidariedade', 77),
+    ('REDE', 'Rede Sustentabilidade', 18),
+    ('PRD', 'Partido Renovação Democrática', 25),
+]
+
+TIPOS_PROPOSICAO = [
+    ('139', 'PL', 'Projeto de Lei'),
+    ('136', 'PEC', 'Proposta de Emenda à Constituição'),
+    ('140', 'PLP', 'Projeto de Lei Complementar'),
+    ('141', 'PDL', 'Projeto de Decreto Legislativo'),
+    ('142', 'PRC', 'Projeto de Resolução'),
+    ('135', 'MPV', 'Medida Provisória'),
+    ('125', 'REQ', 'Requerimento'),
+    ('147', 'INC', 'Indicação'),
+    ('291', 'RIC', 'Requerimento de Informação'),
+    ('254', 'EMC', 'Emenda na Comissão'),
+]
+
+# (sigla, código IBGE, capital)
+UFS = [
+    ('RO', 11, 'Porto Velho'), ('AC', 12, 'Rio Branco'), ('AM', 13, 'Manaus'),
+    ('RR', 14, 'Boa Vista'), ('PA', 15, 'Belém'), ('AP', 16, 'Macapá'),
+    ('TO', 17, 'Palmas'), ('MA', 21, 'São Luís'), ('PI', 22, 'Teresina'),
+    ('CE', 23, 'Fortaleza'), ('RN', 24, 'Natal'), ('PB', 25, 'João Pessoa'),
+    ('PE', 26, 'Recife'), ('AL', 27, 'Maceió'), ('SE', 28, 'Aracaju'),
+    ('BA', 29, 'Salvador'), ('MG', 31, 'Belo Horizonte'), ('ES', 32, 'Vitória'),
+    ('RJ', 33, 'Rio de Janeiro'), ('SP', 35, 'São Paulo'), ('PR', 41, 'Curitiba'),
+    ('SC', 42, 'Florianópolis'), ('RS', 43, 'Porto Alegre'), ('MS', 50, 'Campo Grande'),
+    ('MT', 51, 'Cuiabá'), ('GO', 52, 'Goiânia'), ('DF', 53, 'Brasília'),
+]
+
+SITUACOES = [
+    'Aguardando Designação de Relator(a)',
+    'Aguardando Parecer do Relator(a)',
+    'Pronta para Pauta no Plenário',
+    'Arquivada',
+    'Transformado em Norma Jurídica',
+    'Retirado pelo(a) Autor(a)',
+    'Tramitando em Conjunto',
+]
+
+VOTOS = ['Sim', 'Sim', 'Sim', 'Não', 'Não', 'Abstenção', 'Obstrução', 'Artigo 17']
+
+NOMES = ['Ana', 'Carlos', 'Maria', 'João', 'Luiza', 'Pedro', 'Fernanda', 'José', 'Beatriz',
+         'Antônio', 'Juliana', 'Paulo', 'Camila', 'Rafael', 'Patrícia', 'Marcos', 'Sônia', 'Luís']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Ferreira', 'Costa',
+              'Rodrigues', 'Almeida', 'Nascimento', 'Araújo', 'Gonçalves', 'Conceição', 'Brandão']
+TEMAS = ['saúde pública', 'educação básica', 'segurança alimentar', 'meio ambiente',
+         'mobilidade urbana', 'proteção de dados', 'agricultura familiar', 'energia renovável',
+         'assistência social', 'previdência', 'reforma tributária', 'inclusão digital']
+ACOES = ['Dispõe sobre', 'Altera a Lei nº 8.080, de 1990, para dispor sobre',
+         'Institui a Política Nacional de', 'Cria o Programa Nacional de', 'Regulamenta']
+
+DATA_INICIAL_PROPOSICOES = date(1988, 10, 5)
+DATA_FINAL_PROPOSICOES = date(2025, 12, 31)
+INICIO_LEGISLATURA = date(2023, 2, 1)
+FIM_LEGISLATURA = date(2026, 12, 31)
+
+MAX_ITENS = 100
+
+
+class DadosSinteticosCamara:
+    """Gera registros determinísticos a partir do índice de cada entidade"""
+
+    def __init__(self, deputados=513, proposicoes=200_000, votacoes=10_000,
+                 discursos_por_deputado=100, tamanho_transcricao=4000, semente=42):
+        self.n_deputados = deputados
+        self.n_proposicoes = proposicoes
+        self.n_votacoes = votacoes
+        self.discursos_por_deputado = discursos_por_deputado
+        self.tamanho_transcricao = tamanho_transcricao
+        self.semente = semente
+        self.dias_proposicoes = (DATA_FINAL_PROPOSICOES - DATA_INICIAL_PROPOSICOES).days
+        self.dias_legislatura = (FIM_LEGISLATURA - INICIO_LEGISLATURA).days
+
+    def _rng(self, *partes):
+        return random.Random(':'.join(str(p) for p in (self.semente, *partes)))
+
+    # Partidos e tipos -------------------------------------------------------
+
+    def partido(self, indice, base_url):
+        sigla, nome, numero = PARTIDOS[indice]
+        return {
+            'id': 36000 + indice,
+            'sigla': sigla,
+            'nome': nome,
+            'uri': f'{base_url}/partidos/{36000 + indice}',
+        }
+
+    def partido_detalhe(self, indice, base_url):
+        dados = self.partido(indice, base_url)
+        rng = self._rng('partido', indice)
+        dados.update({
+            'status': {
+                'data': '2025-04-08T14:44',
+                'idLegislatura': '57',
+                'situacao': 'Ativo',
+                'totalPosse': str(rng.randint(1, 100)),
+                'totalMembros': str(rng.randint(1, 100)),
+                'uriMembros': f'{base_url}/deputados?siglaPartido={dados["sigla"]}',
+                'lider': None,
+            },
+            'numeroEleitoral': PARTIDOS[indice][2],
+            'urlLogo': f'https://www.camara.leg.br/internet/Deputado/img/partidos/{dados["sigla"]}.gif',
+            'urlWebSite': None,
+            'urlFacebook': None,
+        })
+        return dados
+
+    def tipos_proposicao(self):
+        return [
+            {'cod': cod, 'sigla': sigla, 'nome': nome, 'descricao': f'{nome} ({sigla})'}
+            for cod, sigla, nome in TIPOS_PROPOSICAO
+        ]
+
+    # Deputados --------------------------------------------------------------
+
+    def id_deputado(self, indice):
+        return 204000 + indice
+
+    def indice_deputado(self, id_deputado):
+        indice = id_deputado - 204000
+        return indice if 0 <= indice < self.n_deputados else None
+
+    def deputado(self, indice, base_url):
+        rng = self._rng('deputado', indice)
+        nome = f'{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}'
+        sigla_partido = PARTIDOS[indice % len(PARTIDOS)][0]
+        uf = UFS[rng.randrange(len(UFS))][0]
+        id_deputado = self.id_deputado(indice)
+        return {
+            'id': id_deputado,
+            'uri': f'{base_url}/deputados/{id_deputado}',
+            'nome': nome,
+            'siglaPartido': sigla_partido,
+            'uriPartido': f'{base_url}/partidos/{36000 + indice % len(PARTIDOS)}',
+            'siglaUf': uf,
+            'idLegislatura': 57,
+            'urlFoto': f'https://www.camara.leg.br/internet/deputado/bandep/{id_deputado}.jpg',
+            'email': f'dep.{id_deputado}@camara.leg.br',
+        }
+
+    def deputado_detalhe(self, indice, base_url):
+        resumo = self.deputado(indice, base_url)
+        rng = self._rng('deputado-detalhe', indice)
+        uf_nascimento, _, capital = UFS[rng.randrange(len(UFS))]
+        sexo = rng.choice(['M', 'F'])
+        return {
+            'id': resumo['id'],
+            'uri': resumo['uri'],
+            'nomeCivil': f'{resumo["nome"]} {rng.choice(SOBRENOMES)}',
+            'ultimoStatus': {
+                'id': resumo['id'],
+                'uri': resumo['uri'],
+                'nome': resumo['nome'],
+                'siglaPartido': resumo['siglaPartido'],
+                'uriPartido': resumo['uriPartido'],
+                'siglaUf': resumo['siglaUf'],
+                'idLegislatura': 57,
+                'urlFoto': resumo['urlFoto'],
+                'email': resumo['email'],
+                'data': '2023-02-01',
+                'nomeEleitoral': resumo['nome'],
+                'gabinete': {'nome': str(rng.randint(100, 999)), 'predio': '4', 'sala': str(rng.randint(100, 999)),
+                             'andar': str(rng.randint(1, 9)), 'telefone': '3215-5000', 'email': resumo['email']},
+                'situacao': 'Exercício',
+                'condicaoEleitoral': rng.choice(['Titular', 'Titular', 'Suplente']),
+                'descricaoStatus': None,
+            },
+            'cpf': f'{rng.randrange(10 ** 11):011d}',
+            'sexo': sexo,
+            'urlWebsite': None,
+            'redeSocial': [],
+            'dataNascimento': str(date(1950, 1, 1) + timedelta(days=rng.randrange(18000))),
+            'dataFalecimento': None,
+            'ufNascimento': uf_nascimento,
+            'municipioNascimento': capital,
+            'escolaridade': 'Superior',
+        }
+
+    # Proposições ------------------------------------------------------------
+
+    def id_proposicao(self, indice):
+        return 2_000_000 + indice
+
+    def indice_proposicao(self, id_proposicao):
+        indice = id_proposicao - 2_000_000
+        return indice if 0 <= indice < self.n_proposicoes else None
+
+    def data_proposicao(self, indice):
+        """Datas crescem com o índice, o que permite filtrar por intervalo sem varrer tudo"""
+        return DATA_INICIAL_PROPOSICOES + timedelta(days=indice * self.dias_proposicoes // max(self.n_proposicoes, 1))
+
+    def faixa_proposicoes(self, data_inicio=None, data_fim=None):
+        """Intervalo [inicio, fim) de índices com data de apresentação dentro do período"""
+        inicio, fim = 0, self.n_proposicoes
+        if data_inicio:
+            dias = (data_inicio - DATA_INICIAL_PROPOSICOES).days
+            inicio = max(inicio, math.ceil(dias * self.n_proposicoes / self.dias_proposicoes))
+        if data_fim:
+            dias = (data_fim - DATA_INICIAL_PROPOSICOES).days + 1
+            fim = min(fim, math.ceil(dias * self.n_proposicoes / self.dias_proposicoes))
+        return inicio, max(inicio, fim)
+
+    def proposicao(self, indice, base_url):
+        rng = self._rng('proposicao', indice)
+        cod, sigla, _ = TIPOS_PROPOSICAO[rng.randrange(len(TIPOS_PROPOSICAO))]
+        id_proposicao = self.id_proposicao(indice)
+        return {
+            'id': id_proposicao,
+            'uri': f'{base_url}/proposicoes/{id_proposicao}',
+            'siglaTipo': sigla,
+            'codTipo': int(cod),
+            'numero': rng.randint(1, 5000),
+            'ano': self.data_proposicao(indice).year,
+            'ementa': f'{rng.choice(ACOES)} {rng.choice(TEMAS)} e {rng.choice(TEMAS)}.',
+        }
+
+    def proposicao_detalhe(self, indice, base_url):
+        dados = self.proposicao(indice, base_url)
+        rng = self._rng('proposicao-detalhe', indice)
+        apresentacao = self.data_proposicao(indice)
+        dados.update({
+            'dataApresentacao': f'{apresentacao}T{rng.randint(8, 19):02d}:{rng.randint(0, 59):02d}',
+            'statusProposicao': {
+                'dataHora': f'{apresentacao + timedelta(days=rng.randint(0, 400))}T10:00',
+                'sequencia': rng.randint(1, 40),
+                'siglaOrgao': rng.choice(['PLEN', 'CCJC', 'CFT', 'CSAUDE', 'MESA']),
+                'regime': 'Ordinário (Art. 151, III, RICD)',
+                'descricaoTramitacao': 'Despacho',
+                'descricaoSituacao': rng.choice(SITUACOES),
+                'despacho': 'Às Comissões.',
+                'url': None,
+                'ambito': 'Regimental',
+                'apreciacao': 'Proposição Sujeita à Apreciação Conclusiva pelas Comissões',
+            },
+            'uriAutores': f'{base_url}/proposicoes/{dados["id"]}/autores',
+            'descricaoTipo': dict((s, n) for _, s, n in TIPOS_PROPOSICAO)[dados['siglaTipo']],
+            'ementaDetalhada': f'Abrange {rng.choice(TEMAS)}, {rng.choice(TEMAS)} e {rng.choice(TEMAS)}.',
+            'keywords': ', '.join(rng.sample(TEMAS, 3)),
+            'urlInteiroTeor': f'https://www.camara.leg.br/proposicoesWeb/prop_mostrarintegra?codteor={dados["id"]}',
+        })
+        return dados
+
+    def autores_proposicao(self, indice, base_url):
+        """Um a três deputados (o primeiro é o proponente) ou, em 20% dos casos, o Executivo"""
+        rng = self._rng('autores', indice)
+        if rng.random() < 0.2:
+            return [{
+                'uri': f'{base_url}/orgaos/78', 'nome': 'Poder Executivo',
+                'codTipo': 40000, 'tipo': 'Órgão do Poder Executivo', 'ordemAssinatura': 1, 'proponente': 1,
+            }]
+        autores = []
+        for ordem, indice_deputado in enumerate(rng.sample(range(self.n_deputados), rng.randint(1, 3)), 1):
+            deputado = self.deputado(indice_deputado, base_url)
+            autores.append({
+                'uri': deputado['uri'], 'nome': deputado['nome'], 'codTipo': 10000, 'tipo': 'Deputado(a)',
+                'ordemAssinatura': ordem, 'proponente': 1 if ordem == 1 else 0,
+            })
+        return autores
+
+    # Votações ---------------------------------------------------------------
+
+    def indices_votacoes_da_proposicao(self, indice_proposicao):
+        """Votações distribuídas uniformemente entre as proposições"""
+        if not self.n_proposicoes:
+            return range(0)
+        inicio = math.ceil(indice_proposicao * self.n_votacoes / self.n_proposicoes)
+        fim = math.ceil((indice_proposicao + 1) * self.n_votacoes / self.n_proposicoes)
+        return range(inicio, min(fim, self.n_votacoes))
+
+    def indice_proposicao_da_votacao(self, indice_votacao):
+        return indice_votacao * self.n_proposicoes // self.n_votacoes
+
+    def id_votacao(self, indice):
+        return f'{self.id_proposicao(self.indice_proposicao_da_votacao(indice))}-{indice}'
+
+    def indice_votacao(self, id_votacao):
+        correspondencia = re.fullmatch(r'(\d+)-(\d+)', id_votacao)
+        if not correspondencia:
+            return None
+        indice = int(correspondencia.group(2))
+        if 0 <= indice < self.n_votacoes and self.id_votacao(indice) == id_votacao:
+            return indice
+        return None
+
+    def votacao(self, indice, base_url):
+        rng = self._rng('votacao', indice)
+        indice_proposicao = self.indice_proposicao_da_votacao(indice)
+        id_proposicao = self.id_proposicao(indice_proposicao)
+        data = self.data_proposicao(indice_proposicao) + timedelta(days=rng.randint(10, 300))
+        id_votacao = self.id_votacao(indice)
+        return {
+            'id': id_votacao,
+            'uri': f'{base_url}/votacoes/{id_votacao}',
+            'data': str(data),
+            'dataHoraRegistro': f'{data}T{rng.randint(14, 22):02d}:{rng.randint(0, 59):02d}:00',
+            'siglaOrgao': 'PLEN',
+            'uriOrgao': f'{base_url}/orgaos/180',
+            'uriEvento': f'{base_url}/eventos/{70000 + indice}',
+            'proposicaoObjeto': None,
+            'uriProposicaoObjeto': f'{base_url}/proposicoes/{id_proposicao}',
+            'descricao': f'Aprovado o Requerimento. Votação nominal {indice}.',
+            'aprovacao': rng.choice([0, 1, 1]),
+        }
+
+    def votos(self, indice_votacao, base_url):
+        rng = self._rng('votos', indice_votacao)
+        data = self.votacao(indice_votacao, base_url)['dataHoraRegistro']
+        votos = []
+        for indice in range(self.n_deputados):
+            # Cerca de 8% de ausências (não aparecem na lista de votos)
+            if rng.random() < 0.08:
+                continue
+            deputado = self.deputado(indice, base_url)
+            votos.append({
+                'tipoVoto': rng.choice(VOTOS),
+                'dataRegistroVoto': data,
+                'deputado_': {
+                    'id': deputado['id'],
+                    'uri': deputado['uri'],
+                    'nome': deputado['nome'],
+                    'siglaPartido': deputado['siglaPartido'],
+                    'uriPartido': deputado['uriPartido'],
+                    'siglaUf': deputado['siglaUf'],
+                    'idLegislatura': 57,
+                    'urlFoto': deputado['urlFoto'],
+                    'email': deputado['email'],
+                },
+            })
+        return votos
+
+    # Discursos --------------------------------------------------------------
+
+    def data_discurso(self, indice):
+        minutos = indice * self.dias_legislatura * 24 * 60 // max(self.discursos_por_deputado, 1)
+        return datetime.combine(INICIO_LEGISLATURA, datetime.min.time()) + timedelta(minutes=minutos)
+
+    def faixa_discursos(self, data_inicio=None, data_fim=None):
+        total_minutos = self.dias_legislatura * 24 * 60
+        inicio, fim = 0, self.discursos_por_deputado
+        if data_inicio:
+            minutos = (data_inicio - INICIO_LEGISLATURA).days * 24 * 60
+            inicio = max(inicio, math.ceil(minutos * self.discursos_por_deputado / total_minutos))
+        if data_fim:
+            minutos = ((data_fim - INICIO_LEGISLATURA).days + 1) * 24 * 60
+            fim = min(fim, math.ceil(minutos * self.discursos_por_deputado / total_minutos))
+        return inicio, max(inicio, fim)
+
+    def discurso(self, indice_deputado, indice, base_url):
+        rng = self._rng('discurso', indice_deputado, indice)
+        inicio = self.data_discurso(indice)
+        tema = rng.choice(TEMAS)
+        frase = f'Senhor Presidente, trago a esta Casa o debate sobre {tema}. '
+        repeticoes = max(1, self.tamanho_transcricao // len(frase))
+        return {
+            'dataHoraInicio': inicio.strftime('%Y-%m-%dT%H:%M'),
+            'dataHoraFim': (inicio + timedelta(minutes=rng.randint(3, 25))).strftime('%Y-%m-%dT%H:%M'),
+            'uriEvento': f'{base_url}/eventos/{80000 + indice}',
+            'faseEvento': {'titulo': rng.choice(['Pequeno Expediente', 'Grande Expediente', 'Breves Comunicações']),
+                           'dataHoraInicio': None, 'dataHoraFim': None},
+            'tipoDiscurso': rng.choice(['BREVES COMUNICAÇÕES', 'DISCURSO ENCAMINHADO', 'COMO LÍDER']),
+            'urlTexto': None,
+            'urlAudio': None,
+            'urlVideo': None,
+            'keywords': tema.upper(),
+            'sumario': f'Comentários acerca de {tema}.',
+            'transcricao': frase * repeticoes,
+        }
+
+
+class ServidorCamaraSintetica(ThreadingHTTPServer):
+    """ThreadingHTTPServer com os dados sintéticos e os parâmetros de injeção de falhas"""
+    daemon_threads = True
+
+    def __init__(self, endereco, dados, latencia_ms=0, jitter_ms=0, taxa_erro=0.0, prefixo='/api/v2'):
+        super().__init__(endereco, ManipuladorCamaraSintetica)
+        self.dados = dados
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.taxa_erro = taxa_erro
+        self.prefixo = prefixo.rstrip('/')
+        self._rng = random.Random(dados.semente)
+        self._rng_lock = threading.Lock()
+        self.requisicoes = 0
+
+    def sortear(self):
+        with self._rng_lock:
+            self.requisicoes += 1
+            return self._rng.random(), self._rng.uniform(-1, 1)
+
+
+class ManipuladorCamaraSintetica(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CamaraSintetica/1.0'
+
+    ROTAS = [
+        (re.compile(r'/deputados'), 'listar_deputados'),
+        (re.compile(r'/deputados/(\d+)'), 'obter_deputado'),
+        (re.compile(r'/deputados/(\d+)/discursos'), 'listar_discursos'),
+        (re.compile(r'/proposicoes'), 'listar_proposicoes'),
+        (re.compile(r'/proposicoes/(\d+)'), 'obter_proposicao'),
+        (re.compile(r'/proposicoes/(\d+)/autores'), 'listar_autores_proposicao'),
+        (re.compile(r'/proposicoes/(\d+)/votacoes'), 'listar_votacoes_proposicao'),
+        (re.compile(r'/votacoes/([\w-]+)'), 'obter_votacao'),
+        (re.compile(r'/votacoes/([\w-]+)/votos'), 'listar_votos'),
+        (re.compile(r'/partidos'), 'listar_partidos'),
+        (re.compile(r'/partidos/(\d+)'), 'obter_partido'),
+        (re.compile(r'/referencias/proposicoes/siglaTipo'), 'listar_tipos'),
+    ]
+
+    def log_message(self, formato, *args):
+        pass
+
+    @property
+    def dados(self):
+        return self.server.dados
+
+    @property
+    def base_url(self):
+        return f'http://{self.headers.get("Host", "localhost")}{self.server.prefixo}'
+
+    def do_GET(self):
+        sorteio_erro, sorteio_jitter = self.server.sortear()
+        atraso = self.server.latencia_ms + sorteio_jitter * self.server.jitter_ms
+        if atraso > 0:
+            time.sleep(atraso / 1000)
+        if sorteio_erro < self.server.taxa_erro:
+            self._responder(503, {'status': 503, 'title': 'Serviço indisponível (erro injetado)'})
+            return
+
+        partes = urlsplit(self.path)
+        if not partes.path.startswith(self.server.prefixo):
+            self._responder(404, {'status': 404, 'title': 'Não encontrado'})
+            return
+        caminho = partes.path[len(self.server.prefixo):].rstrip('/')
+        self.query = {chave: valores[-1] for chave, valores in parse_qs(partes.query).items()}
+
+        for padrao, nome in self.ROTAS:
+            correspondencia = padrao.fullmatch(caminho)
+            if correspondencia:
+                try:
+                    status, corpo = getattr(self, nome)(*correspondencia.groups())
+                except ValueError as e:
+                    status, corpo = 400, {'status': 400, 'title': str(e)}
+                self._responder(status, corpo)
+                return
+        self._responder(404, {'status': 404, 'title': 'Não encontrado'})
+
+    def _responder(self, status, corpo):
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        etag = '"%s"' % hashlib.sha1(conteudo).hexdigest()
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(conteudo)))
+        if status == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    # Auxiliares -------------------------------------------------------------
+
+    def _data(self, *nomes):
+        for nome in nomes:
+            if self.query.get(nome):
+                return date.fromisoformat(self.query[nome][:10])
+        return None
+
+    def _pagina(self, caminho, total, gerar):
+        """Monta uma resposta paginada no formato da API (dados + links)"""
+        itens = min(int(self.query.get('itens', 15)), MAX_ITENS)
+        if itens < 1:
+            raise ValueError('O parâmetro itens deve ser maior que zero')
+        pagina = max(int(self.query.get('pagina', 1)), 1)
+        ultima = max(math.ceil(total / itens), 1)
+        inicio = (pagina - 1) * itens
+        dados = [gerar(posicao) for posicao in range(inicio, min(inicio + itens, total))]
+
+        def link(rel, numero):
+            query = dict(self.query, pagina=numero, itens=itens)
+            return {'rel': rel, 'href': f'{self.base_url}{caminho}?{urlencode(query)}', 'type': 'application/json'}
+
+        links = [link('self', pagina)]
+        if pagina < ultima:
+            links.append(link('next', pagina + 1))
+        if pagina > 1:
+            links.append(link('previous', pagina - 1))
+        links.extend([link('first', 1), link('last', ultima)])
+        return 200, {'dados': dados, 'links': links}
+
+    # Rotas ------------------------------------------------------------------
+
+    def listar_deputados(self):
+        indices = range(self.dados.n_deputados)
+        filtros = [(campo, self.query[chave]) for chave, campo in
+                   (('siglaUf', 'siglaUf'), ('siglaPartido', 'siglaPartido')) if self.query.get(chave)]
+        if filtros:
+            indices = [
+                indice for indice in indices
+                if all(self.dados.deputado(indice, self.base_url)[campo] == valor for campo, valor in filtros)
+            ]
+        return self._pagina('/deputados', len(indices),
+                            lambda posicao: self.dados.deputado(indices[posicao], self.base_url))
+
+    def obter_deputado(self, id_deputado):
+        indice = self.dados.indice_deputado(int(id_deputado))
+        if indice is None:
+            return 404, {'status': 404, 'title': 'Deputado não encontrado'}
+        return 200, {'dados': self.dados.deputado_detalhe(indice, self.base_url), 'links': []}
+
+    def listar_discursos(self, id_deputado):
+        indice_deputado = self.dados.indice_deputado(int(id_deputado))
+        if indice_deputado is None:
+            return 404, {'status': 404, 'title': 'Deputado não encontrado'}
+        inicio, fim = self.dados.faixa_discursos(self._data('dataInicio'), self._data('dataFim'))
+        return self._pagina(
+            f'/deputados/{id_deputado}/discursos', fim - inicio,
+            lambda posicao: self.dados.discurso(indice_deputado, inicio + posicao, self.base_url),
+        )
+
+    def listar_proposicoes(self):
+        inicio, fim = self.dados.faixa_proposicoes(
+            self._data('dataApresentacaoInicio', 'dataInicio'),
+            self._data('dataApresentacaoFim', 'dataFim'),
+        )
+        if self.query.get('ano'):
+            ano = int(self.query['ano'])
+            inicio_ano, fim_ano = self.dados.faixa_proposicoes(date(ano, 1, 1), date(ano, 12, 31))
+            inicio = max(inicio, inicio_ano)
+            fim = max(inicio, min(fim, fim_ano))
+        return self._pagina('/proposicoes', fim - inicio,
+                            lambda posicao: self.dados.proposicao(inicio + posicao, self.base_url))
+
+    def obter_proposicao(self, id_proposicao):
+        indice = self.dados.indice_proposicao(int(id_proposicao))
+        if indice is None:
+            return 404, {'status': 404, 'title': 'Proposição não encontrada'}
+        return 200, {'dados': self.dados.proposicao_detalhe(indice, self.base_url), 'links': []}
+
+    def listar_autores_proposicao(self, id_proposicao):
+        indice = self.dados.indice_proposicao(int(id_proposicao))
+        if indice is None:
+            return 404, {'status': 404, 'title': 'Proposição não encontrada'}
+        return 200, {'dados': self.dados.autores_proposicao(indice, self.base_url), 'links': []}
+
+    def listar_votacoes_proposicao(self, id_proposicao):
+        indice = self.dados.indice_proposicao(int(id_proposicao))
+        if indice is None:
+            return 404, {'status': 404, 'title': 'Proposição não encontrada'}
+        votacoes = [self.dados.votacao(i, self.base_url)
+                    for i in self.dados.indices_votacoes_da_proposicao(indice)]
+        return 200, {'dados': votacoes, 'links': []}
+
+    def obter_votacao(self, id_votacao):
+        indice = self.dados.indice_votacao(id_votacao)
+        if indice is None:
+            return 404, {'status': 404, 'title': 'Votação não encontrada'}
+        return 200, {'dados': self.dados.votacao(indice, self.base_url), 'links': []}
+
+    def listar_votos(self, id_votacao):
+        indice = self.dados.indice_votacao(id_votacao)
+        if indice is None:
+            return 404, {'status': 404, 'title': 'Votação não encontrada'}
+        return 200, {'dados': self.dados.votos(indice, self.base_url), 'links': []}
+
+    def listar_partidos(self):
+        return self._pagina('/partidos', len(PARTIDOS),
+                            lambda posicao: self.dados.partido(posicao, self.base_url))
+
+    def obter_partido(self, id_partido):
+        indice = int(id_partido) - 36000
+        if not 0 <= indice < len(PARTIDOS):
+            return 404, {'status': 404, 'title': 'Partido não encontrado'}
+        return 200, {'dados': self.dados.partido_detalhe(indice, self.base_url), 'links': []}
+
+    def listar_tipos(self):
+        return 200, {'dados': self.dados.tipos_proposicao(), 'links': []}
@@ -0,0 +1,263 @@
+"""
+Registros tipados dos payloads da API da Câmara
+
+O JSON de cada resposta é convertido uma única vez, logo após a requisição (nos
+coletores do pipeline ou logo depois da busca de detalhes), para registros com
+`__slots__`: campos já convertidos (datas com fuso, textos sem None) e sem os
+dicionários aninhados da API, que deixam de ficar em memória até a gravação.
+Os comandos de sincronização só mapeiam esses registros para os models.
+
+As classes declaram `__slots__` explicitamente (e não `dataclass(slots=True)`,
+que exige Python 3.10); por isso os campos não têm valor padrão e `de_api`
+preenche todos.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+from django.utils import timezone
+
+
+def parse_data(valor) -> Optional[date]:
+    """'AAAA-MM-DD[THH:MM[:SS]]' da API -> date; None se ausente ou inválida"""
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(str(valor)[:10])
+    except ValueError:
+        return None
+
+
+def parse_data_hora(valor) -> Optional[datetime]:
+    """'AAAA-MM-DD[THH:MM[:SS]]' da API -> datetime com fuso; None se ausente ou inválida"""
+    if not valor:
+        return None
+    try:
+        resultado = datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return timezone.make_aware(resultado) if timezone.is_naive(resultado) else resultado
+
+
+def _texto(valor) -> str:
+    return valor or ''
+
+
+def _inteiro(valor) -> Optional[int]:
+    """Números que a API às vezes envia como texto ('57'); None se ausente ou inválido"""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _id_da_uri(uri) -> Optional[int]:
+    """'.../deputados/204554' -> 204554"""
+    try:
+        return int(uri.rstrip('/').rsplit('/', 1)[-1])
+    except (AttributeError, ValueError):
+        return None
+
+
+@dataclass
+class TipoProposicaoAPI:
+    __slots__ = ('cod', 'sigla', 'nome', 'descricao')
+    cod: str
+    sigla: str
+    nome: str
+    descricao: str
+
+    @classmethod
+    def de_api(cls, dados):
+        return cls(
+            cod=str(dados['cod']),
+            sigla=_texto(dados.get('sigla')),
+            nome=_texto(dados.get('nome')),
+            descricao=_texto(dados.get('descricao')),
+        )
+
+
+@dataclass
+class PartidoAPI:
+    """Resumo da listagem, completado pelo detalhe quando `completo`"""
+    __slots__ = (
+        'id', 'sigla', 'nome', 'uri', 'completo',
+        'status_data', 'status_situacao', 'status_total_posse', 'status_total_membros',
+        'status_id_legislatura', 'numero_eleitoral', 'url_logo', 'url_website', 'url_facebook',
+    )
+    id: int
+    sigla: str
+    nome: str
+    uri: str
+    completo: bool
+    status_data: Optional[datetime]
+    status_situacao: str
+    status_total_posse: Optional[int]
+    status_total_membros: Optional[int]
+    status_id_legislatura: Optional[int]
+    numero_eleitoral: Optional[int]
+    url_logo: str
+    url_website: str
+    url_facebook: str
+
+    @classmethod
+    def de_api(cls, resumo, detalhe=None):
+        detalhe = detalhe or {}
+        status = detalhe.get('status') or {}
+        return cls(
+            id=resumo['id'],
+            sigla=_texto(resumo.get('sigla')),
+            nome=_texto(resumo.get('nome')),
+            uri=_texto(resumo.get('uri')),
+            completo=bool(detalhe),
+            status_data=parse_data_hora(status.get('data')),
+            status_situacao=_texto(status.get('situacao')),
+            status_total_posse=_inteiro(status.get('totalPosse')),
+            status_total_membros=_inteiro(status.get('totalMembros')),
+            status_id_legislatura=_inteiro(status.get('idLegislatura')),
+            numero_eleitoral=_inteiro(detalhe.get('numeroEleitoral')),
+            url_logo=_texto(detalhe.get('urlLogo')),
+            url_website=_texto(detalhe.get('urlWebSite')),
+            url_facebook=_texto(detalhe.get('urlFacebook')),
+        )
+
+
+@dataclass
+class DeputadoAPI:
+    """Resumo da listagem, completado pelo detalhe (ultimoStatus) quando `completo`"""
+    __slots__ = (
+        'id', 'nome', 'sigla_partido', 'sigla_uf', 'email', 'url_foto', 'completo',
+        'nome_civil', 'cpf', 'sexo', 'data_nascimento', 'uf_nascimento', 'municipio_nascimento',
+        'situacao', 'condicao_eleitoral', 'url_website',
+    )
+    id: int
+    nome: str
+    sigla_partido: Optional[str]
+    sigla_uf: Optional[str]
+    email: str
+    url_foto: str
+    completo: bool
+    nome_civil: str
+    cpf: str
+    sexo: Optional[str]
+    data_nascimento: Optional[date]
+    uf_nascimento: Optional[str]
+    municipio_nascimento: Optional[str]
+    situacao: str
+    condicao_eleitoral: str
+    url_website: str
+
+    @classmethod
+    def de_api(cls, resumo, detalhe=None):
+        detalhe = detalhe or {}
+        status = detalhe.get('ultimoStatus') or {}
+        gabinete = status.get('gabinete') or {}
+        return cls(
+            id=resumo['id'],
+            nome=status.get('nome') or _texto(resumo.get('nome')),
+            sigla_partido=status.get('siglaPartido') or resumo.get('siglaPartido'),
+            sigla_uf=status.get('siglaUf') or resumo.get('siglaUf'),
+            email=status.get('email') or gabinete.get('email') or _texto(resumo.get('email')),
+            url_foto=status.get('urlFoto') or _texto(resumo.get('urlFoto')),
+            completo=bool(detalhe),
+            nome_civil=_texto(detalhe.get('nomeCivil')),
+            cpf=_texto(detalhe.get('cpf')),
+            sexo=detalhe.get('sexo'),
+            data_nascimento=parse_data(detalhe.get('dataNascimento')),
+            uf_nascimento=detalhe.get('ufNascimento'),
+            municipio_nascimento=detalhe.get('municipioNascimento'),
+            situacao=_texto(status.get('situacao')),
+            condicao_eleitoral=_texto(status.get('condicaoEleitoral')),
+            url_website=_texto(detalhe.get('urlWebsite')),
+        )
+
+
+@dataclass
+class ProposicaoAPI:
+    """Detalhe de /proposicoes/{id}"""
+    __slots__ = (
+        'id', 'cod_tipo', 'sigla_tipo', 'numero', 'ano', 'ementa', 'ementa_detalhada',
+        'data_apresentacao', 'descricao_situacao', 'url_inteiro_teor',
+    )
+    id: int
+    cod_tipo: Optional[str]
+    sigla_tipo: Optional[str]
+    numero: int
+    ano: Optional[int]
+    ementa: str
+    ementa_detalhada: str
+    data_apresentacao: Optional[date]
+    descricao_situacao: str
+    url_inteiro_teor: str
+
+    @classmethod
+    def de_api(cls, dados):
+        data_apresentacao = parse_data(dados.get('dataApresentacao'))
+        status = dados.get('statusProposicao') or {}
+        cod_tipo = dados.get('codTipo')
+        return cls(
+            id=dados['id'],
+            cod_tipo=None if cod_tipo is None else str(cod_tipo),
+            sigla_tipo=dados.get('siglaTipo'),
+            numero=dados.get('numero') or 0,
+            ano=dados.get('ano') or (data_apresentacao.year if data_apresentacao else None),
+            ementa=_texto(dados.get('ementa')),
+            ementa_detalhada=_texto(dados.get('ementaDetalhada')),
+            data_apresentacao=data_apresentacao,
+            descricao_situacao=_texto(status.get('descricaoSituacao')),
+            url_inteiro_teor=_texto(dados.get('urlInteiroTeor')),
+        )
+
+
+@dataclass
+class AutorAPI:
+    """Item de /proposicoes/{id}/autores; `id_deputado` só para autores com URI de deputado"""
+    __slots__ = ('cod_tipo', 'id_deputado', 'proponente', 'ordem_assinatura')
+    cod_tipo: Optional[int]
+    id_deputado: Optional[int]
+    proponente: bool
+    ordem_assinatura: int
+
+    @classmethod
+    def de_api(cls, dados):
+        return cls(
+            cod_tipo=dados.get('codTipo'),
+            id_deputado=_id_da_uri(dados.get('uri')),
+            proponente=bool(dados.get('proponente')),
+            ordem_assinatura=dados.get('ordemAssinatura') or 0,
+        )
+
+
+@dataclass
+class VotoAPI:
+    """Item de /votacoes/{id}/votos; o objeto `deputado_` da API é reduzido ao ID"""
+    __slots__ = ('id_deputado', 'tipo_voto')
+    id_deputado: Optional[int]
+    tipo_voto: str
+
+    @classmethod
+    def de_api(cls, dados):
+        return cls(
+            id_deputado=(dados.get('deputado_') or {}).get('id'),
+            tipo_voto=_texto(dados.get('tipoVoto')),
+        )
+
+
+@dataclass
+class VotacaoAPI:
+    """Item de /proposicoes/{id}/votacoes; `data` prefere dataHoraRegistro"""
+    __slots__ = ('id', 'data', 'descricao', 'aprovacao')
+    id: str
+    data: Optional[datetime]
+    descricao: str
+    aprovacao: Optional[bool]
+
+    @classmethod
+    def de_api(cls, dados):
+        aprovacao = dados.get('aprovacao')
+        return cls(
+            id=dados['id'],
+            data=parse_data_hora(dados.get('dataHoraRegistro') or dados.get('data')),
+            descricao=_texto(dados.get('descricao')),
+            aprovacao=None if aprovacao is None else bool(aprovacao),
+        )
@@ -1,26 +1,34 @@
 """
 Serviço para integração com a API de Localidades do IBGE
 """
-import requests
+import logging
+
+from .transporte import ErroRequisicaoAPI, obter_transporte
+
+
+logger = logging.getLogger(__name__)
 
 
 class IBGELocalizacoesService:
     """Serviço para consumir a API de Localidades do IBGE"""
     
-    def __init__(self):
+    def __init__(self, transporte=None):
         self.base_url = 'https://servicodados.ibge.gov.br/api/v1/localidades'
+        self.transporte = transporte or obter_transporte()
     
     def _fazer_requisicao(self, endpoint):
         """Faz uma requisição à API do IBGE"""
         url = f"{self.base_url}/{endpoint}"
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            print(f"Erro ao fazer requisição: {e}")
+            return self.transporte.get_json(url)
+        except ErroRequisicaoAPI as e:
+            logger.error("Erro ao fazer requisição: %s", e)
             return None
     
+    def estatisticas_requisicoes(self):
+        """Contadores de latência e erros por endpoint do transporte em uso"""
+        return self.transporte.estatisticas()
+    
     def listar_regioes(self):
         """
         Lista todas as regiões do Brasil
@@ -0,0 +1,130 @@
+"""
+Limitador de taxa (token bucket) compartilhado entre processos do mesmo host
+
+O estado de cada balde fica numa linha de um banco SQLite local, atualizada sob
+`BEGIN IMMEDIATE`; assim comandos de management, workers Celery e threads do
+mesmo servidor dividem o mesmo orçamento de requisições por host de destino.
+"""
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class EstatisticasEspera:
+    """Tempo que os chamadores deste processo esperaram por um host"""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.chamadas_com_espera = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def como_dict(self):
+        return {
+            'chamadas': self.chamadas,
+            'chamadas_com_espera': self.chamadas_com_espera,
+            'espera_total': self.espera_total,
+            'espera_max': self.espera_max,
+        }
+
+
+class LimitadorTaxa:
+    """
+    Token bucket por host persistido em SQLite.
+    `limites` mapeia host -> {'taxa': requisições por segundo, 'rajada': tamanho do balde}.
+    Hosts sem configuração não são limitados.
+    """
+
+    def __init__(self, caminho, limites):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.limites = limites
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._estatisticas = {}
+        self._criar_tabela()
+
+    def adquirir(self, host):
+        """
+        Reserva um token para `host`, dormindo o necessário se o balde estiver vazio.
+        Retorna o tempo esperado em segundos.
+        """
+        limite = self.limites.get(host)
+        if not limite:
+            return 0.0
+
+        espera = self._reservar(host, float(limite['taxa']), float(limite.get('rajada', limite['taxa'])))
+        if espera > 0:
+            time.sleep(espera)
+        self._registrar(host, espera)
+        return espera
+
+    def estatisticas(self):
+        with self._lock:
+            return {host: est.como_dict() for host, est in self._estatisticas.items()}
+
+    def _reservar(self, host, taxa, rajada):
+        """
+        Reabastece o balde pelo tempo decorrido e consome um token. O saldo pode ficar
+        negativo: cada chamador reserva sua vez e espera o tempo correspondente à dívida,
+        o que mantém a ordem de chegada sem laços de nova tentativa.
+        """
+        conexao = self._conexao()
+        conexao.execute('BEGIN IMMEDIATE')
+        try:
+            # Relógio lido com a trava já tomada: quem esperou por ela não grava um
+            # instante anterior ao do último escritor (o que reabasteceria o mesmo
+            # intervalo duas vezes)
+            agora = time.time()
+            linha = conexao.execute(
+                'SELECT tokens, atualizado_em FROM baldes WHERE host = ?', (host,)
+            ).fetchone()
+            if linha is None:
+                tokens = rajada
+            else:
+                tokens, atualizado_em = linha
+                tokens = min(rajada, tokens + max(0.0, agora - atualizado_em) * taxa)
+                # Relógios de processos podem divergir um pouco; o instante nunca recua
+                agora = max(agora, atualizado_em)
+
+            tokens -= 1
+            conexao.execute(
+                'INSERT OR REPLACE INTO baldes (host, tokens, atualizado_em) VALUES (?, ?, ?)',
+                (host, tokens, agora),
+            )
+            conexao.execute('COMMIT')
+        except Exception:
+            conexao.execute('ROLLBACK')
+            raise
+
+        return -tokens / taxa if tokens < 0 else 0.0
+
+    def _registrar(self, host, espera):
+        with self._lock:
+            est = self._estatisticas.get(host)
+            if est is None:
+                est = self._estatisticas[host] = EstatisticasEspera()
+            est.chamadas += 1
+            if espera > 0:
+                est.chamadas_com_espera += 1
+                est.espera_total += espera
+                est.espera_max = max(est.espera_max, espera)
+
+    def _conexao(self):
+        # Conexões sqlite3 não podem ser compartilhadas entre threads
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(str(self.caminho), timeout=30, isolation_level=None)
+            self._local.conexao = conexao
+        return conexao
+
+    def _criar_tabela(self):
+        conexao = self._conexao()
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute(
+            'CREATE TABLE IF NOT EXISTS baldes ('
+            ' host TEXT PRIMARY KEY,'
+            ' tokens REAL NOT NULL,'
+            ' atualizado_em REAL NOT NULL)'
+        )
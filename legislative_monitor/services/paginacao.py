@@ -0,0 +1,335 @@
+"""
+Paginação das listas grandes
+
+O Paginator do Django faz um COUNT(*) e um OFFSET por página, e o custo cresce com
+o tamanho da tabela e a profundidade da página.
+
+KeysetPaginator pagina pela própria ordenação da lista (ex.: `-data_apresentacao, -id`):
+cada página é um `WHERE (data, id) < (...) ORDER BY ... LIMIT n`, servido pelo índice
+da ordenação em qualquer profundidade. Os cursores são opacos (assinados com a
+SECRET_KEY) e apontam para uma linha, não para uma posição: inserções concorrentes não
+repetem nem pulam itens entre páginas. Restrições: campos da ordenação locais ao model
+e não nulos; o último campo deve ser único (o pk é acrescentado quando falta).
+
+Os totais (`contar`, usado pelo `total` de KeysetPaginator e por PaginatorEstimado)
+são exatos só até CONTAGEM_EXATA_LIMITE linhas; acima disso vêm das estatísticas do
+banco e são exibidos como aproximados (ver `Total`).
+"""
+import json
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+SALT_CURSOR = 'legislative_monitor.paginacao'
+
+
+class Total:
+    """
+    Total de uma lista: exato, `estimado` (estatísticas do banco) ou, quando
+    `minimo`, apenas um limite inferior
+    """
+    __slots__ = ('valor', 'minimo', 'estimado')
+
+    def __init__(self, valor, minimo=False, estimado=False):
+        self.valor = valor
+        self.minimo = minimo
+        self.estimado = estimado
+
+    @property
+    def aproximado(self):
+        return self.minimo or self.estimado
+
+    def __str__(self):
+        valor = f'{self.valor:,}'.replace(',', '.')
+        if self.minimo:
+            return f'mais de {valor}'
+        return f'cerca de {valor}' if self.estimado else valor
+
+
+def contar(queryset, limite=None):
+    """
+    Total de `queryset` sem COUNT(*) completo em tabelas grandes. Conta no máximo
+    `limite` + 1 linhas (padrão: CONTAGEM_EXATA_LIMITE); acima disso usa a estimativa
+    do banco (estatísticas da tabela ou, com filtros no PostgreSQL, do planejador) e,
+    sem estimativa, informa "mais de `limite`"
+    """
+    if limite is None:
+        limite = getattr(settings, 'CONTAGEM_EXATA_LIMITE', 10000)
+    queryset = queryset.order_by()
+    tabela_inteira = not queryset.query.where and not queryset.query.distinct
+
+    if tabela_inteira:
+        # Estatísticas da tabela: nem o COUNT limitado é preciso em tabelas grandes
+        estimativa = estimar_linhas(queryset.model, queryset.db)
+        if estimativa is not None and estimativa > limite:
+            return Total(estimativa, estimado=True)
+
+    quantidade = queryset[:limite + 1].count()
+    if quantidade <= limite:
+        return Total(quantidade)
+    estimativa = None if tabela_inteira else _estimar_consulta(queryset)
+    if estimativa is not None and estimativa > limite:
+        return Total(estimativa, estimado=True)
+    return Total(limite, minimo=True)
+
+
+def estimar_linhas(modelo, using='default'):
+    """
+    Linhas da tabela de `modelo` segundo o banco, sem varrê-la; None se não houver
+    estatística. PostgreSQL: `pg_class.reltuples`, corrigido pelo tamanho atual da
+    tabela como faz o planejador. SQLite: `sqlite_stat1`, preenchida por ANALYZE.
+    """
+    connection = connections[using]
+    tabela = modelo._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT reltuples, relpages, pg_relation_size(oid) / current_setting('block_size')::int "
+                'FROM pg_class WHERE oid = to_regclass(%s)',
+                [connection.ops.quote_name(tabela)],
+            )
+            linha = cursor.fetchone()
+            if linha is None:
+                return None
+            tuplas, paginas, paginas_atuais = linha
+            if tuplas < 0 or (tuplas == 0 and paginas == 0):
+                # Nunca analisada (VACUUM/ANALYZE): sem estatística
+                return None
+            if paginas > 0:
+                return int(tuplas / paginas * paginas_atuais)
+            return int(tuplas)
+
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [tabela])
+                linhas = [int(stat.split()[0]) for stat, in cursor.fetchall() if stat]
+                if linhas:
+                    return max(linhas)
+    return None
+
+
+def _estimar_consulta(queryset):
+    """Linhas estimadas pelo planejador do PostgreSQL (EXPLAIN, sem executar); None nos demais"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, parametros = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', parametros)
+        plano = cursor.fetchone()[0]
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    return int(plano[0]['Plan']['Plan Rows'])
+
+
+class PaginaEstimada(Page):
+    """
+    Página de PaginatorEstimado. Com total aproximado, `num_pages` é só uma estimativa:
+    há próxima página enquanto a atual estiver cheia
+    """
+
+    def has_next(self):
+        if self.paginator.total.aproximado:
+            return len(self) == self.paginator.per_page
+        return super().has_next()
+
+
+class PaginatorEstimado(Paginator):
+    """
+    Paginator do Django com o total de `contar`: `count` é exato em listas pequenas e
+    estimado nas grandes (`total` informa qual). Com total aproximado, páginas além da
+    última estimada continuam válidas
+    """
+
+    @cached_property
+    def total(self):
+        return contar(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self.total.valor
+
+    def validate_number(self, number):
+        if self.total.aproximado:
+            try:
+                numero = int(number)
+            except (TypeError, ValueError):
+                raise PageNotAnInteger('O número da página não é um inteiro')
+            if numero >= 1:
+                return numero
+        return super().validate_number(number)
+
+    def page(self, number):
+        if not self.total.aproximado:
+            return super().page(number)
+        number = self.validate_number(number)
+        inicio = (number - 1) * self.per_page
+        return self._get_page(self.object_list[inicio:inicio + self.per_page], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return PaginaEstimada(*args, **kwargs)
+
+
+class PaginaKeyset:
+    """Página de KeysetPaginator; mesma interface de iteração da Page do Django"""
+
+    def __init__(self, paginator, object_list, cursor_anterior, cursor_proximo):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.cursor_anterior = cursor_anterior
+        self.cursor_proximo = cursor_proximo
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, indice):
+        return self.object_list[indice]
+
+    def has_next(self):
+        return self.cursor_proximo is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def total(self):
+        return self.paginator.total
+
+
+class KeysetPaginator:
+    """
+    `ordenacao` padrão: a do queryset (ou do Meta do model), com o pk no final.
+    `get_page(cursor)` aceita o cursor recebido na URL; cursor ausente ou inválido
+    devolve a primeira página.
+    """
+
+    def __init__(self, queryset, por_pagina, ordenacao=None):
+        self.queryset = queryset
+        self.por_pagina = por_pagina
+        ordenacao = list(ordenacao or queryset.query.order_by or queryset.model._meta.ordering)
+        pk = queryset.model._meta.pk.name
+        if not ordenacao or ordenacao[-1].lstrip('-') not in (pk, 'pk'):
+            descendente = bool(ordenacao) and ordenacao[0].startswith('-')
+            ordenacao.append(f'-{pk}' if descendente else pk)
+        self.ordenacao = ordenacao
+        self.campos = [
+            queryset.model._meta.get_field(pk if campo.lstrip('-') == 'pk' else campo.lstrip('-'))
+            for campo in ordenacao
+        ]
+        self._total = None
+
+    @property
+    def total(self):
+        """Total da lista (ver `contar`), calculado só quando pedido"""
+        if self._total is None:
+            self._total = contar(self.queryset)
+        return self._total
+
+    def get_page(self, cursor=None):
+        posicao = self._ler_cursor(cursor)
+        if posicao is None:
+            direcao, valores = 'p', None
+        else:
+            direcao, valores = posicao
+
+        # Página anterior: percorre a ordenação invertida e desfaz a inversão no final
+        para_tras = direcao == 'a'
+        if valores is None:
+            queryset = self.queryset.order_by(*self.ordenacao)
+        else:
+            queryset = self.consulta_apos(valores, para_tras)
+
+        itens = list(queryset[:self.por_pagina + 1])
+        ha_mais = len(itens) > self.por_pagina
+        itens = itens[:self.por_pagina]
+        if para_tras:
+            itens.reverse()
+
+        if not itens:
+            return PaginaKeyset(self, itens, None, None)
+        tem_anterior = ha_mais if para_tras else valores is not None
+        tem_proxima = True if para_tras else ha_mais
+        return PaginaKeyset(
+            self,
+            itens,
+            self._cursor('a', itens[0]) if tem_anterior else None,
+            self._cursor('p', itens[-1]) if tem_proxima else None,
+        )
+
+    def consulta_apos(self, valores, para_tras=False):
+        """Queryset ordenado das linhas depois (ou antes) da linha com `valores`"""
+        ordenacao = [self._inverter(campo) for campo in self.ordenacao] if para_tras else self.ordenacao
+        return self.queryset.order_by(*ordenacao).filter(self._filtro_apos(ordenacao, valores))
+
+    def _filtro_apos(self, ordenacao, valores):
+        """
+        (a, b, c) depois de (x, y, z) na ordenação: a > x OU (a = x E b > y) OU ...;
+        o `a >= x` redundante na frente dá ao banco um intervalo no índice do primeiro campo
+        """
+        primeiro = ordenacao[0].lstrip('-')
+        operador = 'lte' if ordenacao[0].startswith('-') else 'gte'
+        inicio = Q(**{f'{primeiro}__{operador}': valores[0]})
+        filtro = Q()
+        iguais = Q()
+        for campo, valor in zip(ordenacao, valores):
+            nome = campo.lstrip('-')
+            operador = 'lt' if campo.startswith('-') else 'gt'
+            filtro |= iguais & Q(**{f'{nome}__{operador}': valor})
+            iguais &= Q(**{nome: valor})
+        return inicio & filtro
+
+    def _cursor(self, direcao, objeto):
+        valores = [campo.value_to_string(objeto) for campo in self.campos]
+        return signing.dumps([direcao, valores], salt=SALT_CURSOR, compress=True)
+
+    def _ler_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            direcao, valores = signing.loads(cursor, salt=SALT_CURSOR)
+            if direcao not in ('a', 'p') or len(valores) != len(self.campos):
+                return None
+            return direcao, [campo.to_python(valor) for campo, valor in zip(self.campos, valores)]
+        except (signing.BadSignature, TypeError, ValueError, ValidationError):
+            return None
+
+    @staticmethod
+    def _inverter(campo):
+        return campo[1:] if campo.startswith('-') else f'-{campo}'
+
+
+def links_paginacao(request, pagina):
+    """
+    URLs (querystring) da página anterior e da próxima, preservando os filtros da
+    requisição; funciona com PaginaKeyset (parâmetro `cursor`) e com a Page do
+    Paginator (parâmetro `page`)
+    """
+    def url(**parametros):
+        query = request.GET.copy()
+        for nome in ('cursor', 'page'):
+            query.pop(nome, None)
+        query.update(parametros)
+        return f'?{query.urlencode()}'
+
+    if isinstance(pagina, PaginaKeyset):
+        return {
+            'url_anterior': url(cursor=pagina.cursor_anterior) if pagina.has_previous() else None,
+            'url_proxima': url(cursor=pagina.cursor_proximo) if pagina.has_next() else None,
+        }
+    return {
+        'url_anterior': url(page=pagina.previous_page_number()) if pagina.has_previous() else None,
+        'url_proxima': url(page=pagina.next_page_number()) if pagina.has_next() else None,
+    }
@@ -0,0 +1,296 @@
+"""
+Pipeline de ingestão em três estágios ligados por filas limitadas
+
+    itens -> N coletores (rede) -> normalizador (JSON -> registros) -> gravador único (banco)
+
+Os coletores e o normalizador rodam em threads; o gravador roda na thread que chamou
+`executar`, o que mantém todas as escritas do ORM numa única conexão. Filas cheias
+seguram o estágio anterior (backpressure), então a memória fica limitada a poucos
+itens por estágio. Qualquer exceção não prevista cancela todos os estágios e é
+relançada por `executar` depois que as threads terminam.
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+
+# Marca de fim de fluxo entre os estágios
+_FIM = object()
+
+
+class EstatisticasPipeline:
+    """Contadores do pipeline; os tempos de espera mostram qual estágio é o gargalo"""
+
+    def __init__(self):
+        self.itens = 0
+        self.falhas = 0
+        self.registros = 0
+        self.lotes = 0
+        self.tempo_gravacao = 0.0
+        self.espera_gravador = 0.0
+        self.duracao = 0.0
+
+    def como_dict(self):
+        return {
+            'itens': self.itens,
+            'falhas': self.falhas,
+            'registros': self.registros,
+            'lotes': self.lotes,
+            'tempo_gravacao': self.tempo_gravacao,
+            'espera_gravador': self.espera_gravador,
+            'duracao': self.duracao,
+        }
+
+
+class Pipeline:
+    """
+    `buscar(item)` roda nos coletores e devolve a resposta bruta da API.
+    `normalizar(item, bruto)` roda no normalizador e devolve um iterável de registros.
+    `gravar(registros, itens_concluidos)` roda no gravador com até `tamanho_lote`
+    registros; `itens_concluidos` são os itens cujos registros já foram todos entregues
+    (inclusive neste lote), para o chamador confirmar checkpoints na mesma transação.
+
+    Exceções de `erros_item` em `buscar` ou `normalizar` não interrompem o pipeline: o
+    item é contado como falha, `ao_falhar(item, erro)` é chamado no gravador e o item
+    segue para `itens_concluidos` sem registros.
+
+    Com `em_partes=True`, `buscar` devolve um iterável de partes (ex.: páginas da API),
+    consumido pelo coletor; cada parte segue para `normalizar(item, parte)` assim que
+    chega, sem juntar a resposta inteira do item em memória. O item só entra em
+    `itens_concluidos` depois da última parte; se falhar no meio, as partes já
+    entregues podem ter sido gravadas.
+    """
+
+    def __init__(self, buscar, normalizar, gravar, coletores=None, tamanho_lote=500,
+                 capacidade=None, erros_item=(), ao_falhar=None, intervalo_gravacao=1.0,
+                 em_partes=False):
+        self.buscar = buscar
+        self.em_partes = em_partes
+        self.normalizar = normalizar
+        self.gravar = gravar
+        self.coletores = coletores or getattr(settings, 'CAMARA_API_CONCORRENCIA', 8)
+        self.tamanho_lote = tamanho_lote
+        self.capacidade = capacidade or self.coletores * 2
+        self.erros_item = tuple(erros_item)
+        self.ao_falhar = ao_falhar
+        # Lote incompleto é gravado se nada chegar nesse intervalo (mantém checkpoints em dia)
+        self.intervalo_gravacao = intervalo_gravacao
+        self.estatisticas = EstatisticasPipeline()
+
+    def executar(self, itens):
+        """Processa todos os itens; retorna as estatísticas ou relança o primeiro erro"""
+        inicio = time.monotonic()
+        self._cancelado = threading.Event()
+        self._erro = None
+
+        fila_itens = queue.Queue(maxsize=self.capacidade)
+        fila_brutos = queue.Queue(maxsize=self.capacidade)
+        fila_normalizados = queue.Queue(maxsize=self.capacidade)
+
+        threads = [threading.Thread(
+            target=self._protegido, args=(self._alimentar, itens, fila_itens),
+            name='pipeline-alimentador', daemon=True,
+        )]
+        threads += [
+            threading.Thread(
+                target=self._protegido, args=(self._coletar, fila_itens, fila_brutos),
+                name=f'pipeline-coletor-{numero}', daemon=True,
+            )
+            for numero in range(self.coletores)
+        ]
+        threads.append(threading.Thread(
+            target=self._protegido, args=(self._normalizar, fila_brutos, fila_normalizados),
+            name='pipeline-normalizador', daemon=True,
+        ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._gravar(fila_normalizados)
+        except BaseException as e:
+            self._falhar(e)
+        finally:
+            self._cancelado.set()
+            for thread in threads:
+                thread.join()
+            fechar = getattr(itens, 'close', None)
+            if fechar is not None:
+                fechar()
+            self.estatisticas.duracao = time.monotonic() - inicio
+
+        if self._erro is not None:
+            raise self._erro
+        return self.estatisticas
+
+    # Estágios -------------------------------------------------------------------
+
+    def _alimentar(self, itens, saida):
+        for item in itens:
+            if not self._colocar(saida, item):
+                return
+        for _ in range(self.coletores):
+            self._colocar(saida, _FIM)
+
+    def _coletar(self, entrada, saida):
+        while True:
+            item = self._retirar(entrada)
+            if item is _FIM:
+                self._colocar(saida, _FIM)
+                return
+            if item is None:
+                return
+            if self.em_partes:
+                if not self._coletar_partes(item, saida):
+                    return
+                continue
+            try:
+                mensagem = (item, self.buscar(item), None, True)
+            except self.erros_item as e:
+                mensagem = (item, None, e, True)
+            if not self._colocar(saida, mensagem):
+                return
+
+    def _coletar_partes(self, item, saida):
+        """Envia cada parte do item como uma mensagem; a última (final=True) vem sem dados"""
+        try:
+            for parte in self.buscar(item):
+                if not self._colocar(saida, (item, parte, None, False)):
+                    return False
+        except self.erros_item as e:
+            return self._colocar(saida, (item, None, e, True))
+        return self._colocar(saida, (item, None, None, True))
+
+    def _normalizar(self, entrada, saida):
+        finalizados = 0
+        # Itens em partes que já falharam na normalização: as partes seguintes são descartadas
+        descartados = set()
+        while finalizados < self.coletores:
+            mensagem = self._retirar(entrada)
+            if mensagem is None:
+                return
+            if mensagem is _FIM:
+                finalizados += 1
+                continue
+            item, bruto, erro, final = mensagem
+            if id(item) in descartados:
+                if final:
+                    descartados.discard(id(item))
+                continue
+            registros = []
+            # Em partes, a mensagem final só marca o fim do item
+            if erro is None and not (self.em_partes and final):
+                try:
+                    registros = list(self.normalizar(item, bruto))
+                except self.erros_item as e:
+                    if not final:
+                        descartados.add(id(item))
+                    erro, final = e, True
+            if not self._colocar(saida, (item, registros, erro, final)):
+                return
+        self._colocar(saida, _FIM)
+
+    def _gravar(self, entrada):
+        lote, concluidos = [], []
+        while True:
+            inicio_espera = time.monotonic()
+            try:
+                mensagem = entrada.get(timeout=self.intervalo_gravacao)
+            except queue.Empty:
+                mensagem = None
+            self.estatisticas.espera_gravador += time.monotonic() - inicio_espera
+
+            if self._cancelado.is_set():
+                return
+            if mensagem is None:
+                # Nada chegou: grava o que houver para não segurar checkpoints
+                if lote or concluidos:
+                    self._gravar_lote(lote, concluidos)
+                    lote, concluidos = [], []
+                continue
+            if mensagem is _FIM:
+                if lote or concluidos:
+                    self._gravar_lote(lote, concluidos)
+                return
+
+            item, registros, erro, final = mensagem
+            lote.extend(registros)
+            if final:
+                self.estatisticas.itens += 1
+                if erro is not None:
+                    self.estatisticas.falhas += 1
+                    if self.ao_falhar is not None:
+                        self.ao_falhar(item, erro)
+                concluidos.append(item)
+            if len(lote) >= self.tamanho_lote:
+                self._gravar_lote(lote, concluidos)
+                lote, concluidos = [], []
+
+    def _gravar_lote(self, lote, concluidos):
+        inicio = time.monotonic()
+        self.gravar(lote, concluidos)
+        self.estatisticas.tempo_gravacao += time.monotonic() - inicio
+        self.estatisticas.registros += len(lote)
+        self.estatisticas.lotes += 1
+
+    # Controle -------------------------------------------------------------------
+
+    def _protegido(self, alvo, *args):
+        try:
+            alvo(*args)
+        except BaseException as e:
+            self._falhar(e)
+
+    def _falhar(self, erro):
+        if self._erro is None:
+            self._erro = erro
+        self._cancelado.set()
+
+    def _colocar(self, fila, valor):
+        """put que desiste quando o pipeline é cancelado; retorna False nesse caso"""
+        while not self._cancelado.is_set():
+            try:
+                fila.put(valor, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _retirar(self, fila):
+        """get que desiste quando o pipeline é cancelado; retorna None nesse caso"""
+        while not self._cancelado.is_set():
+            try:
+                return fila.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return None
+
+
+class ProgressoOrdenado:
+    """
+    Acompanha a conclusão de itens agrupados por chaves ordenadas (ex.: páginas) e
+    informa quais chaves ficaram completas sem lacunas, na ordem de registro.
+    `registrar` pode ser chamado pelo alimentador e `concluir` pelo gravador.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ordem = deque()
+        self._faltando = {}
+
+    def registrar(self, chave, quantidade):
+        with self._lock:
+            self._ordem.append(chave)
+            self._faltando[chave] = quantidade
+
+    def concluir(self, chave, quantidade=1):
+        """Marca itens da chave como concluídos; retorna as chaves que ficaram completas, em ordem"""
+        with self._lock:
+            self._faltando[chave] -= quantidade
+            completas = []
+            while self._ordem and self._faltando[self._ordem[0]] <= 0:
+                completas.append(self._ordem.popleft())
+                del self._faltando[completas[-1]]
+            return completas
@@ -0,0 +1,20 @@
+"""
+Funções auxiliares de normalização de texto (comparação sem acentos/caixa)
+"""
+import unicodedata
+
+
+def remover_acentos(texto):
+    """Remove diacríticos: 'João Pessoa' -> 'Joao Pessoa'"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def normalizar(texto):
+    """Chave de comparação: sem acentos, minúsculas e espaços simples"""
+    return ' '.join(remover_acentos(texto).lower().split())
+
+
+def chave_busca(*partes):
+    """Texto das colunas de busca por nome: partes normalizadas, separadas por espaço"""
+    return normalizar(' '.join(parte for parte in partes if parte))
@@ -0,0 +1,278 @@
+"""
+Transporte HTTP compartilhado pelos serviços de integração (Câmara e IBGE)
+
+Mantém uma única `requests.Session` com pool de conexões keep-alive, refaz
+requisições que falham com 429/5xx usando backoff exponencial com jitter,
+consulta o cache em disco (requisições condicionais), respeita o limitador de
+taxa compartilhado entre processos e acumula contadores de latência, erros,
+acertos de cache e espera no limitador por endpoint.
+"""
+import logging
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .cache_http import CacheHTTPDisco
+from .limitador_taxa import LimitadorTaxa
+
+
+logger = logging.getLogger(__name__)
+
+# Códigos HTTP que justificam uma nova tentativa
+STATUS_RETENTATIVA = frozenset({429, 500, 502, 503, 504})
+
+# Segmentos numéricos do caminho são agrupados nas estatísticas (deputados/204554 -> deputados/{id})
+_SEGMENTO_ID = re.compile(r'/\d+(?=/|$)')
+
+
+class ErroRequisicaoAPI(Exception):
+    """Erro definitivo ao consultar uma API externa (após esgotar as tentativas)"""
+
+    def __init__(self, mensagem, url=None, status=None):
+        super().__init__(mensagem)
+        self.url = url
+        self.status = status
+
+
+class EstatisticasEndpoint:
+    """Contadores de latência e erros de um endpoint"""
+
+    def __init__(self):
+        self.requisicoes = 0
+        self.erros = 0
+        self.retentativas = 0
+        self.cache_hits = 0
+        self.revalidacoes = 0
+        self.espera_limitador = 0.0
+        self.latencia_total = 0.0
+        self.latencia_max = 0.0
+
+    @property
+    def latencia_media(self):
+        if not self.requisicoes:
+            return 0.0
+        return self.latencia_total / self.requisicoes
+
+    def como_dict(self):
+        return {
+            'requisicoes': self.requisicoes,
+            'erros': self.erros,
+            'retentativas': self.retentativas,
+            'cache_hits': self.cache_hits,
+            'revalidacoes': self.revalidacoes,
+            'espera_limitador': self.espera_limitador,
+            'latencia_total': self.latencia_total,
+            'latencia_media': self.latencia_media,
+            'latencia_max': self.latencia_max,
+        }
+
+
+class TransporteHTTP:
+    """Cliente HTTP com pool de conexões, retentativas e métricas por endpoint"""
+
+    def __init__(self, timeout_conexao=None, timeout_leitura=None, max_tentativas=None,
+                 backoff_base=None, backoff_max=None, pool_maxsize=None, cache=None,
+                 limitador=None):
+        self.timeout_conexao = timeout_conexao or getattr(settings, 'API_HTTP_TIMEOUT_CONEXAO', 5)
+        self.timeout_leitura = timeout_leitura or getattr(settings, 'API_HTTP_TIMEOUT_LEITURA', 30)
+        self.max_tentativas = max_tentativas or getattr(settings, 'API_HTTP_MAX_TENTATIVAS', 4)
+        self.backoff_base = backoff_base or getattr(settings, 'API_HTTP_BACKOFF_BASE', 0.5)
+        self.backoff_max = backoff_max or getattr(settings, 'API_HTTP_BACKOFF_MAX', 30)
+        pool_maxsize = pool_maxsize or getattr(settings, 'API_HTTP_POOL_MAXSIZE', 20)
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'User-Agent': 'MonitorIA-Legislativa',
+        })
+        # As retentativas são feitas aqui (com jitter e métricas), não pelo urllib3
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.cache = cache
+        self.limitador = limitador
+        self._lock = threading.Lock()
+        self._estatisticas = {}
+
+    def get_json(self, url, params=None):
+        """
+        Faz um GET e retorna o JSON decodificado.
+        Refaz a requisição em falhas de conexão, timeouts e respostas 429/5xx.
+        Com cache configurado, serve respostas frescas do disco e revalida as vencidas
+        com requisições condicionais.
+        Levanta ErroRequisicaoAPI quando não é possível obter uma resposta válida.
+        """
+        endpoint = self._chave_endpoint(url)
+
+        entrada = self.cache.obter(url, params) if self.cache else None
+        if entrada is not None and entrada.fresca:
+            self._registrar_cache(endpoint, 'cache_hits')
+            return entrada.corpo
+
+        cabecalhos = entrada.cabecalhos_condicionais() if entrada is not None else None
+        response, latencia = self._requisitar(url, params, cabecalhos, endpoint)
+
+        if response.status_code == 304 and entrada is not None:
+            self._registrar(endpoint, latencia)
+            self._registrar_cache(endpoint, 'revalidacoes')
+            self.cache.renovar(
+                entrada,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+            return entrada.corpo
+
+        try:
+            response.raise_for_status()
+            dados = response.json()
+        except requests.HTTPError as e:
+            self._registrar(endpoint, latencia, erro=True)
+            raise ErroRequisicaoAPI(str(e), url=url, status=response.status_code) from e
+        except ValueError as e:
+            self._registrar(endpoint, latencia, erro=True)
+            raise ErroRequisicaoAPI(f'{url}: resposta não é JSON válido', url=url,
+                                    status=response.status_code) from e
+
+        self._registrar(endpoint, latencia)
+        if self.cache:
+            self.cache.armazenar(
+                url, params, dados,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+        return dados
+
+    def _requisitar(self, url, params, cabecalhos, endpoint):
+        """Executa o GET com retentativas; retorna (response, latência da última tentativa)"""
+        host = urlsplit(url).hostname
+        for tentativa in range(1, self.max_tentativas + 1):
+            ultima = tentativa == self.max_tentativas
+            if self.limitador:
+                espera = self.limitador.adquirir(host)
+                if espera:
+                    self._registrar_espera(endpoint, espera)
+            inicio = time.monotonic()
+            try:
+                response = self.session.get(
+                    url,
+                    params=params,
+                    headers=cabecalhos,
+                    timeout=(self.timeout_conexao, self.timeout_leitura),
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._registrar(endpoint, time.monotonic() - inicio, erro=ultima, retentativa=not ultima)
+                if ultima:
+                    raise ErroRequisicaoAPI(f'{url}: {e}', url=url) from e
+                self._aguardar(tentativa)
+                continue
+            except requests.RequestException as e:
+                self._registrar(endpoint, time.monotonic() - inicio, erro=True)
+                raise ErroRequisicaoAPI(f'{url}: {e}', url=url) from e
+
+            latencia = time.monotonic() - inicio
+
+            if response.status_code in STATUS_RETENTATIVA and not ultima:
+                self._registrar(endpoint, latencia, retentativa=True)
+                logger.warning(
+                    'HTTP %s em %s (tentativa %s/%s)',
+                    response.status_code, endpoint, tentativa, self.max_tentativas,
+                )
+                self._aguardar(tentativa, response)
+                continue
+
+            return response, latencia
+
+    def estatisticas(self):
+        """Retorna uma cópia dos contadores por endpoint"""
+        with self._lock:
+            return {endpoint: est.como_dict() for endpoint, est in self._estatisticas.items()}
+
+    def zerar_estatisticas(self):
+        with self._lock:
+            self._estatisticas.clear()
+
+    def fechar(self):
+        self.session.close()
+
+    def _aguardar(self, tentativa, response=None):
+        """Backoff exponencial com jitter completo; respeita Retry-After quando presente"""
+        espera = None
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                espera = min(float(retry_after), self.backoff_max)
+        if espera is None:
+            teto = min(self.backoff_max, self.backoff_base * (2 ** (tentativa - 1)))
+            espera = random.uniform(0, teto)
+        time.sleep(espera)
+
+    def _estatistica(self, endpoint):
+        est = self._estatisticas.get(endpoint)
+        if est is None:
+            est = self._estatisticas[endpoint] = EstatisticasEndpoint()
+        return est
+
+    def _registrar_cache(self, endpoint, contador):
+        with self._lock:
+            est = self._estatistica(endpoint)
+            setattr(est, contador, getattr(est, contador) + 1)
+
+    def _registrar_espera(self, endpoint, espera):
+        with self._lock:
+            self._estatistica(endpoint).espera_limitador += espera
+
+    def _registrar(self, endpoint, latencia, erro=False, retentativa=False):
+        with self._lock:
+            est = self._estatistica(endpoint)
+            est.requisicoes += 1
+            est.latencia_total += latencia
+            est.latencia_max = max(est.latencia_max, latencia)
+            if erro:
+                est.erros += 1
+            if retentativa:
+                est.retentativas += 1
+
+    @staticmethod
+    def _chave_endpoint(url):
+        partes = urlsplit(url)
+        return partes.netloc + _SEGMENTO_ID.sub('/{id}', partes.path)
+
+
+def _criar_cache():
+    """Cache em disco configurado em settings (None se desabilitado)"""
+    if not getattr(settings, 'API_CACHE_HABILITADO', False):
+        return None
+    return CacheHTTPDisco(
+        diretorio=settings.API_CACHE_DIR,
+        ttls=settings.API_CACHE_TTLS,
+        tamanho_max=settings.API_CACHE_TAMANHO_MAX,
+    )
+
+
+def _criar_limitador():
+    """Limitador de taxa configurado em settings (None se não houver limites)"""
+    limites = getattr(settings, 'API_RATE_LIMITS', None)
+    if not limites:
+        return None
+    return LimitadorTaxa(caminho=settings.API_RATE_LIMIT_ARQUIVO, limites=limites)
+
+
+_transporte = None
+_transporte_lock = threading.Lock()
+
+
+def obter_transporte():
+    """Retorna o transporte compartilhado do processo (criado sob demanda)"""
+    global _transporte
+    if _transporte is None:
+        with _transporte_lock:
+            if _transporte is None:
+                _transporte = TransporteHTTP(cache=_criar_cache(), limitador=_criar_limitador())
+    return _transporte
@@ -0,0 +1,231 @@
+"""
+Trava entre processos para as sincronizações
+
+Impede que duas cópias do mesmo comando (ex.: cron que atrasou e a execução seguinte)
+rodem ao mesmo tempo. No PostgreSQL usa advisory lock de sessão; nos demais bancos
+(SQLite em desenvolvimento), um arquivo travado com flock/msvcrt. Nos dois casos o
+sistema libera a trava quando o processo morre, então uma queda nunca deixa a trava
+presa: "trava abandonada" só é detectada e registrada. Um dono vivo que segura a
+trava há mais de SYNC_TRAVA_ALERTA segundos é apontado como possivelmente travado.
+"""
+import hashlib
+import json
+import logging
+import os
+import socket
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+logger = logging.getLogger(__name__)
+
+
+class TravaOcupada(Exception):
+    """A trava pertence a outro processo; `dono` descreve quem a segura, quando conhecido"""
+
+    def __init__(self, nome, dono=None):
+        self.nome = nome
+        self.dono = dono or {}
+        descricao = ', '.join(f'{chave}={valor}' for chave, valor in self.dono.items())
+        super().__init__(f'Trava "{nome}" ocupada' + (f' ({descricao})' if descricao else ''))
+
+
+class _TravaPostgres:
+    """Advisory lock de sessão na conexão padrão do Django"""
+
+    def __init__(self, nome):
+        digest = hashlib.sha1(nome.encode('utf-8')).digest()
+        self.chave = int.from_bytes(digest[:8], 'big', signed=True)
+
+    def tentar(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_try_advisory_lock(%s)', [self.chave])
+            return cursor.fetchone()[0]
+
+    def liberar(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [self.chave])
+
+    def dono(self):
+        """Sessão que segura a trava (pg_locks guarda a chave de 64 bits em classid/objid)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT a.pid, a.client_addr, a.application_name, a.state, a.backend_start, a.state_change
+                FROM pg_locks l JOIN pg_stat_activity a ON a.pid = l.pid
+                WHERE l.locktype = 'advisory' AND l.granted
+                  AND l.classid = %s AND l.objid = %s AND l.objsubid = 1
+                """,
+                [(self.chave >> 32) & 0xFFFFFFFF, self.chave & 0xFFFFFFFF],
+            )
+            linha = cursor.fetchone()
+        if linha is None:
+            return None
+        pid, cliente, aplicacao, estado, inicio, mudanca = linha
+        return {
+            'pid': pid, 'cliente': cliente, 'aplicacao': aplicacao, 'estado': estado,
+            'desde': inicio.isoformat(), 'ultima_atividade': mudanca.isoformat() if mudanca else None,
+        }
+
+    def abandonada(self):
+        # A trava some com a sessão: não há como sobrar trava de um processo morto
+        return None
+
+
+class _TravaArquivo:
+    """
+    Arquivo em SYNC_TRAVA_DIR travado com flock (msvcrt no Windows). O conteúdo descreve
+    o dono atual e é apagado ao liberar; conteúdo encontrado por quem obtém a trava
+    indica um dono anterior que terminou sem liberar.
+    """
+
+    def __init__(self, nome, diretorio):
+        diretorio = Path(diretorio)
+        diretorio.mkdir(parents=True, exist_ok=True)
+        seguro = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in nome)
+        self.caminho = diretorio / f'{seguro}.lock'
+        self._arquivo = None
+        self._anterior = None
+
+    def tentar(self):
+        arquivo = open(self.caminho, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            arquivo.close()
+            return False
+
+        self._anterior = self._ler(arquivo)
+        arquivo.seek(0)
+        arquivo.truncate()
+        arquivo.write(json.dumps({
+            'pid': os.getpid(), 'host': socket.gethostname(), 'desde': timezone.now().isoformat(),
+        }))
+        arquivo.flush()
+        self._arquivo = arquivo
+        return True
+
+    def liberar(self):
+        arquivo, self._arquivo = self._arquivo, None
+        if arquivo is None:
+            return
+        arquivo.seek(0)
+        arquivo.truncate()
+        arquivo.flush()
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+        else:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+        arquivo.close()
+
+    def dono(self):
+        try:
+            with open(self.caminho) as arquivo:
+                return self._ler(arquivo)
+        except OSError:
+            return None
+
+    def abandonada(self):
+        return self._anterior
+
+    @staticmethod
+    def _ler(arquivo):
+        arquivo.seek(0)
+        try:
+            return json.loads(arquivo.read() or 'null')
+        except ValueError:
+            return None
+
+
+class TravaSincronizacao:
+    """
+    Uso:
+        with TravaSincronizacao('sync_partidos', espera=0):
+            ...
+
+    `espera` é o tempo máximo (segundos) aguardando a trava antes de levantar
+    TravaOcupada; 0 tenta uma única vez e None espera indefinidamente.
+    `tempo_espera` e `tempo_retida` ficam disponíveis depois de liberar.
+    """
+
+    def __init__(self, nome, espera=0, intervalo=1.0):
+        self.nome = nome
+        self.espera = espera
+        self.intervalo = intervalo
+        self.tempo_espera = 0.0
+        self.tempo_retida = 0.0
+        self._adquirida_em = None
+        if connection.vendor == 'postgresql':
+            self._backend = _TravaPostgres(nome)
+        else:
+            self._backend = _TravaArquivo(nome, settings.SYNC_TRAVA_DIR)
+
+    def __enter__(self):
+        self.adquirir()
+        return self
+
+    def __exit__(self, *exc):
+        self.liberar()
+
+    def adquirir(self):
+        inicio = time.monotonic()
+        avisado = False
+        while not self._backend.tentar():
+            dono = self._backend.dono()
+            if not avisado:
+                self._avisar_se_presa(dono)
+                avisado = True
+            decorrido = time.monotonic() - inicio
+            if self.espera is not None and decorrido >= self.espera:
+                self.tempo_espera = decorrido
+                raise TravaOcupada(self.nome, dono)
+            pausa = self.intervalo if self.espera is None else min(self.intervalo, self.espera - decorrido)
+            time.sleep(pausa)
+
+        self.tempo_espera = time.monotonic() - inicio
+        self._adquirida_em = time.monotonic()
+        anterior = self._backend.abandonada()
+        if anterior:
+            logger.warning(
+                'Trava "%s" abandonada por um processo encerrado sem liberá-la (%s); assumida pelo PID %s',
+                self.nome, anterior, os.getpid(),
+            )
+        return self
+
+    def liberar(self):
+        if self._adquirida_em is None:
+            return
+        self._backend.liberar()
+        self.tempo_retida = time.monotonic() - self._adquirida_em
+        self._adquirida_em = None
+        logger.info(
+            'Trava "%s" liberada: espera %.1fs, retida %.1fs', self.nome, self.tempo_espera, self.tempo_retida,
+        )
+
+    def _avisar_se_presa(self, dono):
+        """Dono vivo segurando a trava além do limite de alerta: provavelmente travado"""
+        desde = (dono or {}).get('desde')
+        if not desde:
+            return
+        idade = (timezone.now() - datetime.fromisoformat(desde)).total_seconds()
+        if idade > settings.SYNC_TRAVA_ALERTA:
+            logger.warning(
+                'Trava "%s" retida há %.0f min por %s: o processo pode estar travado',
+                self.nome, idade / 60, dono,
+            )
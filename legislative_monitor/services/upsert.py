@@ -0,0 +1,253 @@
+"""
+Gravação em lote que ignora registros sem alteração
+
+Cada registro recebe um hash dos campos vindos da API (coluna `hash_conteudo`).
+Antes de gravar, os hashes atuais de cada lote são lidos numa única consulta e só
+as linhas novas ou alteradas vão para o INSERT ... ON CONFLICT DO UPDATE. Assim
+`updated_at` passa a significar "conteúdo alterado".
+
+Quando um mesmo model é gravado ora com todos os campos, ora com parte deles (ex.:
+deputados sem detalhe, discursos sem transcrição), o hash deve cobrir sempre o
+mesmo conjunto canônico (`campos_hash`): os campos que a gravação parcial não traz
+são lidos do banco junto com o hash, e uma linha só é regravada se algo mudou.
+
+`upsert_alterados` trabalha com instâncias já montadas; `BulkUpserter` recebe
+dicionários, resolve chaves estrangeiras em memória e agrupa as linhas em lotes.
+"""
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+# Campos de controle: nunca entram no hash e sempre são gravados nas linhas alteradas
+CAMPOS_CONTROLE = ('hash_conteudo', 'updated_at')
+
+
+class ResultadoUpsert:
+    """
+    Contagem de linhas criadas, atualizadas, inalteradas (não gravadas) e com falha,
+    e o tempo gasto na gravação
+    """
+
+    def __init__(self, criados=0, atualizados=0, inalterados=0, falhas=0, duracao=0.0):
+        self.criados = criados
+        self.atualizados = atualizados
+        self.inalterados = inalterados
+        self.falhas = falhas
+        self.duracao = duracao
+
+    @property
+    def total(self):
+        return self.criados + self.atualizados + self.inalterados
+
+    @property
+    def linhas_por_segundo(self):
+        return (self.total + self.falhas) / self.duracao if self.duracao else 0.0
+
+    def __add__(self, outro):
+        return ResultadoUpsert(
+            self.criados + outro.criados,
+            self.atualizados + outro.atualizados,
+            self.inalterados + outro.inalterados,
+            self.falhas + outro.falhas,
+            self.duracao + outro.duracao,
+        )
+
+    def como_dict(self):
+        return {
+            'criados': self.criados,
+            'atualizados': self.atualizados,
+            'inalterados': self.inalterados,
+            'falhas': self.falhas,
+            'linhas_por_segundo': self.linhas_por_segundo,
+        }
+
+    def __repr__(self):
+        return (
+            f'ResultadoUpsert(criados={self.criados}, atualizados={self.atualizados}, '
+            f'inalterados={self.inalterados}, falhas={self.falhas})'
+        )
+
+
+def calcular_hash(instancia, campos):
+    """
+    SHA-1 dos valores de `campos` da instância (campos de controle são ignorados). Os
+    valores passam por `_valor_canonico`, então o valor montado a partir da API e o lido
+    do banco têm o mesmo hash
+    """
+    valores = []
+    for nome in campos:
+        if nome in CAMPOS_CONTROLE:
+            continue
+        campo = instancia._meta.get_field(nome)
+        valores.append(_valor_canonico(campo, getattr(instancia, campo.attname)))
+    return hashlib.sha1(repr(valores).encode('utf-8')).hexdigest()
+
+
+def _valor_canonico(campo, valor):
+    """Valor no tipo Python do campo (ex.: '57' -> 57), com datas e horas em UTC"""
+    valor = campo.to_python(valor)
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return valor.astimezone(dt_timezone.utc)
+    return valor
+
+
+def upsert_alterados(modelo, objetos, chave, campos, lote=500, campos_hash=None):
+    """
+    Grava `objetos` (instâncias não salvas) com upsert em `chave`, pulando os que têm
+    o mesmo hash de conteúdo já gravado. `campos` são os campos sobrescritos em
+    conflito; o hash é calculado sobre `campos_hash` (padrão: `campos`). Campos de
+    `campos_hash` fora de `campos` recebem, nas linhas já existentes, o valor gravado.
+    Deve ser chamado dentro de uma transação quando a gravação precisar ser atômica.
+    A ordem dos objetos é preservada.
+    """
+    resultado = ResultadoUpsert()
+    campos_gravados = [c for c in campos if c not in CAMPOS_CONTROLE] + list(CAMPOS_CONTROLE)
+    campos_hash = campos if campos_hash is None else campos_hash
+    preservados = [
+        modelo._meta.get_field(nome).attname
+        for nome in campos_hash
+        if nome not in campos and nome not in CAMPOS_CONTROLE
+    ]
+
+    for inicio in range(0, len(objetos), lote):
+        bloco = objetos[inicio:inicio + lote]
+        atuais, gravados = {}, {}
+        for valor_chave, hash_atual, *valores in (
+            modelo.objects.filter(**{f'{chave}__in': [getattr(o, chave) for o in bloco]})
+            .values_list(chave, 'hash_conteudo', *preservados)
+        ):
+            atuais[valor_chave] = hash_atual
+            gravados[valor_chave] = valores
+        for objeto in bloco:
+            for attname, valor in zip(preservados, gravados.get(getattr(objeto, chave), ())):
+                setattr(objeto, attname, valor)
+            objeto.hash_conteudo = calcular_hash(objeto, campos_hash)
+
+        alterados = [o for o in bloco if atuais.get(getattr(o, chave)) != o.hash_conteudo]
+        if alterados:
+            modelo.objects.bulk_create(
+                alterados,
+                update_conflicts=True,
+                unique_fields=[chave],
+                update_fields=campos_gravados,
+            )
+
+        novos = sum(1 for o in alterados if getattr(o, chave) not in atuais)
+        resultado.criados += novos
+        resultado.atualizados += len(alterados) - novos
+        resultado.inalterados += len(bloco) - len(alterados)
+
+    return resultado
+
+
+class BulkUpserter:
+    """
+    Upsert em lote a partir de dicionários {campo: valor}.
+
+    `chave` é o campo único usado no ON CONFLICT. `resolvedores` mapeia o nome de um
+    campo ForeignKey para um dicionário (ou função) que converte o valor vindo da API
+    na pk relacionada; valores sem correspondência viram NULL quando o campo aceita
+    nulo e falha do registro caso contrário. `campos` são os campos sobrescritos em
+    conflito (padrão: todos os do primeiro registro, exceto a chave); `campos_hash`, o
+    conjunto canônico do hash, como em `upsert_alterados`.
+
+    Uso:
+        upserter = BulkUpserter(Estado, 'id', resolvedores={'regiao': mapa_regioes})
+        resultado = upserter.executar(registros)
+    ou, para fluxos contínuos, `adicionar(registro)` seguido de `finalizar()`.
+    """
+
+    def __init__(self, modelo, chave, campos=None, resolvedores=None, lote=500, campos_hash=None):
+        self.modelo = modelo
+        self.chave = chave
+        self.campos = list(campos) if campos is not None else None
+        self.campos_hash = campos_hash
+        self.resolvedores = resolvedores or {}
+        self.lote = lote
+        self.resultado = ResultadoUpsert()
+        self.erros = []
+        self._pendentes = {}
+        self._inicio = None
+
+    def executar(self, registros):
+        """Grava todos os registros do iterável e retorna o ResultadoUpsert"""
+        for registro in registros:
+            self.adicionar(registro)
+        return self.finalizar()
+
+    def adicionar(self, registro):
+        """Acumula um registro; grava o lote quando ele atinge o tamanho configurado"""
+        if self._inicio is None:
+            self._inicio = time.monotonic()
+        try:
+            objeto = self._montar(registro)
+        except (KeyError, TypeError, ValueError) as e:
+            self._registrar_falha(registro.get(self.chave), e)
+            return
+        # Chave repetida no mesmo lote: vale o último (o ON CONFLICT não aceita duplicatas)
+        self._pendentes[getattr(objeto, self.chave)] = objeto
+        if len(self._pendentes) >= self.lote:
+            self._gravar_pendentes()
+
+    def finalizar(self):
+        """Grava o lote incompleto e fecha a contagem de tempo"""
+        if self._pendentes:
+            self._gravar_pendentes()
+        if self._inicio is not None:
+            self.resultado.duracao = time.monotonic() - self._inicio
+        return self.resultado
+
+    def _montar(self, registro):
+        valores = {}
+        for nome, bruto in registro.items():
+            resolvedor = self.resolvedores.get(nome)
+            if resolvedor is None:
+                valores[nome] = bruto
+                continue
+            pk = None
+            if bruto is not None:
+                pk = resolvedor(bruto) if callable(resolvedor) else resolvedor.get(bruto)
+            campo = self.modelo._meta.get_field(nome)
+            if pk is None and bruto is not None and not campo.null:
+                raise ValueError(f'{nome}={bruto!r} não encontrado')
+            valores[campo.attname] = pk
+        if self.campos is None:
+            self.campos = [
+                self.modelo._meta.get_field(nome).name
+                for nome in valores if nome != self.chave
+            ]
+        return self.modelo(**valores)
+
+    def _gravar_pendentes(self):
+        objetos = list(self._pendentes.values())
+        self._pendentes = {}
+        try:
+            with transaction.atomic():
+                parcial = upsert_alterados(
+                    self.modelo, objetos, self.chave, self.campos, lote=self.lote, campos_hash=self.campos_hash,
+                )
+        except DatabaseError:
+            # Lote rejeitado pelo banco: regrava linha a linha para isolar os registros inválidos
+            parcial = ResultadoUpsert()
+            for objeto in objetos:
+                try:
+                    with transaction.atomic():
+                        parcial += upsert_alterados(
+                            self.modelo, [objeto], self.chave, self.campos, campos_hash=self.campos_hash,
+                        )
+                except DatabaseError as e:
+                    self._registrar_falha(getattr(objeto, self.chave), e)
+        self.resultado += parcial
+
+    def _registrar_falha(self, chave, erro):
+        logger.warning('Falha ao gravar %s %s=%s: %s', self.modelo.__name__, self.chave, chave, erro)
+        self.resultado.falhas += 1
+        self.erros.append((chave, str(erro)))
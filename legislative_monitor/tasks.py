@@ -0,0 +1,198 @@
+"""
+Tarefas Celery de sincronização
+
+Cada tarefa executa o comando de management correspondente (a lógica continua nos
+comandos). Trabalhos grandes são divididos em subtarefas independentes: proposições
+por janela mensal (ou por ano, na carga histórica), cada uma com seu próprio checkpoint,
+e votações por lote de IDs. Como toda gravação é um upsert, uma subtarefa repetida
+(nova tentativa ou reentrega após queda do worker) não duplica dados.
+"""
+import io
+from datetime import date, timedelta
+
+from celery import chain, chord, group, shared_task
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+from django.utils import timezone
+
+from .management.base import ComandoTravado
+from .models import Proposicao
+from .services.transporte import ErroRequisicaoAPI
+
+
+# Falhas transitórias (API fora do ar, banco bloqueado, comando em execução em outro
+# worker) geram nova tentativa com backoff; os demais erros de comando falham direto
+RETENTATIVAS = {
+    'autoretry_for': (ErroRequisicaoAPI, ComandoTravado, OperationalError),
+    'retry_backoff': 30,
+    'retry_backoff_max': 600,
+    'retry_jitter': True,
+    'max_retries': 5,
+}
+
+# Caracteres finais da saída do comando devolvidos como resultado da tarefa
+TAMANHO_SAIDA = 2000
+
+
+def _executar_comando(nome, **opcoes):
+    saida = io.StringIO()
+    try:
+        call_command(nome, stdout=saida, **opcoes)
+    except CommandError as e:
+        # Falha transitória que o comando relatou como CommandError: relança a original
+        if isinstance(e.__cause__, RETENTATIVAS['autoretry_for']):
+            raise e.__cause__
+        raise
+    return saida.getvalue()[-TAMANHO_SAIDA:]
+
+
+def _janelas_mensais(desde, ate):
+    """(início, fim) de cada mês entre as duas datas, recortados nos extremos"""
+    inicio = desde
+    while inicio <= ate:
+        proximo_mes = (inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+        fim = min(proximo_mes - timedelta(days=1), ate)
+        yield inicio, fim
+        inicio = proximo_mes
+
+
+# Dados de referência ----------------------------------------------------------
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_ibge_localidades():
+    return _executar_comando('sync_ibge_localidades')
+
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_partidos(detalhes=True):
+    return _executar_comando('sync_partidos', detalhes=detalhes)
+
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_tipos_proposicao():
+    return _executar_comando('sync_tipos_proposicao')
+
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_deputados(legislatura=None):
+    return _executar_comando('sync_deputados', legislatura=legislatura)
+
+
+@shared_task
+def sincronizar_referencias():
+    """Partidos e tipos em paralelo e, depois, os deputados (que dependem dos partidos)"""
+    fluxo = chain(
+        group(sincronizar_partidos.si(), sincronizar_tipos_proposicao.si()),
+        sincronizar_deputados.si(),
+    )
+    fluxo.apply_async()
+    return {'etapas': 3}
+
+
+# Proposições ------------------------------------------------------------------
+
+@shared_task
+def sincronizar_proposicoes(desde=None, ate=None):
+    """
+    Sem `desde`: sincronização incremental a partir do checkpoint padrão.
+    Com `desde` (AAAA-MM-DD): um intervalo fixo, dividido em uma subtarefa por mês.
+    """
+    if desde is None:
+        sincronizar_proposicoes_janela.delay()
+        return {'subtarefas': 1}
+
+    ate = date.fromisoformat(ate) if ate else timezone.localdate()
+    janelas = list(_janelas_mensais(date.fromisoformat(desde), ate))
+    group(
+        sincronizar_proposicoes_janela.si(inicio.isoformat(), fim.isoformat())
+        for inicio, fim in janelas
+    ).apply_async()
+    return {'subtarefas': len(janelas)}
+
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_proposicoes_janela(inicio=None, fim=None):
+    """
+    Uma janela de datas com checkpoint próprio: uma nova tentativa retoma da última
+    página confirmada em vez de recomeçar a janela
+    """
+    if inicio is None:
+        return _executar_comando('sync_proposicoes')
+    return _executar_comando(
+        'sync_proposicoes',
+        desde=date.fromisoformat(inicio),
+        ate=date.fromisoformat(fim),
+        fonte=f'proposicoes:{inicio}:{fim}',
+    )
+
+
+@shared_task
+def backfill_proposicoes(desde_ano, ate_ano):
+    """
+    Carga histórica: um shard por ano, com checkpoint próprio, e a reconciliação de
+    tipos e autores quando todos terminam (progresso: backfill_proposicoes --progresso)
+    """
+    anos = range(desde_ano, ate_ano + 1)
+    chord(
+        (sincronizar_proposicoes_ano.si(ano) for ano in anos),
+        reconciliar_proposicoes.si(desde_ano, ate_ano),
+    ).apply_async()
+    return {'subtarefas': len(anos)}
+
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_proposicoes_ano(ano):
+    hoje = timezone.localdate()
+    return _executar_comando(
+        'sync_proposicoes',
+        desde=date(ano, 1, 1),
+        ate=min(date(ano, 12, 31), hoje),
+        fonte=f'proposicoes:backfill:{ano}',
+    )
+
+
+@shared_task(**RETENTATIVAS)
+def reconciliar_proposicoes(desde_ano, ate_ano):
+    return _executar_comando(
+        'backfill_proposicoes', desde_ano=desde_ano, ate_ano=ate_ano, apenas_reconciliar=True,
+    )
+
+
+# Votações ---------------------------------------------------------------------
+
+@shared_task
+def sincronizar_votacoes(ids=None, ano=None, atualizadas_ha_dias=None, tamanho_lote=200):
+    """Seleciona as proposições no banco e cria uma subtarefa por lote de IDs"""
+    proposicoes = Proposicao.objects.order_by('id_proposicao')
+    if ids:
+        proposicoes = proposicoes.filter(id_proposicao__in=ids)
+    if ano:
+        proposicoes = proposicoes.filter(ano=ano)
+    if atualizadas_ha_dias is not None:
+        desde = timezone.localdate() - timedelta(days=atualizadas_ha_dias)
+        proposicoes = proposicoes.filter(updated_at__date__gte=desde)
+
+    ids_proposicao = list(proposicoes.values_list('id_proposicao', flat=True))
+    lotes = [
+        ids_proposicao[posicao:posicao + tamanho_lote]
+        for posicao in range(0, len(ids_proposicao), tamanho_lote)
+    ]
+    if lotes:
+        group(sincronizar_votacoes_lote.si(lote) for lote in lotes).apply_async()
+    return {'proposicoes': len(ids_proposicao), 'subtarefas': len(lotes)}
+
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_votacoes_lote(ids):
+    return _executar_comando('sync_votacoes', ids=ids)
+
+
+# Discursos --------------------------------------------------------------------
+
+@shared_task(**RETENTATIVAS)
+def sincronizar_discursos(desde=None, sem_transcricao=False):
+    opcoes = {'sem_transcricao': sem_transcricao}
+    if desde:
+        opcoes['desde'] = date.fromisoformat(desde)
+    return _executar_comando('sync_discursos', **opcoes)
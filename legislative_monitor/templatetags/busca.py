@@ -0,0 +1,15 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from legislative_monitor.services.busca import MARCA_FIM, MARCA_INICIO
+
+
+register = template.Library()
+
+
+@register.filter
+def destacar(trecho):
+    """Trecho de buscar_proposicoes -> HTML com os termos encontrados em <mark>"""
+    html = escape(trecho or '')
+    return mark_safe(html.replace(MARCA_INICIO, '<mark>').replace(MARCA_FIM, '</mark>'))
@@ -0,0 +1,17 @@
+from django import template
+from django.contrib.admin.views.main import PAGE_VAR
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def url_proxima_pagina(cl):
+    """
+    Changelist com total aproximado (PaginatorEstimado): URL da página seguinte enquanto a
+    atual estiver cheia, já que os links numerados param na última página estimada
+    """
+    total = getattr(cl.paginator, 'total', None)
+    if total is None or not total.aproximado or len(cl.result_list) < cl.list_per_page:
+        return ''
+    return cl.get_query_string({PAGE_VAR: cl.page_num + 1})
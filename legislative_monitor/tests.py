@@ -1,3 +1,583 @@
-from django.test import TestCase
+import multiprocessing
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from unittest import mock, skipUnless
+from urllib.error import HTTPError
+from urllib.request import urlopen
 
-# Create your tests here.
+from django.core import signing
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from monitoria_legislativa.celery import app as celery_app
+
+from . import tasks
+from .checks import verificar_triggers_fts
+from .management.base import ComandoTravado
+from .management.commands.check_query_plans import ORDENACAO, VARREDURA
+from .management.commands import (
+    backfill_proposicoes, sync_deputados, sync_discursos, sync_partidos, sync_proposicoes,
+)
+from .models import CheckpointSincronizacao, Deputado, Partido, Proposicao, TipoProposicao
+from .services.busca import buscar_proposicoes, recriar_triggers_fts
+from .services.cache_http import CacheHTTPDisco
+from .services.camara_api import CamaraAPIService
+from .services.camara_sintetica import DadosSinteticosCamara, ServidorCamaraSintetica
+from .services.dto import PartidoAPI
+from .services.limitador_taxa import LimitadorTaxa
+from .services.paginacao import SALT_CURSOR, KeysetPaginator, PaginatorEstimado, Total
+from .templatetags.paginacao import url_proxima_pagina
+from .services.pipeline import Pipeline
+from .services.upsert import BulkUpserter, upsert_alterados
+
+
+def _adquirir_varias(caminho, limites, quantidade, fila):
+    """Processo filho: instantes (relógio de parede) em que cada token foi liberado"""
+    limitador = LimitadorTaxa(caminho, limites)
+    instantes = []
+    for _ in range(quantidade):
+        limitador.adquirir('api.teste')
+        instantes.append(time.time())
+    fila.put(instantes)
+
+
+class LimitadorTaxaTests(SimpleTestCase):
+    TAXA = 200.0
+    RAJADA = 4
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = str(Path(self.diretorio.name) / 'limite.sqlite3')
+        self.limites = {'api.teste': {'taxa': self.TAXA, 'rajada': self.RAJADA}}
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def test_host_sem_limite_nao_espera(self):
+        limitador = LimitadorTaxa(self.caminho, self.limites)
+        self.assertEqual(limitador.adquirir('outro.host'), 0.0)
+
+    def test_rajada_e_liberada_sem_espera(self):
+        limitador = LimitadorTaxa(self.caminho, self.limites)
+        esperas = [limitador.adquirir('api.teste') for _ in range(self.RAJADA)]
+        self.assertEqual(esperas, [0.0] * self.RAJADA)
+        self.assertGreater(limitador.adquirir('api.teste'), 0.0)
+
+    def test_taxa_respeitada_entre_processos(self):
+        """Processos concorrendo pelo mesmo balde não liberam mais que rajada + taxa * t"""
+        contexto = multiprocessing.get_context('fork')
+        fila = contexto.Queue()
+        processos = [
+            contexto.Process(target=_adquirir_varias, args=(self.caminho, self.limites, 30, fila))
+            for _ in range(8)
+        ]
+        inicio = time.time()
+        for processo in processos:
+            processo.start()
+        instantes = sorted(t for _ in processos for t in fila.get(timeout=60))
+        for processo in processos:
+            processo.join(timeout=60)
+            self.assertEqual(processo.exitcode, 0)
+
+        # Até cada liberação, no máximo rajada + taxa * (tempo desde o início) tokens; atrasos
+        # do sleep só adiam liberações, então a folga de um token basta
+        for quantidade, instante in enumerate(instantes, start=1):
+            self.assertLessEqual(quantidade, self.RAJADA + self.TAXA * (instante - inicio) + 1)
+
+
+class ErroTeste(Exception):
+    pass
+
+
+class PipelineEmPartesTests(SimpleTestCase):
+    def _executar(self, buscar):
+        gravados, concluidos, falhas = [], [], []
+        pipeline = Pipeline(
+            buscar=buscar,
+            normalizar=lambda item, parte: ((item, valor) for valor in parte),
+            gravar=lambda registros, itens: (gravados.extend(registros), concluidos.extend(itens)),
+            coletores=2,
+            tamanho_lote=3,
+            erros_item=(ErroTeste,),
+            ao_falhar=lambda item, erro: falhas.append(item),
+            em_partes=True,
+            intervalo_gravacao=0.05,
+        )
+        estatisticas = pipeline.executar(iter(['a', 'b', 'c']))
+        return estatisticas, gravados, concluidos, falhas
+
+    def test_partes_sao_normalizadas_e_item_concluido_uma_vez(self):
+        def buscar(item):
+            for pagina in range(3):
+                yield [f'{item}{pagina}-{i}' for i in range(2)]
+
+        estatisticas, gravados, concluidos, falhas = self._executar(buscar)
+        self.assertEqual(len(gravados), 18)
+        self.assertEqual(sorted(concluidos), ['a', 'b', 'c'])
+        self.assertEqual((estatisticas.itens, estatisticas.falhas, falhas), (3, 0, []))
+
+    def test_falha_no_meio_do_item(self):
+        def buscar(item):
+            yield [f'{item}-0']
+            if item == 'b':
+                raise ErroTeste('página 2')
+            yield [f'{item}-1']
+
+        estatisticas, gravados, concluidos, falhas = self._executar(buscar)
+        self.assertEqual(sorted(concluidos), ['a', 'b', 'c'])
+        self.assertEqual(falhas, ['b'])
+        self.assertEqual(estatisticas.falhas, 1)
+        # A parte entregue antes da falha foi gravada; o chamador não avança o checkpoint do item
+        self.assertIn(('b', 'b-0'), gravados)
+        self.assertNotIn(('b', 'b-1'), gravados)
+
+
+class UpsertCamposHashTests(TestCase):
+    RESUMO = ['nome', 'email', 'updated_at']
+    DETALHE = RESUMO + ['nome_civil', 'cpf']
+
+    def _deputado(self, **campos):
+        valores = {'id_deputado': 1, 'nome': 'Ana', 'email': 'ana@camara.leg.br'}
+        valores.update(campos)
+        return Deputado(**valores)
+
+    def _gravar(self, objeto, campos):
+        return upsert_alterados(Deputado, [objeto], 'id_deputado', campos, campos_hash=self.DETALHE)
+
+    def test_gravacao_parcial_nao_regrava_linha_completa(self):
+        self._gravar(self._deputado(nome_civil='Ana Maria', cpf='123'), self.DETALHE)
+        resultado = self._gravar(self._deputado(), self.RESUMO)
+        self.assertEqual(resultado.inalterados, 1)
+        resultado = self._gravar(self._deputado(nome_civil='Ana Maria', cpf='123'), self.DETALHE)
+        self.assertEqual(resultado.inalterados, 1)
+
+    def test_gravacao_parcial_alterada_preserva_demais_campos(self):
+        self._gravar(self._deputado(nome_civil='Ana Maria', cpf='123'), self.DETALHE)
+        resultado = self._gravar(self._deputado(nome='Ana M.'), self.RESUMO)
+        self.assertEqual(resultado.atualizados, 1)
+        deputado = Deputado.objects.get(id_deputado=1)
+        self.assertEqual((deputado.nome, deputado.nome_civil), ('Ana M.', 'Ana Maria'))
+        # O hash gravado descreve a linha completa: a passada completa seguinte não regrava
+        resultado = self._gravar(self._deputado(nome='Ana M.', nome_civil='Ana Maria', cpf='123'), self.DETALHE)
+        self.assertEqual(resultado.inalterados, 1)
+
+
+class VarreduraSQLiteTests(SimpleTestCase):
+    def _varreduras(self, linha):
+        return [(m.group(1), bool(m.group('ordenada'))) for m in VARREDURA['sqlite'].finditer(linha)]
+
+    def test_scan_na_ordem_do_indice_e_varredura_ordenada(self):
+        self.assertEqual(self._varreduras('SCAN proposicao USING INDEX data_idx'), [('proposicao', True)])
+        self.assertEqual(self._varreduras('SCAN proposicao USING COVERING INDEX ano_idx'), [('proposicao', True)])
+        self.assertEqual(self._varreduras('SCAN proposicao'), [('proposicao', False)])
+
+    def test_search_e_tabela_virtual_nao_sao_varredura(self):
+        self.assertEqual(self._varreduras('SEARCH proposicao USING INDEX ano_idx (ano=?)'), [])
+        self.assertEqual(self._varreduras('SCAN proposicao_fts VIRTUAL TABLE INDEX 0:M2'), [])
+
+
+class OrdenacaoSemIndiceTests(SimpleTestCase):
+    def test_temp_b_tree_do_sqlite(self):
+        self.assertTrue(ORDENACAO['sqlite'].search('27 0 0 USE TEMP B-TREE FOR ORDER BY'))
+        self.assertTrue(ORDENACAO['sqlite'].search('30 0 0 USE TEMP B-TREE FOR RIGHT PART OF ORDER BY'))
+        self.assertFalse(ORDENACAO['sqlite'].search('USE TEMP B-TREE FOR DISTINCT'))
+
+    def test_no_sort_do_postgresql(self):
+        self.assertTrue(ORDENACAO['postgresql'].search('Limit  (cost=1..2)\n  ->  Sort  (cost=1..2)'))
+        self.assertTrue(ORDENACAO['postgresql'].search('  ->  Incremental Sort  (cost=1..2)'))
+        self.assertFalse(ORDENACAO['postgresql'].search('  ->  Index Scan using data_idx on proposicao'))
+        self.assertFalse(ORDENACAO['postgresql'].search('        Sort Key: data'))
+
+
+class KeysetPaginatorTests(TestCase):
+    ORDENACAO = ['-data_apresentacao', '-id']
+
+    def setUp(self):
+        # Três datas repetidas: a ordem entre empates vem do id
+        datas = [date(2024, 3, 1)] * 3 + [date(2024, 2, 1)] * 4 + [date(2024, 1, 1)] * 3
+        for numero, data in enumerate(datas, start=1):
+            self._criar(numero, data)
+
+    def _criar(self, numero, data):
+        return Proposicao.objects.create(
+            id_proposicao=numero, numero=numero, ano=data.year, ementa=f'Proposição {numero}',
+            data_apresentacao=data,
+        )
+
+    def _paginator(self):
+        return KeysetPaginator(Proposicao.objects.all(), 3, ordenacao=self.ORDENACAO)
+
+    def _ids(self, pagina):
+        return [proposicao.id_proposicao for proposicao in pagina]
+
+    def _esperados(self):
+        return list(Proposicao.objects.order_by(*self.ORDENACAO).values_list('id_proposicao', flat=True))
+
+    def test_ida_e_volta(self):
+        paginator = self._paginator()
+        paginas = [paginator.get_page()]
+        while paginas[-1].has_next():
+            paginas.append(paginator.get_page(paginas[-1].cursor_proximo))
+
+        self.assertEqual([id_ for pagina in paginas for id_ in self._ids(pagina)], self._esperados())
+        self.assertEqual([len(pagina) for pagina in paginas], [3, 3, 3, 1])
+        self.assertFalse(paginas[0].has_previous())
+
+        # Voltando pelos cursores "anterior", cada página se repete igual
+        pagina = paginas[-1]
+        for esperada in reversed(paginas[:-1]):
+            pagina = paginator.get_page(pagina.cursor_anterior)
+            self.assertEqual(self._ids(pagina), self._ids(esperada))
+        self.assertFalse(pagina.has_previous())
+
+    def test_cursor_adulterado_ou_de_outra_ordenacao_volta_a_primeira_pagina(self):
+        paginator = self._paginator()
+        primeira = self._ids(paginator.get_page())
+        cursor = paginator.get_page().cursor_proximo
+
+        self.assertEqual(self._ids(paginator.get_page(cursor[:-2] + 'xx')), primeira)
+        self.assertEqual(self._ids(paginator.get_page('lixo')), primeira)
+        # Assinado, mas com a quantidade de campos de outra ordenação
+        outro = signing.dumps(['p', ['2024-01-01']], salt=SALT_CURSOR, compress=True)
+        self.assertEqual(self._ids(paginator.get_page(outro)), primeira)
+        # Assinado, mas com valor que não converte para o campo
+        invalido = signing.dumps(['p', ['ontem', '1']], salt=SALT_CURSOR, compress=True)
+        self.assertEqual(self._ids(paginator.get_page(invalido)), primeira)
+
+    def test_insercoes_entre_paginas_nao_repetem_nem_pulam(self):
+        paginator = self._paginator()
+        primeira = paginator.get_page()
+        vistos = self._ids(primeira)
+
+        # Antes do cursor (mais recente e empatada com a última exibida) e depois dele
+        self._criar(11, date(2024, 4, 1))
+        self._criar(12, date(2024, 3, 1))
+        self._criar(13, date(2024, 1, 15))
+
+        pagina = primeira
+        while pagina.has_next():
+            pagina = paginator.get_page(pagina.cursor_proximo)
+            vistos += self._ids(pagina)
+        esperados = self._esperados()
+        self.assertEqual(vistos[3:], esperados[esperados.index(vistos[2]) + 1:])
+        self.assertIn(13, vistos)
+        self.assertNotIn(12, vistos)
+
+
+class ProximaPaginaAdminTests(SimpleTestCase):
+    def _changelist(self, total, linhas, pagina=100):
+        return mock.Mock(
+            paginator=mock.Mock(total=total), result_list=[None] * linhas, list_per_page=100,
+            page_num=pagina, get_query_string=lambda parametros: f'?p={parametros["p"]}',
+        )
+
+    def test_link_enquanto_a_pagina_estiver_cheia(self):
+        self.assertEqual(url_proxima_pagina(self._changelist(Total(10000, minimo=True), 100)), '?p=101')
+        self.assertEqual(url_proxima_pagina(self._changelist(Total(10000, minimo=True), 40)), '')
+
+    def test_total_exato_usa_so_os_links_numerados(self):
+        self.assertEqual(url_proxima_pagina(self._changelist(Total(500), 100, pagina=2)), '')
+
+
+class PaginatorEstimadoTests(SimpleTestCase):
+    def _pagina(self, total, numero):
+        with mock.patch('legislative_monitor.services.paginacao.contar', return_value=total):
+            return PaginatorEstimado(list(range(65)), 20).page(numero)
+
+    def test_total_estimado_segue_enquanto_a_pagina_estiver_cheia(self):
+        # Estimativa de 2 páginas; a lista real tem 4
+        pagina = self._pagina(Total(40, estimado=True), 3)
+        self.assertEqual(list(pagina), list(range(40, 60)))
+        self.assertTrue(pagina.has_next())
+        self.assertEqual(pagina.next_page_number(), 4)
+        self.assertFalse(self._pagina(Total(40, estimado=True), 4).has_next())
+
+    def test_total_exato_usa_o_numero_de_paginas(self):
+        self.assertTrue(self._pagina(Total(65), 3).has_next())
+        self.assertFalse(self._pagina(Total(65), 4).has_next())
+
+
+class SyncPartidosHashTests(TestCase):
+    RESUMO = {'id': 36000, 'sigla': 'PT', 'nome': 'Partido dos Trabalhadores', 'uri': 'https://x/partidos/36000'}
+    DETALHE = {
+        'status': {
+            'data': '2025-04-08T14:44', 'idLegislatura': '57', 'situacao': 'Ativo',
+            'totalPosse': '68', 'totalMembros': '67',
+        },
+        'numeroEleitoral': 13,
+        'urlLogo': 'https://x/PT.gif',
+    }
+
+    def _gravar(self, detalhe):
+        partido = PartidoAPI.de_api(self.RESUMO, detalhe)
+        campos = sync_partidos.CAMPOS_DETALHE if partido.completo else sync_partidos.CAMPOS_RESUMO
+        upserter = BulkUpserter(Partido, 'id_partido', campos=campos, campos_hash=sync_partidos.CAMPOS_DETALHE)
+        upserter.adicionar(sync_partidos.Command()._montar_partido(partido))
+        return upserter.finalizar()
+
+    def test_detalhe_convertido_para_os_tipos_do_model(self):
+        partido = PartidoAPI.de_api(self.RESUMO, self.DETALHE)
+        self.assertEqual((partido.status_id_legislatura, partido.status_total_posse), (57, 68))
+
+    def test_completa_seguida_de_parcial_nao_regrava(self):
+        self.assertEqual(self._gravar(self.DETALHE).criados, 1)
+        self.assertEqual(self._gravar(self.DETALHE).inalterados, 1)
+        # Detalhe falhou: os campos do detalhe (data com fuso, inteiros) vêm do banco
+        self.assertEqual(self._gravar(None).inalterados, 1)
+        self.assertEqual(self._gravar(self.DETALHE).inalterados, 1)
+
+
+class MapasTipoTests(TestCase):
+    def test_sigla_repetida_fica_com_o_menor_codigo_numerico(self):
+        menor = TipoProposicao.objects.create(cod='99', sigla='PL', nome='Projeto de Lei')
+        TipoProposicao.objects.create(cod='100', sigla='PL', nome='Projeto de Lei (outro)')
+        TipoProposicao.objects.create(cod='X1', sigla='PL', nome='Sem código numérico')
+        mapas = sync_proposicoes.carregar_mapas_tipo()
+        self.assertEqual(mapas['sigla']['PL'], menor.pk)
+        self.assertEqual(len(mapas['cod']), 3)
+
+
+class ReconciliacaoProposicoesTests(TestCase):
+    def _proposicao(self):
+        return Proposicao(
+            id_proposicao=1, numero=1, ano=2024, ementa='Ementa', data_apresentacao=date(2024, 3, 1),
+        )
+
+    def _sincronizar(self):
+        return upsert_alterados(
+            Proposicao, [self._proposicao()], 'id_proposicao', sync_proposicoes.CAMPOS_ATUALIZAVEIS,
+            campos_hash=sync_proposicoes.CAMPOS_HASH,
+        )
+
+    def test_sync_seguinte_nao_regrava_a_linha_reconciliada(self):
+        self._sincronizar()
+        deputado = Deputado.objects.create(id_deputado=10, nome='Ana')
+        comando = backfill_proposicoes.Command()
+        comando.resolvidos = {'tipos': 0, 'autores': 0}
+        comando._gravar_reconciliacao([(Proposicao.objects.get().pk, None, deputado.pk)], None)
+
+        self.assertEqual(Proposicao.objects.get().autor, deputado)
+        self.assertEqual(self._sincronizar().inalterados, 1)
+        self.assertEqual(Proposicao.objects.get().autor, deputado)
+
+
+class NomeBuscaResumidosTests(TestCase):
+    """sync_deputados: deputados cujo detalhe falhou (gravados só com CAMPOS_RESUMO)"""
+
+    def _gravar_resumido(self, nome):
+        deputado = Deputado(id_deputado=1, nome=nome, email='ana@camara.leg.br')
+        sync_deputados.Command()._completar_nome_busca([deputado])
+        return upsert_alterados(
+            Deputado, [deputado], 'id_deputado', sync_deputados.CAMPOS_RESUMO,
+            campos_hash=sync_deputados.CAMPOS_DETALHE,
+        )
+
+    def test_nome_busca_usa_nome_civil_gravado(self):
+        Deputado.objects.create(id_deputado=1, nome='Ana', nome_civil='Ana Lúcia Prado', email='ana@camara.leg.br')
+        self._gravar_resumido('Ana Prado')
+        self.assertEqual(Deputado.objects.get(id_deputado=1).nome_busca, 'ana prado ana lucia prado')
+        # Sem mudança de nome, a passada resumida seguinte não regrava a linha
+        self.assertEqual(self._gravar_resumido('Ana Prado').inalterados, 1)
+
+    def test_deputado_novo_sem_detalhe(self):
+        self._gravar_resumido('José')
+        self.assertEqual(Deputado.objects.get(id_deputado=1).nome_busca, 'jose')
+
+
+class SyncDiscursosTests(TestCase):
+    def setUp(self):
+        self.comando = sync_discursos.Command()
+        self.comando.mapa_deputados = {10: 1, 20: 2}
+        self.comando.stats = {'sem_data': 0}
+
+    def test_watermark_anterior_a_desde_retoma_do_watermark(self):
+        CheckpointSincronizacao.objects.create(
+            fonte=f'{sync_discursos.PREFIXO_CHECKPOINT}10', watermark=date(2024, 1, 1),
+        )
+        tarefas = self.comando._tarefas_metadados(date(2024, 6, 1), date(2024, 6, 30))
+        self.assertEqual(
+            sorted(tarefas),
+            [(10, date(2024, 1, 1), date(2024, 6, 30), None), (20, date(2024, 6, 1), date(2024, 6, 30), None)],
+        )
+
+    def test_discurso_sem_data_e_ignorado(self):
+        self.comando.sem_transcricao = False
+        pagina = [
+            {'dataHoraInicio': None, 'tipoDiscurso': 'Breves'},
+            {'dataHoraInicio': '2024-06-03T15:00', 'tipoDiscurso': 'Breves'},
+        ]
+        discursos = list(self.comando._normalizar((10, None, None, None, None), pagina))
+        self.assertEqual(len(discursos), 1)
+        self.assertEqual(self.comando.stats['sem_data'], 1)
+
+
+class CacheHTTPDiscoTests(SimpleTestCase):
+    URL = 'http://api/v2/proposicoes/1'
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.cache = CacheHTTPDisco(diretorio.name, [(r'/proposicoes', 60)], 10**6)
+
+    def test_304_atualiza_os_validadores(self):
+        self.cache.armazenar(self.URL, None, {'dados': 1}, etag='"a"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+        self.cache.renovar(self.cache.obter(self.URL), etag='"b"')
+        entrada = self.cache.obter(self.URL)
+        self.assertEqual(entrada.cabecalhos_condicionais(), {
+            'If-None-Match': '"b"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+        })
+        self.assertEqual(entrada.corpo, {'dados': 1})
+
+
+class CamaraSinteticaTests(SimpleTestCase):
+    def test_itens_invalido_responde_400(self):
+        servidor = ServidorCamaraSintetica(('127.0.0.1', 0), DadosSinteticosCamara(deputados=5, votacoes=0))
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        url = f'http://127.0.0.1:{servidor.server_address[1]}/api/v2/deputados'
+        for itens in ('0', '-1', 'x'):
+            with self.assertRaises(HTTPError) as erro:
+                urlopen(f'{url}?itens={itens}')
+            self.assertEqual(erro.exception.code, 400)
+        with urlopen(f'{url}?itens=2') as resposta:
+            self.assertEqual(resposta.status, 200)
+
+
+class TarefasEagerTests(TestCase):
+    """Tarefas de proposições executadas em modo eager contra a API sintética"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dados = DadosSinteticosCamara(deputados=20, proposicoes=8000, votacoes=0)
+        cls.servidor = ServidorCamaraSintetica(('127.0.0.1', 0), cls.dados)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.diretorio = tempfile.TemporaryDirectory()
+        cls.configuracao = override_settings(
+            CAMARA_API_BASE_URL=f'http://127.0.0.1:{cls.servidor.server_address[1]}/api/v2',
+            API_CACHE_HABILITADO=False,
+            API_RATE_LIMITS={},
+            SYNC_TRAVA_DIR=cls.diretorio.name,
+        )
+        cls.configuracao.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.configuracao.disable()
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        cls.diretorio.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        # Chaves com o prefixo do settings: são elas que o Celery consulta primeiro. Sem
+        # propagar, o eager executa as novas tentativas e o erro final sai no .get()
+        conf = celery_app.conf
+        anteriores = {
+            'CELERY_TASK_ALWAYS_EAGER': conf.task_always_eager,
+            'CELERY_TASK_EAGER_PROPAGATES': conf.task_eager_propagates,
+        }
+        conf.update(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=False)
+        self.addCleanup(conf.update, anteriores)
+        # Transporte novo, criado com as configurações acima
+        transporte = mock.patch('legislative_monitor.services.transporte._transporte', None)
+        transporte.start()
+        self.addCleanup(transporte.stop)
+
+    def _esperadas(self, inicio, fim):
+        primeiro, ultimo = self.dados.faixa_proposicoes(inicio, fim)
+        return ultimo - primeiro
+
+    def test_intervalo_dividido_em_janelas_mensais(self):
+        resultado = tasks.sincronizar_proposicoes.delay('2020-01-15', '2020-03-10').get()
+        self.assertEqual(resultado, {'subtarefas': 3})
+
+        janelas = [('2020-01-15', '2020-01-31'), ('2020-02-01', '2020-02-29'), ('2020-03-01', '2020-03-10')]
+        checkpoints = CheckpointSincronizacao.objects.in_bulk(field_name='fonte')
+        self.assertEqual(sorted(checkpoints), sorted(f'proposicoes:{i}:{f}' for i, f in janelas))
+        for inicio, fim in janelas:
+            checkpoint = checkpoints[f'proposicoes:{inicio}:{fim}']
+            self.assertEqual((checkpoint.status, checkpoint.watermark), ('CONCLUIDO', date.fromisoformat(fim)))
+        self.assertEqual(
+            Proposicao.objects.count(), self._esperadas(date(2020, 1, 15), date(2020, 3, 10)),
+        )
+
+    def test_backfill_reconcilia_depois_dos_anos(self):
+        resultado = tasks.backfill_proposicoes.delay(2024, 2025).get()
+        self.assertEqual(resultado, {'subtarefas': 2})
+
+        for ano in (2024, 2025):
+            checkpoint = CheckpointSincronizacao.objects.get(fonte=f'proposicoes:backfill:{ano}')
+            self.assertEqual(checkpoint.status, 'CONCLUIDO')
+            self.assertIn('reconciliado_em', checkpoint.detalhes)
+        self.assertEqual(
+            Proposicao.objects.count(), self._esperadas(date(2024, 1, 1), date(2025, 12, 31)),
+        )
+        # Sem tipos no banco, as proposições chegam sem tipo; a reconciliação os resolve
+        self.assertFalse(Proposicao.objects.filter(tipo__isnull=True).exists())
+
+    def test_nova_tentativa_retoma_do_checkpoint_sem_duplicar(self):
+        original = CamaraAPIService.iter_paginas_proposicoes
+        janelas = []
+
+        def cair_na_terceira_janela(api, **kwargs):
+            janelas.append(kwargs['dataInicio'])
+            if len(janelas) == 3:
+                raise tasks.ErroRequisicaoAPI('API indisponível')
+            return original(api, **kwargs)
+
+        with mock.patch.object(CamaraAPIService, 'iter_paginas_proposicoes', cair_na_terceira_janela):
+            tasks.sincronizar_proposicoes_janela.delay('2020-01-01', '2020-09-30').get()
+
+        # A nova tentativa recomeça no watermark (fim da segunda janela, inclusive), não no
+        # início do intervalo
+        self.assertEqual(janelas[:4], ['2020-01-01', '2020-01-31', '2020-03-01', '2020-02-29'])
+        self.assertEqual(janelas.count('2020-01-01'), 1)
+        checkpoint = CheckpointSincronizacao.objects.get(fonte='proposicoes:2020-01-01:2020-09-30')
+        self.assertEqual((checkpoint.status, checkpoint.watermark), ('CONCLUIDO', date(2020, 9, 30)))
+        esperadas = self._esperadas(date(2020, 1, 1), date(2020, 9, 30))
+        self.assertEqual(Proposicao.objects.count(), esperadas)
+
+        # Reentrega da subtarefa desde o início: upsert, nada é criado de novo
+        CheckpointSincronizacao.objects.filter(pk=checkpoint.pk).update(watermark=None)
+        tasks.sincronizar_proposicoes_janela.delay('2020-01-01', '2020-09-30').get()
+        self.assertEqual(Proposicao.objects.count(), esperadas)
+
+    def test_so_trava_ocupada_gera_nova_tentativa(self):
+        with mock.patch.object(tasks, 'call_command', side_effect=[ComandoTravado('ocupada'), None]) as comando:
+            tasks.sincronizar_deputados.delay().get()
+        self.assertEqual(comando.call_count, 2)
+
+        with mock.patch.object(tasks, 'call_command', side_effect=CommandError('opção inválida')) as comando:
+            with self.assertRaises(CommandError):
+                tasks.sincronizar_deputados.delay().get()
+        self.assertEqual(comando.call_count, 1)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'triggers FTS5 só existem no SQLite')
+class TriggersFTSTests(TestCase):
+    def test_trigger_apagado_e_detectado_e_recriado(self):
+        proposicao = Proposicao.objects.create(
+            id_proposicao=1, numero=1, ano=2024, ementa='Dispõe sobre saneamento', data_apresentacao=date(2024, 1, 1),
+        )
+        with connection.cursor() as cursor:
+            # Efeito de uma migração que reconstrói a tabela
+            cursor.execute('DROP TRIGGER legislative_monitor_proposicao_fts_au')
+        Proposicao.objects.filter(pk=proposicao.pk).update(ementa='Dispõe sobre vacinação')
+
+        avisos = verificar_triggers_fts(None, databases=['default'])
+        self.assertEqual([aviso.id for aviso in avisos], ['legislative_monitor.W001'])
+        self.assertFalse(buscar_proposicoes('vacinação').exists())
+
+        self.assertEqual(recriar_triggers_fts(), ['legislative_monitor_proposicao_fts'])
+        self.assertEqual(verificar_triggers_fts(None, databases=['default']), [])
+        self.assertTrue(buscar_proposicoes('vacinação').exists())
+        self.assertFalse(buscar_proposicoes('saneamento').exists())
+
+        # Os triggers recriados mantêm o índice nas gravações seguintes
+        Proposicao.objects.filter(pk=proposicao.pk).update(ementa='Dispõe sobre saneamento')
+        self.assertTrue(buscar_proposicoes('saneamento').exists())
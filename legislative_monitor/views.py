@@ -1,7 +1,14 @@
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
-from django.db import models
 from .models import Deputado, Proposicao, Votacao, Discurso, TipoProposicao
+from .services.busca import buscar_por_nome, buscar_proposicoes
+from .services.paginacao import KeysetPaginator, PaginatorEstimado, links_paginacao
+
+
+# Ordenação das listas por cursor; o id desempata datas iguais e fecha os índices
+# (-data_apresentacao, -id) e (-data, -id). check_query_plans usa as mesmas constantes
+ORDENACAO_PROPOSICOES = ['-data_apresentacao', '-id']
+ORDENACAO_VOTACOES = ['-data', '-id']
 
 
 def listar_deputados(request):
@@ -23,10 +30,8 @@ def listar_deputados(request):
     if sexo_sigla:
         deputados = deputados.filter(sexo__sigla=sexo_sigla)
     if busca:
-        deputados = deputados.filter(
-            models.Q(nome__icontains=busca) |
-            models.Q(nome_civil__icontains=busca)
-        )
+        # Sem acentos e por similaridade (índice de trigramas)
+        deputados = buscar_por_nome(deputados, busca)
     
     paginator = Paginator(deputados, 20)
     page = request.GET.get('page')
@@ -61,6 +66,21 @@ def detalhe_deputado(request, id_deputado):
     return render(request, 'legislative_monitor/deputado_detail.html', context)
 
 
+def filtro_tipo(cod=None, sigla=None):
+    """
+    Filtro de proposições pelos tipos com o código/sigla dados, resolvidos antes: com um
+    único tipo, o índice (tipo, -data_apresentacao, -id) entrega a página já ordenada,
+    o que a junção com a tabela de tipos não permite
+    """
+    tipos = TipoProposicao.objects.all()
+    if cod:
+        tipos = tipos.filter(cod=cod)
+    if sigla:
+        tipos = tipos.filter(sigla=sigla)
+    ids = list(tipos.values_list('id', flat=True))
+    return {'tipo_id': ids[0]} if len(ids) == 1 else {'tipo_id__in': ids}
+
+
 def listar_proposicoes(request):
     """Lista todas as proposições"""
     proposicoes = Proposicao.objects.select_related('tipo', 'autor').all()
@@ -72,20 +92,22 @@ def listar_proposicoes(request):
     ano = request.GET.get('ano')
     busca = request.GET.get('q')  # Busca na ementa
     
-    if tipo_cod:
-        proposicoes = proposicoes.filter(tipo__cod=tipo_cod)
-    if tipo_sigla:
-        proposicoes = proposicoes.filter(tipo__sigla=tipo_sigla)
+    if tipo_cod or tipo_sigla:
+        proposicoes = proposicoes.filter(**filtro_tipo(tipo_cod, tipo_sigla))
     if situacao:
         proposicoes = proposicoes.filter(situacao=situacao)
     if ano:
         proposicoes = proposicoes.filter(ano=ano)
     if busca:
-        proposicoes = proposicoes.filter(ementa__icontains=busca)
-    
-    paginator = Paginator(proposicoes, 20)
-    page = request.GET.get('page')
-    proposicoes_page = paginator.get_page(page)
+        # Índice de busca textual, ordenado por relevância (resultados limitados pelo termo)
+        proposicoes = buscar_proposicoes(busca, proposicoes)
+        paginator = PaginatorEstimado(proposicoes, 20)
+        proposicoes_page = paginator.get_page(request.GET.get('page'))
+    else:
+        # Paginação por cursor: custo constante em qualquer profundidade. O total só é
+        # contado quando o template o exibe, na primeira página
+        paginator = KeysetPaginator(proposicoes, 20, ordenacao=ORDENACAO_PROPOSICOES)
+        proposicoes_page = paginator.get_page(request.GET.get('cursor'))
     
     # Buscar tipos disponíveis (siglas mais comuns)
     tipos_disponiveis = TipoProposicao.objects.filter(
@@ -94,6 +116,7 @@ def listar_proposicoes(request):
     
     context = {
         'proposicoes': proposicoes_page,
+        **links_paginacao(request, proposicoes_page),
         'tipos_disponiveis': tipos_disponiveis,
         # 'tipos': Proposicao.TIPO_CHOICES,  # Removido - usar tipos_disponiveis
         'situacoes': Proposicao.SITUACAO_CHOICES,
@@ -121,12 +144,12 @@ def listar_votacoes(request):
     """Lista todas as votações"""
     votacoes = Votacao.objects.all()
     
-    paginator = Paginator(votacoes, 20)
-    page = request.GET.get('page')
-    votacoes_page = paginator.get_page(page)
+    paginator = KeysetPaginator(votacoes, 20, ordenacao=ORDENACAO_VOTACOES)
+    votacoes_page = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'votacoes': votacoes_page,
+        **links_paginacao(request, votacoes_page),
     }
     return render(request, 'legislative_monitor/votacoes_list.html', context)
 
@@ -238,10 +261,7 @@ def listar_partidos(request):
     if situacao:
         partidos = partidos.filter(status_situacao=situacao)
     if busca:
-        partidos = partidos.filter(
-            models.Q(sigla__icontains=busca) | 
-            models.Q(nome__icontains=busca)
-        )
+        partidos = buscar_por_nome(partidos, busca)
     
     # Paginação
     paginator = Paginator(partidos, 20)
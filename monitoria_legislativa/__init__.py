@@ -0,0 +1,4 @@
+# Garante que a aplicação Celery seja carregada junto com o Django (para @shared_task)
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -0,0 +1,16 @@
+"""
+Aplicação Celery do projeto
+
+Configuração lida das variáveis CELERY_* do settings; as tarefas são descobertas
+nos módulos tasks.py de cada app.
+"""
+import os
+
+from celery import Celery
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'monitoria_legislativa.settings')
+
+app = Celery('monitoria_legislativa')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -107,6 +108,8 @@ if os.getenv('USE_SQLITE', 'True') == 'True':
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # sync_all roda etapas em processos paralelos: espera o lock de escrita em vez de falhar
+            'OPTIONS': {'timeout': 30},
         }
     }
 
@@ -174,9 +177,87 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'America/Sao_Paulo'
+# Modo síncrono (sem broker): as tarefas rodam no próprio processo, útil em testes e desenvolvimento
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_EAGER_PROPAGATES = True
+# Tarefas de sincronização são idempotentes: confirmadas só ao terminar, reentregues se o worker cair
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Atualização periódica (celery beat)
+CELERY_BEAT_SCHEDULE = {
+    'sincronizar-localidades': {
+        'task': 'legislative_monitor.tasks.sincronizar_ibge_localidades',
+        'schedule': crontab(minute=0, hour=3, day_of_week='sunday'),
+    },
+    'sincronizar-referencias': {
+        'task': 'legislative_monitor.tasks.sincronizar_referencias',
+        'schedule': crontab(minute=0, hour=4),
+    },
+    'sincronizar-proposicoes': {
+        'task': 'legislative_monitor.tasks.sincronizar_proposicoes',
+        'schedule': crontab(minute=15),
+    },
+    'sincronizar-votacoes': {
+        'task': 'legislative_monitor.tasks.sincronizar_votacoes',
+        'schedule': crontab(minute=0, hour=5),
+        'kwargs': {'atualizadas_ha_dias': 1},
+    },
+    'sincronizar-discursos': {
+        'task': 'legislative_monitor.tasks.sincronizar_discursos',
+        'schedule': crontab(minute=0, hour=6),
+    },
+}
+
+# Trava entre processos dos comandos de sincronização (advisory lock no PostgreSQL;
+# arquivos neste diretório nos demais bancos)
+SYNC_TRAVA_DIR = os.getenv('SYNC_TRAVA_DIR', str(BASE_DIR / '.cache' / 'travas'))
+# Trava retida há mais que isso (segundos) é registrada como possivelmente travada
+SYNC_TRAVA_ALERTA = int(os.getenv('SYNC_TRAVA_ALERTA', str(6 * 3600)))
+
+# Listas paginadas: total exato até este número de linhas; acima, estimativa do banco
+CONTAGEM_EXATA_LIMITE = int(os.getenv('CONTAGEM_EXATA_LIMITE', '10000'))
 
 # OpenAI API Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
 # Chamber of Deputies API
-CAMARA_API_BASE_URL = 'https://dadosabertos.camara.leg.br/api/v2'
+CAMARA_API_BASE_URL = os.getenv('CAMARA_API_BASE_URL', 'https://dadosabertos.camara.leg.br/api/v2')
+
+# Transporte HTTP compartilhado (Câmara e IBGE)
+API_HTTP_TIMEOUT_CONEXAO = float(os.getenv('API_HTTP_TIMEOUT_CONEXAO', '5'))
+API_HTTP_TIMEOUT_LEITURA = float(os.getenv('API_HTTP_TIMEOUT_LEITURA', '30'))
+API_HTTP_MAX_TENTATIVAS = int(os.getenv('API_HTTP_MAX_TENTATIVAS', '4'))
+API_HTTP_BACKOFF_BASE = float(os.getenv('API_HTTP_BACKOFF_BASE', '0.5'))
+API_HTTP_BACKOFF_MAX = float(os.getenv('API_HTTP_BACKOFF_MAX', '30'))
+API_HTTP_POOL_MAXSIZE = int(os.getenv('API_HTTP_POOL_MAXSIZE', '20'))
+
+# Requisições simultâneas do cliente assíncrono da Câmara (manter <= API_HTTP_POOL_MAXSIZE)
+CAMARA_API_CONCORRENCIA = int(os.getenv('CAMARA_API_CONCORRENCIA', '8'))
+
+# Cache HTTP em disco (respostas que raramente mudam são revalidadas com ETag/Last-Modified)
+API_CACHE_HABILITADO = os.getenv('API_CACHE_HABILITADO', 'True') == 'True'
+API_CACHE_DIR = os.getenv('API_CACHE_DIR', str(BASE_DIR / '.cache' / 'api'))
+API_CACHE_TAMANHO_MAX = int(os.getenv('API_CACHE_TAMANHO_MAX', str(512 * 1024 * 1024)))
+# (regex sobre a URL, TTL em segundos); URLs sem padrão correspondente não são cacheadas
+API_CACHE_TTLS = [
+    (r'/referencias/', 7 * 24 * 3600),
+    (r'/partidos(/\d+)?(\?|$)', 24 * 3600),
+    (r'/votacoes/[^/]+/votos', 30 * 24 * 3600),
+    (r'servicodados\.ibge\.gov\.br/', 30 * 24 * 3600),
+]
+
+# Limitador de taxa (token bucket) compartilhado pelos processos deste host
+API_RATE_LIMIT_ARQUIVO = os.getenv('API_RATE_LIMIT_ARQUIVO', str(BASE_DIR / '.cache' / 'rate_limit.sqlite3'))
+# host -> taxa (requisições/segundo) e rajada (tamanho do balde); hosts ausentes não são limitados
+API_RATE_LIMITS = {
+    'dadosabertos.camara.leg.br': {
+        'taxa': float(os.getenv('API_RATE_CAMARA_TAXA', '10')),
+        'rajada': int(os.getenv('API_RATE_CAMARA_RAJADA', '20')),
+    },
+    'servicodados.ibge.gov.br': {
+        'taxa': float(os.getenv('API_RATE_IBGE_TAXA', '20')),
+        'rajada': int(os.getenv('API_RATE_IBGE_RAJADA', '40')),
+    },
+}